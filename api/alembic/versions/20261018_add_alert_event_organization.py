@@ -0,0 +1,54 @@
+"""Record the organization of each alert event
+
+Revision ID: 20261018_add_alert_event_organization
+Revises: 20261018_add_daily_alert_counters
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261018_add_alert_event_organization"
+down_revision = "20261018_add_daily_alert_counters"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("alert_events", sa.Column("organization_id", sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        "fk_alert_events_organization_id",
+        "alert_events",
+        "organizations",
+        ["organization_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+    # Events of chillers deleted before now cannot be attributed, as with the counters.
+    op.execute(
+        """
+        UPDATE alert_events
+        SET organization_id = (
+            SELECT buildings.organization_id
+            FROM chiller_units
+            JOIN buildings ON buildings.id = chiller_units.building_id
+            WHERE chiller_units.id = alert_events.chiller_unit_id
+        )
+        WHERE alert_events.chiller_unit_id IS NOT NULL
+        """
+    )
+    op.create_index(
+        "ix_alert_events_organization_triggered_at",
+        "alert_events",
+        ["organization_id", "triggered_at"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_alert_events_organization_triggered_at", table_name="alert_events")
+    op.drop_constraint("fk_alert_events_organization_id", "alert_events", type_="foreignkey")
+    op.drop_column("alert_events", "organization_id")
@@ -0,0 +1,29 @@
+"""Index alert events for the paged feed
+
+Revision ID: 20261018_add_alert_feed_index
+Revises: 20261018_add_alert_rule_windows
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20261018_add_alert_feed_index"
+down_revision = "20261018_add_alert_rule_windows"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_alert_events_chiller_triggered_at",
+        "alert_events",
+        ["chiller_unit_id", "triggered_at"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_alert_events_chiller_triggered_at", table_name="alert_events")
@@ -0,0 +1,50 @@
+"""Add alert rule cooldown, hysteresis and evaluation state checkpoints
+
+Revision ID: 20261018_add_alert_rule_state
+Revises: 20261018_add_telemetry_retention_policies
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261018_add_alert_rule_state"
+down_revision = "20261018_add_telemetry_retention_policies"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "alert_rules",
+        sa.Column("cooldown_seconds", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "alert_rules",
+        sa.Column("hysteresis", sa.Float(), nullable=False, server_default="0"),
+    )
+
+    op.create_table(
+        "alert_rule_states",
+        sa.Column("alert_rule_id", sa.Integer(), nullable=False),
+        sa.Column("state", sa.Enum("OK", "FIRING", name="alert_state"), nullable=False),
+        sa.Column("changed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_fired_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_value", sa.Float(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["alert_rule_id"], ["alert_rules.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("alert_rule_id"),
+    )
+
+
+def downgrade():
+    op.drop_table("alert_rule_states")
+    bind = op.get_bind()
+    if bind and bind.dialect.name == "postgresql":
+        op.execute("DROP TYPE IF EXISTS alert_state")
+    op.drop_column("alert_rules", "hysteresis")
+    op.drop_column("alert_rules", "cooldown_seconds")
@@ -0,0 +1,37 @@
+"""Add windowed alert rules
+
+Revision ID: 20261018_add_alert_rule_windows
+Revises: 20261018_add_alert_rule_state
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261018_add_alert_rule_windows"
+down_revision = "20261018_add_alert_rule_state"
+branch_labels = None
+depends_on = None
+
+alert_window_type = sa.Enum("INSTANT", "AVERAGE", "CONSECUTIVE", name="alert_window_type")
+
+
+def upgrade():
+    alert_window_type.create(op.get_bind(), checkfirst=True)
+    op.add_column(
+        "alert_rules",
+        sa.Column("window_type", alert_window_type, nullable=False, server_default="INSTANT"),
+    )
+    op.add_column("alert_rules", sa.Column("window_seconds", sa.Integer(), nullable=True))
+    op.add_column("alert_rules", sa.Column("window_count", sa.Integer(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("alert_rules", "window_count")
+    op.drop_column("alert_rules", "window_seconds")
+    op.drop_column("alert_rules", "window_type")
+    alert_window_type.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,58 @@
+"""Add alert event counters per organization, severity, day and chiller
+
+Revision ID: 20261018_add_daily_alert_counters
+Revises: 20261018_add_alert_feed_index
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "20261018_add_daily_alert_counters"
+down_revision = "20261018_add_alert_feed_index"
+branch_labels = None
+depends_on = None
+
+
+def _severity():
+    return postgresql.ENUM("INFO", "WARNING", "CRITICAL", name="alert_severity", create_type=False)
+
+
+def upgrade():
+    op.create_table(
+        "alert_event_counters",
+        sa.Column("organization_id", sa.Integer(), nullable=False),
+        sa.Column("severity", _severity(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("chiller_unit_id", sa.Integer(), nullable=False),
+        sa.Column("total", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("acknowledged", sa.Integer(), nullable=False, server_default="0"),
+        sa.ForeignKeyConstraint(["organization_id"], ["organizations.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("organization_id", "severity", "day", "chiller_unit_id"),
+    )
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        day = "CAST(alert_events.triggered_at AT TIME ZONE 'UTC' AS DATE)"
+    else:
+        day = "DATE(alert_events.triggered_at)"
+    # Count the events recorded so far; events of deleted chillers cannot be attributed.
+    op.execute(
+        f"""
+        INSERT INTO alert_event_counters (organization_id, severity, day, chiller_unit_id, total, acknowledged)
+        SELECT buildings.organization_id, alert_events.severity, {day}, alert_events.chiller_unit_id,
+               COUNT(*), SUM(CASE WHEN alert_events.acknowledged THEN 1 ELSE 0 END)
+        FROM alert_events
+        JOIN chiller_units ON chiller_units.id = alert_events.chiller_unit_id
+        JOIN buildings ON buildings.id = chiller_units.building_id
+        GROUP BY buildings.organization_id, alert_events.severity, {day}, alert_events.chiller_unit_id
+        """
+    )
+
+
+def downgrade():
+    op.drop_table("alert_event_counters")
@@ -0,0 +1,44 @@
+"""Add per-organization telemetry retention policies
+
+Revision ID: 20261018_add_telemetry_retention_policies
+Revises: 20261018_partition_chiller_telemetry
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261018_add_telemetry_retention_policies"
+down_revision = "20261018_partition_chiller_telemetry"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "telemetry_retention_policies",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("organization_id", sa.Integer(), nullable=False),
+        sa.Column("raw_retention_days", sa.Integer(), nullable=True),
+        sa.Column("minute_retention_days", sa.Integer(), nullable=True),
+        sa.Column("hour_retention_days", sa.Integer(), nullable=True),
+        sa.Column("day_retention_days", sa.Integer(), nullable=True),
+        sa.Column("month_retention_days", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["organization_id"], ["organizations.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("organization_id"),
+    )
+    op.create_index(
+        "ix_telemetry_retention_policies_id", "telemetry_retention_policies", ["id"]
+    )
+
+
+def downgrade():
+    op.drop_index("ix_telemetry_retention_policies_id", table_name="telemetry_retention_policies")
+    op.drop_table("telemetry_retention_policies")
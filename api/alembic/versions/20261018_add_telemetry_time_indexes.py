@@ -0,0 +1,73 @@
+"""Add composite time-series indexes to chiller telemetry
+
+Revision ID: 20261018_add_telemetry_time_indexes
+Revises: 20240812_add_alerts
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261018_add_telemetry_time_indexes"
+down_revision = "20240812_add_alerts"
+branch_labels = None
+depends_on = None
+
+
+TABLE = "chiller_telemetry"
+COMPOSITE_INDEXES = {
+    "ix_chiller_telemetry_org_chiller_timestamp": ["organization_id", "chiller_unit_id", "timestamp"],
+    "ix_chiller_telemetry_org_building_timestamp": ["organization_id", "building_id", "timestamp"],
+}
+TIMESTAMP_INDEX = "ix_chiller_telemetry_timestamp"
+
+
+def _table_state():
+    inspector = sa.inspect(op.get_bind())
+    if TABLE not in inspector.get_table_names():
+        return None, set()
+    columns = {column["name"] for column in inspector.get_columns(TABLE)}
+    indexes = {index["name"] for index in inspector.get_indexes(TABLE)}
+    return columns, indexes
+
+
+def upgrade() -> None:
+    columns, indexes = _table_state()
+    if columns is None:
+        # Telemetry lives in a separate history database; the application creates
+        # the table and its indexes there on startup.
+        return
+
+    is_postgres = op.get_bind().dialect.name == "postgresql"
+    with op.get_context().autocommit_block():
+        for name, index_columns in COMPOSITE_INDEXES.items():
+            if name in indexes or not set(index_columns) <= columns:
+                continue
+            op.create_index(
+                name,
+                TABLE,
+                index_columns,
+                postgresql_concurrently=is_postgres,
+            )
+        if TIMESTAMP_INDEX not in indexes:
+            op.create_index(
+                TIMESTAMP_INDEX,
+                TABLE,
+                ["timestamp"],
+                postgresql_using="brin",
+                postgresql_concurrently=is_postgres,
+            )
+
+
+def downgrade() -> None:
+    columns, indexes = _table_state()
+    if columns is None:
+        return
+
+    for name in [TIMESTAMP_INDEX, *COMPOSITE_INDEXES]:
+        if name in indexes:
+            op.drop_index(name, table_name=TABLE)
@@ -0,0 +1,37 @@
+"""Partition chiller telemetry by month when partitioning is enabled
+
+Revision ID: 20261018_partition_chiller_telemetry
+Revises: 20261018_add_telemetry_time_indexes
+Create Date: 2026-10-18
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.config import settings
+from src.services.partitions import convert_to_partitioned, revert_partitioning
+
+
+# revision identifiers, used by Alembic.
+revision = "20261018_partition_chiller_telemetry"
+down_revision = "20261018_add_telemetry_time_indexes"
+branch_labels = None
+depends_on = None
+
+
+def _applies() -> bool:
+    bind = op.get_bind()
+    return bind.dialect.name == "postgresql" and "chiller_telemetry" in sa.inspect(bind).get_table_names()
+
+
+def upgrade() -> None:
+    # Opt-in: the conversion copies every row under an exclusive lock.
+    if settings.telemetry_partitioning and _applies():
+        convert_to_partitioned(op.get_bind())
+
+
+def downgrade() -> None:
+    if _applies():
+        revert_partitioning(op.get_bind())
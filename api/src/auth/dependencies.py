@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from fastapi import Depends, HTTPException, Request, status
 
+from src.config import settings
 from src.models.user import User, UserRole
 
 
@@ -20,3 +21,19 @@ def require_admin(user: User = Depends(get_current_user)) -> User:
     if user.role != UserRole.ORG_ADMIN:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required")
     return user
+
+
+def require_service_or_admin(request: Request) -> None:
+    """Allow the service token or an organization administrator.
+
+    For operational endpoints that report on the whole process rather than a tenant.
+    """
+
+    if request.headers.get("X-Service-Token") == settings.service_token:
+        return None
+    user = getattr(request.state, "user", None)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    if user.role != UserRole.ORG_ADMIN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required")
+    return None
@@ -21,6 +21,69 @@ class Settings:
         )
     )
     secret_key: str = field(default_factory=lambda: os.getenv("SECRET_KEY", "dev-secret-key"))
+    database_pool_size: int = field(
+        default_factory=lambda: int(os.getenv("DATABASE_POOL_SIZE", "5"))
+    )
+    database_max_overflow: int = field(
+        default_factory=lambda: int(os.getenv("DATABASE_MAX_OVERFLOW", "10"))
+    )
+    database_pool_timeout_seconds: float = field(
+        default_factory=lambda: float(os.getenv("DATABASE_POOL_TIMEOUT_SECONDS", "30"))
+    )
+    database_pool_recycle_seconds: int = field(
+        default_factory=lambda: int(os.getenv("DATABASE_POOL_RECYCLE_SECONDS", "1800"))
+    )
+    database_pool_pre_ping: bool = field(
+        default_factory=lambda: os.getenv("DATABASE_POOL_PRE_PING", "true").lower() == "true"
+    )
+    historical_database_pool_size: int = field(
+        default_factory=lambda: int(
+            os.getenv("HISTORICAL_DATABASE_POOL_SIZE", os.getenv("DATABASE_POOL_SIZE", "5"))
+        )
+    )
+    historical_database_max_overflow: int = field(
+        default_factory=lambda: int(
+            os.getenv("HISTORICAL_DATABASE_MAX_OVERFLOW", os.getenv("DATABASE_MAX_OVERFLOW", "10"))
+        )
+    )
+    historical_database_pool_timeout_seconds: float = field(
+        default_factory=lambda: float(
+            os.getenv(
+                "HISTORICAL_DATABASE_POOL_TIMEOUT_SECONDS",
+                os.getenv("DATABASE_POOL_TIMEOUT_SECONDS", "30"),
+            )
+        )
+    )
+    historical_database_pool_recycle_seconds: int = field(
+        default_factory=lambda: int(
+            os.getenv(
+                "HISTORICAL_DATABASE_POOL_RECYCLE_SECONDS",
+                os.getenv("DATABASE_POOL_RECYCLE_SECONDS", "1800"),
+            )
+        )
+    )
+    historical_database_pool_pre_ping: bool = field(
+        default_factory=lambda: os.getenv(
+            "HISTORICAL_DATABASE_POOL_PRE_PING", os.getenv("DATABASE_POOL_PRE_PING", "true")
+        ).lower()
+        == "true"
+    )
+    historical_read_replica_urls: list[str] = field(
+        default_factory=lambda: [
+            url.strip()
+            for url in os.getenv("HISTORICAL_READ_REPLICA_URLS", "").split(",")
+            if url.strip()
+        ]
+    )
+    historical_replica_max_lag_seconds: float = field(
+        default_factory=lambda: float(os.getenv("HISTORICAL_REPLICA_MAX_LAG_SECONDS", "30"))
+    )
+    historical_replica_check_interval_seconds: float = field(
+        default_factory=lambda: float(os.getenv("HISTORICAL_REPLICA_CHECK_INTERVAL_SECONDS", "10"))
+    )
+    database_pool_drain_seconds: float = field(
+        default_factory=lambda: float(os.getenv("DATABASE_POOL_DRAIN_SECONDS", "30"))
+    )
     allowed_origins: list[str] = field(
         default_factory=lambda: [
             origin.strip()
@@ -40,6 +103,112 @@ class Settings:
     smtp_password: str = field(default_factory=lambda: os.getenv("SMTP_PASSWORD", ""))
     smtp_use_tls: bool = field(default_factory=lambda: os.getenv("SMTP_USE_TLS", "true").lower() == "true")
     email_from: str = field(default_factory=lambda: os.getenv("EMAIL_FROM", "alerts@chiller.local"))
+    smtp_timeout_seconds: float = field(
+        default_factory=lambda: float(os.getenv("SMTP_TIMEOUT_SECONDS", "30"))
+    )
+    email_queue_max_size: int = field(
+        default_factory=lambda: int(os.getenv("EMAIL_QUEUE_MAX_SIZE", "1000"))
+    )
+    email_batch_window_seconds: float = field(
+        default_factory=lambda: float(os.getenv("EMAIL_BATCH_WINDOW_SECONDS", "2.0"))
+    )
+    email_batch_max_messages: int = field(
+        default_factory=lambda: int(os.getenv("EMAIL_BATCH_MAX_MESSAGES", "50"))
+    )
+    email_max_retries: int = field(default_factory=lambda: int(os.getenv("EMAIL_MAX_RETRIES", "5")))
+    email_retry_backoff_seconds: float = field(
+        default_factory=lambda: float(os.getenv("EMAIL_RETRY_BACKOFF_SECONDS", "2.0"))
+    )
+    telemetry_batch_max_size: int = field(
+        default_factory=lambda: int(os.getenv("TELEMETRY_BATCH_MAX_SIZE", "10000"))
+    )
+    chiller_cache_ttl_seconds: float = field(
+        default_factory=lambda: float(os.getenv("CHILLER_CACHE_TTL_SECONDS", "300"))
+    )
+    alert_rule_index_refresh_seconds: float = field(
+        default_factory=lambda: float(os.getenv("ALERT_RULE_INDEX_REFRESH_SECONDS", "60"))
+    )
+    alert_state_checkpoint_seconds: float = field(
+        default_factory=lambda: float(os.getenv("ALERT_STATE_CHECKPOINT_SECONDS", "30"))
+    )
+    alert_feed_page_size: int = field(
+        default_factory=lambda: int(os.getenv("ALERT_FEED_PAGE_SIZE", "50"))
+    )
+    alert_feed_max_page_size: int = field(
+        default_factory=lambda: int(os.getenv("ALERT_FEED_MAX_PAGE_SIZE", "500"))
+    )
+    stream_buffer_size: int = field(
+        default_factory=lambda: int(os.getenv("STREAM_BUFFER_SIZE", "256"))
+    )
+    stream_heartbeat_seconds: float = field(
+        default_factory=lambda: float(os.getenv("STREAM_HEARTBEAT_SECONDS", "15"))
+    )
+    stream_retry_milliseconds: int = field(
+        default_factory=lambda: int(os.getenv("STREAM_RETRY_MILLISECONDS", "3000"))
+    )
+    analytics_cache_max_entries: int = field(
+        default_factory=lambda: int(os.getenv("ANALYTICS_CACHE_MAX_ENTRIES", "512"))
+    )
+    analytics_cache_ttl_seconds: float = field(
+        default_factory=lambda: float(os.getenv("ANALYTICS_CACHE_TTL_SECONDS", "30"))
+    )
+    analytics_dashboard_workers: int = field(
+        default_factory=lambda: int(os.getenv("ANALYTICS_DASHBOARD_WORKERS", "4"))
+    )
+    rollup_refresh_interval_seconds: float = field(
+        default_factory=lambda: float(os.getenv("ROLLUP_REFRESH_INTERVAL_SECONDS", "60"))
+    )
+    rollup_lag_seconds: int = field(
+        default_factory=lambda: int(os.getenv("ROLLUP_LAG_SECONDS", "300"))
+    )
+    telemetry_partitioning: bool = field(
+        default_factory=lambda: os.getenv("TELEMETRY_PARTITIONING", "false").lower() == "true"
+    )
+    telemetry_partition_months_ahead: int = field(
+        default_factory=lambda: int(os.getenv("TELEMETRY_PARTITION_MONTHS_AHEAD", "3"))
+    )
+    telemetry_partition_interval_seconds: float = field(
+        default_factory=lambda: float(os.getenv("TELEMETRY_PARTITION_INTERVAL_SECONDS", "3600"))
+    )
+    telemetry_archive_dir: str = field(
+        default_factory=lambda: os.getenv("TELEMETRY_ARCHIVE_DIR", "data/telemetry-archive")
+    )
+    telemetry_archive_after_days: int = field(
+        default_factory=lambda: int(os.getenv("TELEMETRY_ARCHIVE_AFTER_DAYS", "90"))
+    )
+    telemetry_archive_interval_seconds: float = field(
+        default_factory=lambda: float(os.getenv("TELEMETRY_ARCHIVE_INTERVAL_SECONDS", "0"))
+    )
+    retention_interval_seconds: float = field(
+        default_factory=lambda: float(os.getenv("RETENTION_INTERVAL_SECONDS", "3600"))
+    )
+    retention_batch_size: int = field(
+        default_factory=lambda: int(os.getenv("RETENTION_BATCH_SIZE", "5000"))
+    )
+    retention_batch_pause_seconds: float = field(
+        default_factory=lambda: float(os.getenv("RETENTION_BATCH_PAUSE_SECONDS", "0"))
+    )
+    telemetry_backfill_interval_seconds: float = field(
+        default_factory=lambda: float(os.getenv("TELEMETRY_BACKFILL_INTERVAL_SECONDS", "3600"))
+    )
+    telemetry_backfill_batch_size: int = field(
+        default_factory=lambda: int(os.getenv("TELEMETRY_BACKFILL_BATCH_SIZE", "5000"))
+    )
+    telemetry_write_behind: bool = field(
+        default_factory=lambda: os.getenv("TELEMETRY_WRITE_BEHIND", "false").lower() == "true"
+    )
+    telemetry_buffer_max_size: int = field(
+        default_factory=lambda: int(os.getenv("TELEMETRY_BUFFER_MAX_SIZE", "50000"))
+    )
+    telemetry_flush_batch_size: int = field(
+        default_factory=lambda: int(os.getenv("TELEMETRY_FLUSH_BATCH_SIZE", "1000"))
+    )
+    telemetry_flush_max_latency_seconds: float = field(
+        default_factory=lambda: float(os.getenv("TELEMETRY_FLUSH_MAX_LATENCY_SECONDS", "1.0"))
+    )
+    telemetry_flush_max_attempts: int = field(
+        default_factory=lambda: int(os.getenv("TELEMETRY_FLUSH_MAX_ATTEMPTS", "5"))
+    )
 
 
 def get_settings() -> Settings:
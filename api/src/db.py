@@ -3,18 +3,44 @@ from __future__ import annotations
 
 import logging
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.schema import CreateIndex
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from .config import settings
 from .db_base import TelemetryBase
+from .db_pools import PoolConfig, pool_status, retire_engines
+from .db_replicas import Replica, ReplicaRouter
 
 
 logger = logging.getLogger(__name__)
 
 
-def _create_engine(database_url: str):
+def metadata_pool_config(current_settings=settings) -> PoolConfig:
+    return PoolConfig(
+        size=current_settings.database_pool_size,
+        max_overflow=current_settings.database_max_overflow,
+        timeout_seconds=current_settings.database_pool_timeout_seconds,
+        recycle_seconds=current_settings.database_pool_recycle_seconds,
+        pre_ping=current_settings.database_pool_pre_ping,
+    )
+
+
+def historical_pool_config(current_settings=settings) -> PoolConfig:
+    return PoolConfig(
+        size=current_settings.historical_database_pool_size,
+        max_overflow=current_settings.historical_database_max_overflow,
+        timeout_seconds=current_settings.historical_database_pool_timeout_seconds,
+        recycle_seconds=current_settings.historical_database_pool_recycle_seconds,
+        pre_ping=current_settings.historical_database_pool_pre_ping,
+    )
+
+
+def _create_engine(database_url: str, pool: PoolConfig | None = None, name: str = "metadata"):
     """Build a SQLAlchemy engine configured for the provided URL."""
 
     is_sqlite = database_url.startswith("sqlite")
@@ -26,35 +52,204 @@ def _create_engine(database_url: str):
     engine_kwargs = {"future": True, "connect_args": connect_args}
     if is_sqlite:
         engine_kwargs["poolclass"] = StaticPool
+    else:
+        engine_kwargs.update((pool or metadata_pool_config()).engine_kwargs(name))
 
     return create_engine(database_url, **engine_kwargs)
 
 
+# Async driver used for each backend; the sync URL may name any driver of the backend.
+_ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "psycopg"}
+
+
+def async_database_url(database_url: str) -> str:
+    """The URL of ``database_url`` with the backend's async driver."""
+
+    url = make_url(database_url)
+    driver = _ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        return database_url
+    return url.set(drivername=f"{url.get_backend_name()}+{driver}").render_as_string(
+        hide_password=False
+    )
+
+
+def _create_async_engine(
+    database_url: str, pool: PoolConfig | None = None, name: str = "metadata_async"
+):
+    """Build an async engine for the same database as :func:`_create_engine`.
+
+    An in-memory SQLite database is private to its connection, so the async engine of
+    a ``:memory:`` URL sees a separate, empty database.
+    """
+
+    url = async_database_url(database_url)
+    is_sqlite = url.startswith("sqlite")
+    connect_args = (
+        {"check_same_thread": False}
+        if is_sqlite
+        else {"options": "-csearch_path=public"}
+    )
+    engine_kwargs = {"connect_args": connect_args}
+    if is_sqlite and ":memory:" in url:
+        engine_kwargs["poolclass"] = StaticPool
+    else:
+        engine_kwargs.update(
+            (pool or metadata_pool_config()).engine_kwargs(name, asynchronous=True)
+        )
+
+    return create_async_engine(url, **engine_kwargs)
+
+
 def create_engine_from_settings(current_settings):
     """Backward-compatible helper to build an engine from a settings object."""
 
-    return _create_engine(current_settings.database_url)
+    return _create_engine(current_settings.database_url, metadata_pool_config(current_settings))
+
+
+def _telemetry_replicas(database_url: str) -> ReplicaRouter:
+    """Replicas of the configured history database; none once another one is selected."""
+
+    urls = settings.historical_read_replica_urls
+    if database_url != settings.historical_database_url:
+        urls = []
+    pool = historical_pool_config()
+    check_pool = PoolConfig(
+        size=1,
+        max_overflow=0,
+        timeout_seconds=pool.timeout_seconds,
+        recycle_seconds=pool.recycle_seconds,
+        pre_ping=True,
+    )
+    return ReplicaRouter(
+        [
+            Replica(
+                name=f"historical_replica_{index}",
+                engine=_create_engine(url, check_pool, f"historical_replica_{index}_check"),
+                async_engine=_create_async_engine(url, pool, f"historical_replica_{index}"),
+            )
+            for index, url in enumerate(urls)
+        ],
+        max_lag_seconds=settings.historical_replica_max_lag_seconds,
+    )
 
 
 def configure_telemetry_engine(database_url: str | None = None):
-    """(Re)configure the telemetry engine and session factory."""
+    """(Re)configure the telemetry engines, read replicas and session factories.
+
+    The engines being replaced are disposed once their checked-out connections have
+    been returned (see :func:`retire_engines`), so reconfiguring does not leak pools.
+    Read replicas only apply to the history database named in the environment.
+    """
 
     global telemetry_engine, TelemetrySessionLocal  # noqa: PLW0603
+    global async_telemetry_engine, AsyncTelemetrySessionLocal  # noqa: PLW0603
+    global telemetry_replicas  # noqa: PLW0603
 
+    previous = [
+        engine
+        for engine in (globals().get("telemetry_engine"), globals().get("async_telemetry_engine"))
+        if engine is not None
+    ]
+    if globals().get("telemetry_replicas") is not None:
+        previous.extend(telemetry_replicas.engines())
     url = database_url or settings.historical_database_url
-    telemetry_engine = _create_engine(url)
+    pool = historical_pool_config()
+    telemetry_engine = _create_engine(url, pool, "historical")
     TelemetrySessionLocal = sessionmaker(
         bind=telemetry_engine, autoflush=False, autocommit=False, future=True
     )
+    async_telemetry_engine = _create_async_engine(url, pool, "historical_async")
+    AsyncTelemetrySessionLocal = async_sessionmaker(
+        bind=async_telemetry_engine, autoflush=False, expire_on_commit=False
+    )
+    telemetry_replicas = _telemetry_replicas(url)
+    if previous:
+        retire_engines(previous, settings.database_pool_drain_seconds)
+
+
+def check_telemetry_replicas() -> None:
+    telemetry_replicas.check()
+
+
+def pool_statuses() -> dict[str, dict]:
+    """Usage and checkout metrics of every engine's connection pool."""
+
+    statuses = {
+        "metadata": pool_status("metadata", engine),
+        "metadata_async": pool_status("metadata_async", async_engine),
+        "historical": pool_status("historical", telemetry_engine),
+        "historical_async": pool_status("historical_async", async_telemetry_engine),
+    }
+    for replica in telemetry_replicas.replicas:
+        statuses[replica.name] = {
+            **pool_status(replica.name, replica.async_engine),
+            **replica.status(),
+        }
+    return statuses
 
 
 engine = _create_engine(settings.database_url)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+async_engine = _create_async_engine(settings.database_url)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
 
 
 configure_telemetry_engine()
 
 
+def ensure_telemetry_schema(bind=None) -> None:
+    """Create missing telemetry tables, columns and indexes on the history database.
+
+    ``create_all`` skips every index of a table that already exists, so indexes added
+    to the models later are created individually (concurrently on Postgres so ingest
+    is not blocked while they build). Nullable columns added to the models later are
+    added with ``ALTER TABLE``, which needs no table rewrite.
+    """
+
+    from src.services.partitions import is_partitioned, partition_empty_table
+
+    bind = bind if bind is not None else telemetry_engine
+    TelemetryBase.metadata.create_all(bind=bind)
+    partition_empty_table(bind)
+
+    inspector = inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+    for table in TelemetryBase.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing_columns:
+                continue
+            if not column.nullable or column.server_default is not None:
+                logger.warning("Skipping column %s: %s needs a migration", column.name, table.name)
+                continue
+            column_type = column.type.compile(dialect=bind.dialect)
+            with bind.begin() as connection:
+                connection.exec_driver_sql(
+                    f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"
+                )
+            existing_columns.add(column.name)
+            logger.info("Added column %s to %s", column.name, table.name)
+        existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing_indexes:
+                continue
+            if not {column.name for column in index.columns} <= existing_columns:
+                logger.warning("Skipping index %s: %s is missing columns", index.name, table.name)
+                continue
+            ddl = str(CreateIndex(index, if_not_exists=True).compile(dialect=bind.dialect))
+            with bind.connect() as connection:
+                # Postgres cannot build an index on a partitioned table concurrently.
+                concurrent = bind.dialect.name == "postgresql" and not is_partitioned(connection)
+            if concurrent:
+                ddl = ddl.replace("CREATE INDEX", "CREATE INDEX CONCURRENTLY", 1)
+            with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+                connection.exec_driver_sql(ddl)
+            logger.info("Created index %s on %s", index.name, table.name)
+
+
 def get_db_session():
     """Provide a SQLAlchemy session for dependency injection."""
     db = SessionLocal()
@@ -74,10 +269,51 @@ def get_telemetry_session():
         db.close()
 
 
+async def get_async_db_session():
+    """Provide an async SQLAlchemy session for dependency injection.
+
+    Sync service code runs on it through ``AsyncSession.run_sync``, which keeps the
+    event loop free while the database works instead of holding a threadpool worker.
+    """
+
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_telemetry_session():
+    """Provide an async SQLAlchemy session connected to the telemetry database."""
+
+    async with AsyncTelemetrySessionLocal() as db:
+        yield db
+
+
+async def get_async_telemetry_read_session():
+    """Provide a read-only telemetry session, on a read replica when one qualifies.
+
+    Replicas must be healthy and within ``HISTORICAL_REPLICA_MAX_LAG_SECONDS`` of the
+    primary; otherwise the primary serves the read. A replica whose connection fails
+    during the request is taken out of rotation until its next health check passes.
+    """
+
+    replica = telemetry_replicas.choose()
+    if replica is None:
+        async with AsyncTelemetrySessionLocal() as db:
+            yield db
+        return
+
+    async with replica.session_factory() as db:
+        try:
+            yield db
+        except DBAPIError as exc:
+            if exc.connection_invalidated or isinstance(exc, OperationalError):
+                telemetry_replicas.mark_failed(replica, exc)
+            raise
+
+
 # Ensure the telemetry schema exists for environments without migrations.
 # All models must be imported before create_all is called
 import src.models
 try:
-    TelemetryBase.metadata.create_all(bind=telemetry_engine)
+    ensure_telemetry_schema()
 except Exception as exc:  # pragma: no cover - defensive startup
     logger.warning("Unable to initialize telemetry database: %s", exc)
@@ -0,0 +1,161 @@
+"""Connection pool configuration, checkout metrics and graceful engine retirement."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterable
+
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PoolConfig:
+    """Queue pool parameters of one engine."""
+
+    size: int
+    max_overflow: int
+    timeout_seconds: float
+    recycle_seconds: int
+    pre_ping: bool
+
+    def engine_kwargs(self, name: str, asynchronous: bool = False) -> dict:
+        return {
+            "poolclass": TimedAsyncQueuePool if asynchronous else TimedQueuePool,
+            "pool_size": self.size,
+            "max_overflow": self.max_overflow,
+            "pool_timeout": self.timeout_seconds,
+            "pool_recycle": self.recycle_seconds,
+            "pool_pre_ping": self.pre_ping,
+            # Survives Pool.recreate(), so metrics stay attached across dispose().
+            "pool_logging_name": name,
+        }
+
+
+class PoolMetrics:
+    """Cumulative checkout statistics of the pools sharing one name."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record(self, waited: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_ms_avg": round(self.wait_seconds_total / attempts * 1000, 3) if attempts else 0.0,
+                "wait_ms_max": round(self.wait_seconds_max * 1000, 3),
+            }
+
+
+_metrics: dict[str, PoolMetrics] = {}
+_metrics_lock = threading.Lock()
+
+
+def pool_metrics(name: str) -> PoolMetrics:
+    with _metrics_lock:
+        metrics = _metrics.get(name)
+        if metrics is None:
+            metrics = _metrics[name] = PoolMetrics()
+        return metrics
+
+
+class _TimedCheckout:
+    """Record how long callers wait for a usable connection, including pre-ping."""
+
+    def connect(self):
+        metrics = pool_metrics(self.logging_name or "default")
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            metrics.record(time.perf_counter() - started, timed_out=True)
+            raise
+        metrics.record(time.perf_counter() - started)
+        return connection
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_status(name: str, engine) -> dict:
+    """Live usage of ``engine``'s pool plus the cumulative checkout metrics for ``name``."""
+
+    pool = engine.sync_engine.pool if isinstance(engine, AsyncEngine) else engine.pool
+    status = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+        )
+    status.update(pool_metrics(name).snapshot())
+    return status
+
+
+def _checked_out(engine) -> int:
+    pool = engine.sync_engine.pool if isinstance(engine, AsyncEngine) else engine.pool
+    return pool.checkedout() if isinstance(pool, QueuePool) else 0
+
+
+def _dispose(engine) -> None:
+    if isinstance(engine, AsyncEngine):
+        # A private event loop: the caller may be a worker thread without one.
+        runner = threading.Thread(target=asyncio.run, args=(engine.dispose(),), name="engine-dispose")
+        runner.start()
+        runner.join()
+    else:
+        engine.dispose()
+
+
+def retire_engines(engines: Iterable, drain_seconds: float) -> None:
+    """Dispose engines that have been replaced, once their checked-out connections return.
+
+    Idle engines are disposed right away. Otherwise a daemon thread waits up to
+    ``drain_seconds`` for in-flight requests to give their connections back, then
+    disposes regardless; connections still checked out are closed when returned.
+    """
+
+    engines = list(engines)
+    if not any(_checked_out(engine) for engine in engines):
+        for engine in engines:
+            _dispose(engine)
+        return
+
+    def drain() -> None:
+        deadline = time.monotonic() + drain_seconds
+        while time.monotonic() < deadline and any(_checked_out(engine) for engine in engines):
+            time.sleep(0.1)
+        busy = sum(_checked_out(engine) for engine in engines)
+        if busy:
+            logger.warning("Disposing replaced engine with %s connections still checked out", busy)
+        for engine in engines:
+            _dispose(engine)
+
+    threading.Thread(target=drain, name="engine-drain", daemon=True).start()
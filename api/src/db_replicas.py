@@ -0,0 +1,116 @@
+"""Routing of read-only history queries across streaming read replicas."""
+from __future__ import annotations
+
+import itertools
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Iterable
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+logger = logging.getLogger(__name__)
+
+# Replay delay of a Postgres standby. A standby that has replayed everything it received
+# is caught up even when the primary has been idle since its last transaction.
+_POSTGRES_LAG = text(
+    "SELECT CASE"
+    " WHEN NOT pg_is_in_recovery() THEN 0"
+    " WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+    " END"
+)
+
+
+def replication_lag_seconds(connection: Connection) -> float:
+    """How far behind its primary the database on ``connection`` is; 0 outside Postgres."""
+
+    if connection.dialect.name != "postgresql":
+        connection.execute(text("SELECT 1"))
+        return 0.0
+    return float(connection.execute(_POSTGRES_LAG).scalar() or 0.0)
+
+
+@dataclass
+class Replica:
+    """One read replica: a small sync engine for health checks and an async engine for reads."""
+
+    name: str
+    engine: Engine
+    async_engine: AsyncEngine
+    healthy: bool = False
+    lag_seconds: float | None = None
+    checked_at: datetime | None = None
+    error: str | None = None
+
+    def __post_init__(self) -> None:
+        self.session_factory = async_sessionmaker(
+            bind=self.async_engine, autoflush=False, expire_on_commit=False
+        )
+
+    def status(self) -> dict:
+        return {
+            "healthy": self.healthy,
+            "lag_seconds": self.lag_seconds,
+            "checked_at": self.checked_at.isoformat() if self.checked_at else None,
+            "error": self.error,
+        }
+
+
+class ReplicaRouter:
+    """Round-robin over healthy replicas that lag by at most ``max_lag_seconds``.
+
+    Replicas start out unchecked and are only used once a health check has measured
+    their lag. When none qualifies, callers fall back to the primary.
+    """
+
+    def __init__(self, replicas: Iterable[Replica], max_lag_seconds: float) -> None:
+        self.replicas = list(replicas)
+        self.max_lag_seconds = max_lag_seconds
+        self._turn = itertools.count()
+        self._lock = threading.Lock()
+
+    def choose(self) -> Replica | None:
+        with self._lock:
+            eligible = [
+                replica
+                for replica in self.replicas
+                if replica.healthy
+                and replica.lag_seconds is not None
+                and replica.lag_seconds <= self.max_lag_seconds
+            ]
+            if not eligible:
+                return None
+            return eligible[next(self._turn) % len(eligible)]
+
+    def check(self) -> None:
+        """Measure every replica's lag; unreachable replicas are taken out of rotation."""
+
+        for replica in self.replicas:
+            try:
+                with replica.engine.connect() as connection:
+                    lag = replication_lag_seconds(connection)
+            except Exception as exc:
+                self.mark_failed(replica, exc)
+                continue
+            with self._lock:
+                replica.healthy = True
+                replica.lag_seconds = lag
+                replica.error = None
+                replica.checked_at = datetime.now(timezone.utc)
+            if lag > self.max_lag_seconds:
+                logger.info("Replica %s lags by %.1fs; reading from the primary", replica.name, lag)
+
+    def mark_failed(self, replica: Replica, error: BaseException) -> None:
+        with self._lock:
+            if replica.healthy:
+                logger.warning("Replica %s is unavailable: %s", replica.name, error)
+            replica.healthy = False
+            replica.error = str(error)
+            replica.checked_at = datetime.now(timezone.utc)
+
+    def engines(self) -> list:
+        return [engine for replica in self.replicas for engine in (replica.engine, replica.async_engine)]
@@ -1,9 +1,14 @@
 """Main entrypoint for the FastAPI application."""
 from __future__ import annotations
 
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from src import db as db_module
+from src.auth.dependencies import require_service_or_admin
 from src.auth.router import router as auth_router
 from src.config import settings
 from src.middleware.tenant import TenantMiddleware
@@ -15,11 +20,91 @@ from src.routers.dashboard_layouts import router as dashboard_layouts_router
 from src.routers.data_sources import legacy_router as legacy_data_sources_router
 from src.routers.data_sources import router as data_sources_router
 from src.routers.organizations import router as organizations_router
+from src.routers.retention_policies import router as retention_policies_router
 from src.routers.telemetry import router as telemetry_router
 from src.routers.baseline_values import router as baseline_values_router
 from src.routers.alerts import router as alerts_router
+from src.routers.stream import router as stream_router
+from src.services.alert_rule_index import run_scheduled_reload as reload_alert_rule_index
+from src.services.alert_state import run_scheduled_checkpoint as checkpoint_alert_states
+from src.services.alert_windows import rebuild_alert_windows
+from src.services.archiver import run_scheduled_archive
+from src.services.derived_columns import run_scheduled_backfill
+from src.services.ingest_buffer import telemetry_buffer
+from src.services.live_events import live_events
+from src.services.notifications import email_dispatcher
+from src.services.partitions import run_partition_maintenance
+from src.services.retention import run_scheduled_retention
+from src.services.rollups import run_scheduled_refresh
+from src.services.scheduler import PeriodicTask
+
+rollup_refresh_task = PeriodicTask(
+    "rollup-refresh", settings.rollup_refresh_interval_seconds, run_scheduled_refresh
+)
+partition_maintenance_task = PeriodicTask(
+    "telemetry-partitions",
+    settings.telemetry_partition_interval_seconds if settings.telemetry_partitioning else 0,
+    run_partition_maintenance,
+)
+archive_task = PeriodicTask(
+    "telemetry-archive", settings.telemetry_archive_interval_seconds, run_scheduled_archive
+)
+retention_task = PeriodicTask(
+    "telemetry-retention", settings.retention_interval_seconds, run_scheduled_retention
+)
+replica_health_task = PeriodicTask(
+    "telemetry-replica-health",
+    settings.historical_replica_check_interval_seconds if settings.historical_read_replica_urls else 0,
+    db_module.check_telemetry_replicas,
+    run_immediately=True,
+)
+alert_rule_index_task = PeriodicTask(
+    "alert-rule-index", settings.alert_rule_index_refresh_seconds, reload_alert_rule_index
+)
+alert_state_task = PeriodicTask(
+    "alert-state-checkpoint", settings.alert_state_checkpoint_seconds, checkpoint_alert_states
+)
+backfill_task = PeriodicTask(
+    "telemetry-derived-backfill",
+    settings.telemetry_backfill_interval_seconds,
+    run_scheduled_backfill,
+)
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    """Start background workers and drain them on shutdown."""
 
-app = FastAPI(title="Chiller Intelligence API")
+    if settings.telemetry_write_behind:
+        telemetry_buffer.start()
+    if settings.smtp_host:
+        email_dispatcher.start()
+    await asyncio.to_thread(rebuild_alert_windows)
+    replica_health_task.start()
+    alert_rule_index_task.start()
+    alert_state_task.start()
+    rollup_refresh_task.start()
+    partition_maintenance_task.start()
+    archive_task.start()
+    retention_task.start()
+    backfill_task.start()
+    try:
+        yield
+    finally:
+        backfill_task.stop()
+        retention_task.stop()
+        archive_task.stop()
+        partition_maintenance_task.stop()
+        rollup_refresh_task.stop()
+        alert_state_task.stop()
+        alert_rule_index_task.stop()
+        replica_health_task.stop()
+        telemetry_buffer.stop()
+        email_dispatcher.stop()
+        checkpoint_alert_states()
+
+
+app = FastAPI(title="Chiller Intelligence API", lifespan=lifespan)
 
 app.add_middleware(TenantMiddleware)
 app.add_middleware(
@@ -37,6 +122,27 @@ def read_health():
     return {"status": "ok"}
 
 
+@app.get("/health/db-pools", dependencies=[Depends(require_service_or_admin)])
+def read_db_pools():
+    """Connection pool usage and checkout wait times per engine."""
+
+    return db_module.pool_statuses()
+
+
+@app.get("/health/notifications", dependencies=[Depends(require_service_or_admin)])
+def read_notifications():
+    """Alert email queue depth and delivery counters."""
+
+    return email_dispatcher.stats()
+
+
+@app.get("/health/streams", dependencies=[Depends(require_service_or_admin)])
+def read_streams():
+    """Live stream subscribers and fan-out counters."""
+
+    return live_events.stats()
+
+
 app.include_router(auth_router)
 app.include_router(organizations_router)
 app.include_router(buildings_router)
@@ -49,3 +155,5 @@ app.include_router(telemetry_router)
 app.include_router(dashboard_layouts_router)
 app.include_router(analytics_router)
 app.include_router(baseline_values_router)
+app.include_router(retention_policies_router)
+app.include_router(stream_router)
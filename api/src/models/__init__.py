@@ -4,12 +4,17 @@ from .user import User, UserRole
 from .building import Building
 from .chiller_unit import ChillerUnit
 from .chiller_telemetry import ChillerTelemetry
+from .telemetry_rollup import TelemetryRollup, TelemetryRollupWatermark
+from .telemetry_archive import TelemetryArchiveSegment
 from .historical_db_config import HistoricalDBConfig
 from .data_source_config import DataSourceConfig, DataSourceType
-from .alert_rule import AlertRule, ConditionOperator, AlertSeverity
+from .alert_rule import AlertRule, AlertWindowType, ConditionOperator, AlertSeverity
 from .dashboard_layout import DashboardLayout
 from .baseline_value import BaselineValue
 from .alert_event import AlertEvent
+from .alert_event_counter import AlertEventCounter
+from .alert_rule_state import AlertRuleState, AlertState
+from .retention_policy import TelemetryRetentionPolicy
 
 __all__ = [
     "Organization",
@@ -19,6 +24,9 @@ __all__ = [
     "Building",
     "ChillerUnit",
     "ChillerTelemetry",
+    "TelemetryRollup",
+    "TelemetryRollupWatermark",
+    "TelemetryArchiveSegment",
     "HistoricalDBConfig",
     "HistoricalDBConfig",
     "DataSourceConfig",
@@ -26,7 +34,12 @@ __all__ = [
     "AlertRule",
     "ConditionOperator",
     "AlertSeverity",
+    "AlertWindowType",
     "DashboardLayout",
     "BaselineValue",
     "AlertEvent",
+    "AlertEventCounter",
+    "AlertRuleState",
+    "AlertState",
+    "TelemetryRetentionPolicy",
 ]
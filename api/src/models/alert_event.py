@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Integer, String, func
+from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Index, Integer, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.db_base import Base
@@ -12,6 +12,11 @@ class AlertEvent(Base):
     """Represents a single alert occurrence evaluated from telemetry."""
 
     __tablename__ = "alert_events"
+    __table_args__ = (
+        # The alert feed pages through a chiller's events newest first.
+        Index("ix_alert_events_chiller_triggered_at", "chiller_unit_id", "triggered_at"),
+        Index("ix_alert_events_organization_triggered_at", "organization_id", "triggered_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     alert_rule_id: Mapped[int] = mapped_column(
@@ -20,6 +25,10 @@ class AlertEvent(Base):
     chiller_unit_id: Mapped[int] = mapped_column(
         ForeignKey("chiller_units.id", ondelete="SET NULL"), nullable=True, index=True
     )
+    # Kept when the chiller is deleted, so its events stay with their organization.
+    organization_id: Mapped[int | None] = mapped_column(
+        ForeignKey("organizations.id", ondelete="CASCADE"), nullable=True
+    )
     severity: Mapped[AlertSeverity] = mapped_column(nullable=False)
     metric_key: Mapped[str] = mapped_column(String(255), nullable=False)
     metric_value: Mapped[float] = mapped_column(Float, nullable=False)
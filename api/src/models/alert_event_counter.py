@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from datetime import date
+
+from sqlalchemy import Date, Enum as SQLEnum, ForeignKey, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.db_base import Base
+from .alert_rule import AlertSeverity
+
+
+class AlertEventCounter(Base):
+    """Alert events recorded and acknowledged per organization, chiller, severity and UTC day.
+
+    Updated in the transaction that records or acknowledges each event, so alert
+    summaries read a few rows instead of counting events.
+    """
+
+    __tablename__ = "alert_event_counters"
+
+    organization_id: Mapped[int] = mapped_column(
+        ForeignKey("organizations.id", ondelete="CASCADE"), primary_key=True
+    )
+    severity: Mapped[AlertSeverity] = mapped_column(
+        SQLEnum(AlertSeverity, name="alert_severity"), primary_key=True
+    )
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    # Not a foreign key: events outlive the chiller that raised them.
+    chiller_unit_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    total: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    acknowledged: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
@@ -34,6 +34,12 @@ class AlertSeverity(str, Enum):
     CRITICAL = "CRITICAL"
 
 
+class AlertWindowType(str, Enum):
+    INSTANT = "INSTANT"
+    AVERAGE = "AVERAGE"
+    CONSECUTIVE = "CONSECUTIVE"
+
+
 class AlertRule(Base):
     """Defines an alert condition for a chiller unit metric."""
 
@@ -55,6 +61,18 @@ class AlertRule(Base):
     recipient_emails: Mapped[list[str]] = mapped_column(
         JSON().with_variant(JSON, "sqlite"), nullable=False, default=list
     )
+    window_type: Mapped[AlertWindowType] = mapped_column(
+        SQLEnum(AlertWindowType, name="alert_window_type"),
+        nullable=False,
+        server_default=AlertWindowType.INSTANT.value,
+        default=AlertWindowType.INSTANT,
+    )
+    window_seconds: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    window_count: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    cooldown_seconds: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default="0", default=0
+    )
+    hysteresis: Mapped[float] = mapped_column(Float, nullable=False, server_default="0", default=0.0)
     is_active: Mapped[bool] = mapped_column(
         Boolean, nullable=False, server_default=true(), default=True
     )
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from datetime import datetime
+from enum import Enum
+
+from sqlalchemy import DateTime, Enum as SQLEnum, Float, ForeignKey, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.db_base import Base
+
+
+class AlertState(str, Enum):
+    OK = "OK"
+    FIRING = "FIRING"
+
+
+class AlertRuleState(Base):
+    """Checkpoint of an alert rule's evaluation state, restored on startup."""
+
+    __tablename__ = "alert_rule_states"
+
+    alert_rule_id: Mapped[int] = mapped_column(
+        ForeignKey("alert_rules.id", ondelete="CASCADE"), primary_key=True
+    )
+    state: Mapped[AlertState] = mapped_column(
+        SQLEnum(AlertState, name="alert_state"), nullable=False, default=AlertState.OK
+    )
+    changed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_fired_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_value: Mapped[float | None] = mapped_column(Float, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
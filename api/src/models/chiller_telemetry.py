@@ -2,16 +2,41 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import DateTime, Float, Integer, func
+from sqlalchemy import DateTime, Float, Index, Integer, func, text
 from sqlalchemy.orm import Mapped, mapped_column
 
-from src.db import TelemetryBase
+from src.db_base import TelemetryBase
 
 
 class ChillerTelemetry(TelemetryBase):
     """Stores telemetry records for a chiller unit."""
 
     __tablename__ = "chiller_telemetry"
+    __table_args__ = (
+        # Analytics always filter on organization and a time range, usually with a
+        # chiller or building as well.
+        Index(
+            "ix_chiller_telemetry_org_chiller_timestamp",
+            "organization_id",
+            "chiller_unit_id",
+            "timestamp",
+        ),
+        Index(
+            "ix_chiller_telemetry_org_building_timestamp",
+            "organization_id",
+            "building_id",
+            "timestamp",
+        ),
+        # BRIN on Postgres (tiny, suits append-mostly time series); a plain index elsewhere.
+        Index("ix_chiller_telemetry_timestamp", "timestamp", postgresql_using="brin"),
+        # Rows written before the derived columns existed; empty once the backfill is done.
+        Index(
+            "ix_chiller_telemetry_underived",
+            "id",
+            postgresql_where=text("delta_t IS NULL"),
+            sqlite_where=text("delta_t IS NULL"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     organization_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
@@ -23,6 +48,11 @@ class ChillerTelemetry(TelemetryBase):
     power_kw: Mapped[float] = mapped_column(Float, nullable=False)
     flow_rate: Mapped[float] = mapped_column(Float, nullable=False)
     cop: Mapped[float] = mapped_column(Float, nullable=False)
+    # Derived at ingest (see telemetry_aggregates.derived_values) so scans and alert
+    # checks do not repeat the arithmetic; older rows are filled by the backfill job.
+    delta_t: Mapped[float | None] = mapped_column(Float, nullable=True)
+    cooling_load_rth: Mapped[float | None] = mapped_column(Float, nullable=True)
+    kw_per_ton: Mapped[float | None] = mapped_column(Float, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
@@ -0,0 +1,34 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Integer, func
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from src.db_base import Base
+from .organization import Organization
+
+
+class TelemetryRetentionPolicy(Base):
+    """How long an organization keeps raw telemetry and each rollup grain.
+
+    ``None`` keeps a tier forever.
+    """
+
+    __tablename__ = "telemetry_retention_policies"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    organization_id: Mapped[int] = mapped_column(
+        ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False, unique=True
+    )
+    raw_retention_days: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    minute_retention_days: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    hour_retention_days: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    day_retention_days: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    month_retention_days: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+    organization: Mapped[Organization] = relationship("Organization")
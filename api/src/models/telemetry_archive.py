@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, Index, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.db_base import TelemetryBase
+
+
+class TelemetryArchiveSegment(TelemetryBase):
+    """Manifest entry for one Parquet file of archived raw telemetry.
+
+    Each file holds readings of a single chiller within a single month. A month can
+    gain further files when late readings are archived after the first export.
+    """
+
+    __tablename__ = "chiller_telemetry_archive_segments"
+    __table_args__ = (
+        Index(
+            "ix_chiller_telemetry_archive_segments_org_range",
+            "organization_id",
+            "min_timestamp",
+            "max_timestamp",
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    organization_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    chiller_unit_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    month_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    # Relative to TELEMETRY_ARCHIVE_DIR so the archive can be moved.
+    path: Mapped[str] = mapped_column(String(512), nullable=False, unique=True)
+    row_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    size_bytes: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    min_timestamp: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    max_timestamp: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
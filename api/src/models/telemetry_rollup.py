@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, Index, Integer, String, UniqueConstraint, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.db_base import TelemetryBase
+
+
+class TelemetryRollup(TelemetryBase):
+    """Pre-aggregated telemetry sums and counts per chiller and time bucket.
+
+    Sums and counts (rather than averages) are stored so buckets can be merged with
+    each other and with raw readings without losing precision.
+    """
+
+    __tablename__ = "chiller_telemetry_rollups"
+    __table_args__ = (
+        UniqueConstraint(
+            "grain", "chiller_unit_id", "bucket_start", name="uq_chiller_telemetry_rollups_bucket"
+        ),
+        Index(
+            "ix_chiller_telemetry_rollups_org_grain_bucket",
+            "organization_id",
+            "grain",
+            "bucket_start",
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    grain: Mapped[str] = mapped_column(String(16), nullable=False)
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    organization_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    building_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    chiller_unit_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    sample_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    cooling_load_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    cooling_load_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    power_kw_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    cop_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    inlet_temp_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    outlet_temp_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+
+
+class TelemetryRollupWatermark(TelemetryBase):
+    """Tracks how far each rollup grain has been materialised from its source."""
+
+    __tablename__ = "chiller_telemetry_rollup_watermarks"
+
+    grain: Mapped[str] = mapped_column(String(16), primary_key=True)
+    rolled_up_to: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
@@ -1,17 +1,42 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, status
+from datetime import datetime, timedelta, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from src.auth.dependencies import get_current_user
-from src.db import get_db_session
-from src.models import AlertRule, ChillerUnit, User
-from src.schemas.alert_rule import AlertRuleCreate, AlertRuleResponse, AlertRuleUpdate
+from src.db import get_async_db_session, get_async_telemetry_read_session, get_db_session
+from src.models import AlertRule, AlertWindowType, ChillerUnit, User
+from src.schemas.alert_rule import (
+    AlertRuleBacktestResponse,
+    AlertRuleCreate,
+    AlertRuleResponse,
+    AlertRuleUpdate,
+)
+from src.services.alert_backtest import backtest_rule
+from src.services.alert_rule_index import IndexedAlertRule, alert_rule_index
+from src.services.alert_state import alert_state_store
+from src.services.alert_windows import alert_window_engine
 from src.services.tenancy import get_alert_rule_for_org, get_chiller_for_org
 
 router = APIRouter(prefix="/alert_rules", tags=["alert_rules"])
 
 
+def _validate_window(alert_rule: AlertRule) -> None:
+    if alert_rule.window_type == AlertWindowType.AVERAGE and not alert_rule.window_seconds:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="AVERAGE rules require window_seconds",
+        )
+    if alert_rule.window_type == AlertWindowType.CONSECUTIVE and not alert_rule.window_count:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="CONSECUTIVE rules require window_count",
+        )
+
+
 @router.get("", response_model=list[AlertRuleResponse])
 def list_alert_rules(
     current_user: User = Depends(get_current_user),
@@ -35,9 +60,11 @@ def create_alert_rule(
 ):
     get_chiller_for_org(db, payload.chiller_unit_id, current_user)
     alert_rule = AlertRule(**payload.model_dump())
+    _validate_window(alert_rule)
     db.add(alert_rule)
     db.commit()
     db.refresh(alert_rule)
+    alert_rule_index.upsert(alert_rule)
     return alert_rule
 
 
@@ -50,6 +77,39 @@ def get_alert_rule(
     return get_alert_rule_for_org(db, alert_rule_id, current_user)
 
 
+@router.get("/{alert_rule_id}/backtest", response_model=AlertRuleBacktestResponse)
+async def backtest_alert_rule(
+    alert_rule_id: int,
+    start: datetime | None = Query(default=None),
+    end: datetime | None = Query(default=None),
+    bins: int = Query(default=20, ge=1, le=200),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db_session),
+    telemetry_db: AsyncSession = Depends(get_async_telemetry_read_session),
+):
+    """How often the rule would have fired on the chiller's history (default: the last 30 days)."""
+
+    end = end or datetime.now(timezone.utc)
+    start = start or end - timedelta(days=30)
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="start must be before end",
+        )
+    alert_rule = await db.run_sync(
+        lambda session: IndexedAlertRule.from_model(
+            get_alert_rule_for_org(session, alert_rule_id, current_user), active_only=False
+        )
+    )
+    if alert_rule is None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="The rule's metric or condition cannot be evaluated",
+        )
+    return await telemetry_db.run_sync(
+        backtest_rule, alert_rule, current_user.organization_id, start, end, bins
+    )
+
+
 @router.patch("/{alert_rule_id}", response_model=AlertRuleResponse)
 def update_alert_rule(
     alert_rule_id: int,
@@ -63,9 +123,16 @@ def update_alert_rule(
         get_chiller_for_org(db, update_data["chiller_unit_id"], current_user)
     for field, value in update_data.items():
         setattr(alert_rule, field, value)
+    _validate_window(alert_rule)
     db.add(alert_rule)
     db.commit()
     db.refresh(alert_rule)
+    if update_data.keys() & {"chiller_unit_id", "metric_key", "condition_operator"}:
+        # A different condition starts from OK and an empty window rather than
+        # inheriting the old state and samples.
+        alert_state_store.forget(alert_rule.id)
+        alert_window_engine.forget(alert_rule.id)
+    alert_rule_index.upsert(alert_rule)
     return alert_rule
 
 
@@ -78,4 +145,7 @@ def delete_alert_rule(
     alert_rule = get_alert_rule_for_org(db, alert_rule_id, current_user)
     db.delete(alert_rule)
     db.commit()
+    alert_rule_index.remove(alert_rule_id)
+    alert_state_store.forget(alert_rule_id)
+    alert_window_engine.forget(alert_rule_id)
     return None
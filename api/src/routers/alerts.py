@@ -1,44 +1,88 @@
 from __future__ import annotations
 
-from datetime import datetime
+import base64
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy import and_, func, or_
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import and_, case, func, or_, select, update
 from sqlalchemy.orm import Session
 
 from src.auth.dependencies import get_current_user
+from src.config import settings
 from src.db import get_db_session
-from src.models import AlertEvent, AlertSeverity, Building, ChillerUnit, Organization, User
+from src.models import AlertEvent, AlertSeverity, User
 from src.schemas.alert_event import AlertEventResponse, AlertFeedResponse, AlertSummaryResponse
+from src.services.alert_counters import alert_counts, count_acknowledgement
+from src.services.tenancy import get_chiller_for_org
+from src.services.time_buckets import as_utc, is_aligned
 
 router = APIRouter(prefix="/alerts", tags=["alerts"])
 
 
+def _encode_cursor(event: AlertEvent) -> str:
+    position = f"{as_utc(event.triggered_at).isoformat()}|{event.id}"
+    return base64.urlsafe_b64encode(position.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        position = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        triggered_at, event_id = position.split("|")
+        return as_utc(datetime.fromisoformat(triggered_at)), int(event_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from exc
+
+
+def _summary(counts: dict[AlertSeverity, tuple[int, int]]) -> AlertSummaryResponse:
+    return AlertSummaryResponse(
+        total=sum(total for total, _ in counts.values()),
+        by_severity={severity: total for severity, (total, _) in counts.items()},
+        unacknowledged=sum(total - acknowledged for total, acknowledged in counts.values()),
+    )
+
+
+@router.get("/summary", response_model=AlertSummaryResponse)
+def alert_summary(
+    severity: Optional[AlertSeverity] = Query(None),
+    chiller_unit_id: Optional[int] = Query(None),
+    days: Optional[int] = Query(None, ge=1),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db_session),
+):
+    """Alert counts for badges, read from the maintained counters only.
+
+    ``days`` limits them to alerts of the last ``days`` UTC days, today included.
+    """
+
+    since = None
+    if days is not None:
+        since = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+    return _summary(alert_counts(db, current_user.organization_id, severity, chiller_unit_id, since))
+
+
 @router.get("", response_model=AlertFeedResponse)
 def list_alerts(
     severity: Optional[AlertSeverity] = Query(None),
     start: Optional[datetime] = Query(None),
     end: Optional[datetime] = Query(None),
     chiller_unit_id: Optional[int] = Query(None),
+    limit: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = Query(None),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db_session),
 ):
-    base_query = (
-        db.query(AlertEvent)
-        .join(ChillerUnit, isouter=True)
-        .join(Building, isouter=True)
-        .join(Organization, Organization.id == Building.organization_id, isouter=True)
-        .filter(
-            or_(
-                Building.organization_id == current_user.organization_id,
-                Organization.id == current_user.organization_id,
-                AlertEvent.chiller_unit_id.is_(None),
-            )
-        )
-    )
+    """One page of alerts, newest first; pass ``next_cursor`` back as ``cursor`` for the next.
+
+    The summary counts cover every matching alert, not just the page. Unless the time
+    range has an end or starts other than at a UTC midnight, they come from the
+    maintained counters (see :mod:`src.services.alert_counters`).
+    """
 
-    filters = []
+    limit = min(limit or settings.alert_feed_page_size, settings.alert_feed_max_page_size)
+    # The organization recorded on the event, which the counters are kept by as well,
+    # so events of deleted chillers are paged and counted alike on both summary paths.
+    filters = [AlertEvent.organization_id == current_user.organization_id]
     if severity:
         filters.append(AlertEvent.severity == severity)
     if start:
@@ -48,23 +92,65 @@ def list_alerts(
     if chiller_unit_id:
         filters.append(AlertEvent.chiller_unit_id == chiller_unit_id)
 
-    filtered_query = base_query
-    if filters:
-        filtered_query = base_query.filter(and_(*filters))
-
-    alerts = filtered_query.order_by(AlertEvent.triggered_at.desc()).all()
+    page_filters = list(filters)
+    if cursor:
+        triggered_at, event_id = _decode_cursor(cursor)
+        page_filters.append(
+            or_(
+                AlertEvent.triggered_at < triggered_at,
+                and_(AlertEvent.triggered_at == triggered_at, AlertEvent.id < event_id),
+            )
+        )
+    # One extra row tells whether another page follows.
+    alerts = db.scalars(
+        select(AlertEvent)
+        .where(*page_filters)
+        .order_by(AlertEvent.triggered_at.desc(), AlertEvent.id.desc())
+        .limit(limit + 1)
+    ).all()
+    next_cursor = _encode_cursor(alerts[limit - 1]) if len(alerts) > limit else None
 
-    summary_rows = (
-        filtered_query.with_entities(AlertEvent.severity, func.count(AlertEvent.id))
-        .group_by(AlertEvent.severity)
-        .all()
-    )
-    summary = AlertSummaryResponse(
-        total=sum(row[1] for row in summary_rows),
-        by_severity={row[0]: row[1] for row in summary_rows},
-    )
+    if end is None and (start is None or is_aligned(start, "day")):
+        since = as_utc(start).date() if start else None
+        counts = alert_counts(db, current_user.organization_id, severity, chiller_unit_id, since)
+    else:
+        rows = db.execute(
+            select(
+                AlertEvent.severity,
+                func.count(AlertEvent.id),
+                func.sum(case((AlertEvent.acknowledged, 1), else_=0)),
+            )
+            .where(*filters)
+            .group_by(AlertEvent.severity)
+        )
+        counts = {severity: (total, int(acknowledged or 0)) for severity, total, acknowledged in rows}
+    summary = _summary(counts)
 
     return {
         "summary": summary,
-        "alerts": [AlertEventResponse.model_validate(alert) for alert in alerts],
+        "alerts": [AlertEventResponse.model_validate(alert) for alert in alerts[:limit]],
+        "next_cursor": next_cursor,
     }
+
+
+@router.post("/{alert_id}/acknowledge", response_model=AlertEventResponse)
+def acknowledge_alert(
+    alert_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db_session),
+):
+    alert = db.get(AlertEvent, alert_id)
+    if alert is None or alert.chiller_unit_id is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Alert not found")
+    get_chiller_for_org(db, alert.chiller_unit_id, current_user)
+    # Only the request that flips the flag counts it, however many race.
+    acknowledged = db.execute(
+        update(AlertEvent)
+        .where(AlertEvent.id == alert_id, AlertEvent.acknowledged.is_(False))
+        .values(acknowledged=True)
+    )
+    if acknowledged.rowcount:
+        count_acknowledgement(db, current_user.organization_id, alert)
+    db.commit()
+    db.refresh(alert)
+    return alert
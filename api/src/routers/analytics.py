@@ -1,19 +1,46 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime
-from typing import Literal
+from typing import Callable
 
+import numpy as np
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
-from sqlalchemy import and_, func, or_
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from src.db import get_db_session, get_telemetry_session
-from src.models import Building, ChillerTelemetry, ChillerUnit
+from src.config import settings
+from src.db import get_async_db_session, get_async_telemetry_read_session
+from src.models import Building, ChillerUnit
 from src.models.user import User
+from src.services.analytics_cache import analytics_cache
+from src.services.analytics_columns import (
+    AggregateColumns,
+    SeriesFormat,
+    consumption_columns,
+    epoch_millis,
+    format_series,
+    select_rows,
+    trend_columns,
+)
+from src.services.downsampling import lttb_indices
+from src.services.telemetry_aggregates import AggregatePartial, TelemetryScope, aggregate_telemetry
+from src.services.time_buckets import Granularity
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
-Granularity = Literal["minute", "hour", "day", "month"]
+
+class AnalyticsJSONResponse(ORJSONResponse):
+    """orjson response that also writes NumPy arrays, with NaN as ``null``.
+
+    Endpoints return it directly, which skips ``jsonable_encoder`` on large series.
+    """
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
 
 
 def _get_org_id(request: Request) -> int:
@@ -25,284 +52,314 @@ def _get_org_id(request: Request) -> int:
     return current_user.organization_id
 
 
-def _ensure_scope(
-    db: Session,
+async def _ensure_scope(
+    db: AsyncSession,
     org_id: int,
     building_id: int | None,
     chiller_id: int | None,
 ):
     if building_id is not None:
-        building = (
-            db.query(Building)
-            .filter(Building.id == building_id, Building.organization_id == org_id)
-            .first()
+        building = await db.scalar(
+            select(Building.id).where(Building.id == building_id, Building.organization_id == org_id)
         )
         if building is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Building not found")
 
     if chiller_id is not None:
-        chiller = (
-            db.query(ChillerUnit)
+        chiller = await db.scalar(
+            select(ChillerUnit.id)
             .join(Building)
-            .filter(
+            .where(
                 ChillerUnit.id == chiller_id,
                 Building.organization_id == org_id,
                 or_(building_id is None, ChillerUnit.building_id == building_id),
             )
-            .first()
         )
         if chiller is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chiller not found")
 
 
-def _apply_filters(
-    org_id: int,
-    start: datetime | None,
-    end: datetime | None,
-    building_id: int | None,
-    chiller_id: int | None,
-):
-    filters = [ChillerTelemetry.organization_id == org_id]
-
-    if start is not None:
-        filters.append(ChillerTelemetry.timestamp >= start)
-    if end is not None:
-        filters.append(ChillerTelemetry.timestamp <= end)
-    if building_id is not None:
-        filters.append(ChillerTelemetry.building_id == building_id)
-    if chiller_id is not None:
-        filters.append(ChillerTelemetry.chiller_unit_id == chiller_id)
-
-    return and_(*filters)
-
-
-def _bucket(granularity: Granularity, db: Session):
-    dialect = db.get_bind().dialect.name if db.get_bind() is not None else "sqlite"
-    if dialect == "sqlite":
-        fmt = {
-            "minute": "%Y-%m-%dT%H:%M:00",
-            "hour": "%Y-%m-%dT%H:00:00",
-            "day": "%Y-%m-%d 00:00:00",
-            "month": "%Y-%m-01 00:00:00",
-        }[granularity]
-        return func.strftime(fmt, ChillerTelemetry.timestamp).label("bucket")
-
-    mapping = {
-        "minute": "minute",
-        "hour": "hour",
-        "day": "day",
-        "month": "month",
-    }
-    return func.date_trunc(mapping[granularity], ChillerTelemetry.timestamp).label("bucket")
-
-
-def _base_query(org_id: int, db: Session):
-    return db.query(ChillerTelemetry).filter(ChillerTelemetry.organization_id == org_id)
-
-
-def _cooling_load_expr():
-    # Basic approximation using flow rate (gpm) * delta T * 500 to BTU/hr then convert to refrigeration tons
-    delta_t = func.nullif(ChillerTelemetry.inlet_temp - ChillerTelemetry.outlet_temp, 0)
-    return (ChillerTelemetry.flow_rate * delta_t * 500 / 12000).label("cooling_load")
+async def _unit_names(db: AsyncSession, org_id: int) -> dict[int, str]:
+    rows = await db.execute(
+        select(ChillerUnit.id, ChillerUnit.name)
+        .join(Building)
+        .where(Building.organization_id == org_id)
+    )
+    return {row.id: row.name for row in rows}
 
 
-@router.get("/plant-overview")
-def plant_overview(
+@router.get("/plant-overview", response_class=AnalyticsJSONResponse)
+async def plant_overview(
     request: Request,
-    db: Session = Depends(get_db_session),
-    telemetry_db: Session = Depends(get_telemetry_session),
+    db: AsyncSession = Depends(get_async_db_session),
+    telemetry_db: AsyncSession = Depends(get_async_telemetry_read_session),
     start: datetime | None = Query(None),
     end: datetime | None = Query(None),
     building_id: int | None = Query(None),
     chiller_unit_id: int | None = Query(None),
 ):
     org_id = _get_org_id(request)
-    _ensure_scope(db, org_id, building_id, chiller_unit_id)
-    filters = _apply_filters(org_id, start, end, building_id, chiller_unit_id)
-
-    base = _base_query(org_id, telemetry_db).filter(filters)
+    await _ensure_scope(db, org_id, building_id, chiller_unit_id)
+    scope = TelemetryScope(org_id, start, end, building_id, chiller_unit_id)
+    return AnalyticsJSONResponse(
+        await analytics_cache.get_or_compute_async(
+            "plant-overview", scope, lambda: telemetry_db.run_sync(_plant_overview, scope)
+        )
+    )
 
-    cooling_load_expr = _cooling_load_expr()
-    totals = base.with_entities(
-        func.coalesce(func.sum(cooling_load_expr), 0).label("cooling_load_rth"),
-        func.coalesce(func.sum(ChillerTelemetry.power_kw), 0).label("power_kw"),
-        func.coalesce(func.avg(ChillerTelemetry.cop), 0).label("avg_cop"),
-    ).first()
 
-    if totals is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No telemetry found")
+def _plant_overview(telemetry_db: Session, scope: TelemetryScope) -> dict:
+    totals = aggregate_telemetry(telemetry_db, scope).get((None, None), AggregatePartial())
+    cooling_load_rth = totals.cooling_sum
+    power_kw = totals.power_sum
+    avg_cop = totals.mean(totals.cop_sum)
 
     # Derived values (simple placeholders powered by recorded data)
-    efficiency_gain = max(totals.avg_cop - 2.5, 0) / 2.5 * 100 if totals.avg_cop else 0
-    monthly_savings = totals.cooling_load_rth * 0.12
-    co2_saved = totals.power_kw * 0.42
+    efficiency_gain = max(avg_cop - 2.5, 0) / 2.5 * 100 if avg_cop else 0
+    monthly_savings = cooling_load_rth * 0.12
+    co2_saved = power_kw * 0.42
 
     return {
-        "cooling_load_rth": round(totals.cooling_load_rth, 2),
-        "power_consumption_kw": round(totals.power_kw, 2),
-        "avg_cop": round(totals.avg_cop, 2) if totals.avg_cop else 0,
+        "cooling_load_rth": round(cooling_load_rth, 2),
+        "power_consumption_kw": round(power_kw, 2),
+        "avg_cop": round(avg_cop, 2) if avg_cop else 0,
         "efficiency_gain_percent": round(efficiency_gain, 2),
         "monthly_savings": round(monthly_savings, 2),
         "co2_saved": round(co2_saved, 2),
     }
 
 
-@router.get("/consumption-efficiency")
-def consumption_efficiency(
+@router.get("/consumption-efficiency", response_class=AnalyticsJSONResponse)
+async def consumption_efficiency(
     request: Request,
-    db: Session = Depends(get_db_session),
-    telemetry_db: Session = Depends(get_telemetry_session),
+    db: AsyncSession = Depends(get_async_db_session),
+    telemetry_db: AsyncSession = Depends(get_async_telemetry_read_session),
     granularity: Granularity = Query("day"),
     start: datetime | None = Query(None),
     end: datetime | None = Query(None),
     building_id: int | None = Query(None),
     chiller_unit_id: int | None = Query(None),
+    series_format: SeriesFormat = Query("rows", alias="format"),
 ):
     org_id = _get_org_id(request)
-    _ensure_scope(db, org_id, building_id, chiller_unit_id)
-    bucket = _bucket(granularity, telemetry_db)
-    filters = _apply_filters(org_id, start, end, building_id, chiller_unit_id)
-
-    rows = (
-        _base_query(org_id, telemetry_db)
-        .filter(filters)
-        .with_entities(
-            bucket,
-            func.sum(_cooling_load_expr()).label("cooling_rth"),
-            func.sum(ChillerTelemetry.power_kw).label("power_kw"),
-            func.avg(ChillerTelemetry.cop).label("avg_cop"),
+    await _ensure_scope(db, org_id, building_id, chiller_unit_id)
+    scope = TelemetryScope(org_id, start, end, building_id, chiller_unit_id)
+    return AnalyticsJSONResponse(
+        await analytics_cache.get_or_compute_async(
+            "consumption-efficiency",
+            scope,
+            lambda: telemetry_db.run_sync(_consumption_efficiency, scope, granularity, series_format),
+            granularity=granularity,
+            format=series_format,
         )
-        .group_by(bucket)
-        .order_by(bucket)
-        .all()
     )
 
-    def to_dict(row):
-        efficiency = (row.power_kw / row.cooling_rth) if row.cooling_rth else None
-        return {
-            "timestamp": row.bucket,
-            "cooling_rth": round(row.cooling_rth or 0, 3),
-            "power_kw": round(row.power_kw or 0, 3),
-            "efficiency_kwh_per_tr": round(efficiency, 4) if efficiency else None,
-            "avg_cop": round(row.avg_cop or 0, 3),
-        }
 
-    return {"series": [to_dict(r) for r in rows]}
+def _consumption_efficiency(
+    telemetry_db: Session,
+    scope: TelemetryScope,
+    granularity: Granularity,
+    series_format: SeriesFormat = "rows",
+) -> dict:
+    partials = aggregate_telemetry(telemetry_db, scope, granularity)
+    series = consumption_columns(AggregateColumns.from_partials(partials))
+    return {"series": format_series(series, series_format)}
 
 
-@router.get("/equipment-metrics")
-def equipment_metrics(
+@router.get("/equipment-metrics", response_class=AnalyticsJSONResponse)
+async def equipment_metrics(
     request: Request,
-    db: Session = Depends(get_db_session),
-    telemetry_db: Session = Depends(get_telemetry_session),
+    db: AsyncSession = Depends(get_async_db_session),
+    telemetry_db: AsyncSession = Depends(get_async_telemetry_read_session),
     start: datetime | None = Query(None),
     end: datetime | None = Query(None),
     building_id: int | None = Query(None),
 ):
     org_id = _get_org_id(request)
-    _ensure_scope(db, org_id, building_id, None)
-    filters = _apply_filters(org_id, start, end, building_id, None)
-
-    rows = (
-        _base_query(org_id, telemetry_db)
-        .filter(filters)
-        .with_entities(
-            ChillerTelemetry.chiller_unit_id.label("unit_id"),
-            func.sum(_cooling_load_expr()).label("cooling_rth"),
-            func.sum(ChillerTelemetry.power_kw).label("power_kw"),
-            func.avg(ChillerTelemetry.cop).label("avg_cop"),
-        )
-        .group_by(ChillerTelemetry.chiller_unit_id)
-        .order_by(ChillerTelemetry.chiller_unit_id)
-        .all()
+    await _ensure_scope(db, org_id, building_id, None)
+    scope = TelemetryScope(org_id, start, end, building_id)
+
+    async def compute() -> dict:
+        return await telemetry_db.run_sync(_equipment_metrics, scope, await _unit_names(db, org_id))
+
+    return AnalyticsJSONResponse(
+        await analytics_cache.get_or_compute_async("equipment-metrics", scope, compute)
     )
 
+
+def _equipment_metrics(
+    telemetry_db: Session, scope: TelemetryScope, unit_names: dict[int, str]
+) -> dict:
+    partials = aggregate_telemetry(telemetry_db, scope, by_unit=True)
+    rows = [(unit_id, partials[(bucket, unit_id)]) for bucket, unit_id in sorted(partials)]
+
     if not rows:
         return {"units": []}
 
-    unit_names = {
-        row.id: row.name
-        for row in db.query(ChillerUnit.id, ChillerUnit.name)
-        .join(Building)
-        .filter(Building.organization_id == org_id)
-        .all()
-    }
-
-    total_cooling = sum(r.cooling_rth or 0 for r in rows) or 1
-    total_power = sum(r.power_kw or 0 for r in rows) or 1
+    total_cooling = sum(partial.cooling_sum for _, partial in rows) or 1
+    total_power = sum(partial.power_sum for _, partial in rows) or 1
 
     return {
         "units": [
             {
-                "id": r.unit_id,
-                "name": unit_names.get(r.unit_id, f"Chiller {r.unit_id}"),
-                "cooling_share": round((r.cooling_rth or 0) / total_cooling * 100, 2),
-                "power_share": round((r.power_kw or 0) / total_power * 100, 2),
-                "efficiency_kwh_per_tr": round((r.power_kw or 0) / (r.cooling_rth or 1), 4),
-                "avg_cop": round(r.avg_cop or 0, 3),
+                "id": unit_id,
+                "name": unit_names.get(unit_id, f"Chiller {unit_id}"),
+                "cooling_share": round(partial.cooling_sum / total_cooling * 100, 2),
+                "power_share": round(partial.power_sum / total_power * 100, 2),
+                "efficiency_kwh_per_tr": round(partial.power_sum / (partial.cooling_sum or 1), 4),
+                "avg_cop": round(partial.mean(partial.cop_sum), 3),
             }
-            for r in rows
+            for unit_id, partial in rows
         ]
     }
 
 
-@router.get("/chiller-trends")
-def chiller_trends(
+@router.get("/chiller-trends", response_class=AnalyticsJSONResponse)
+async def chiller_trends(
     request: Request,
-    db: Session = Depends(get_db_session),
-    telemetry_db: Session = Depends(get_telemetry_session),
+    db: AsyncSession = Depends(get_async_db_session),
+    telemetry_db: AsyncSession = Depends(get_async_telemetry_read_session),
     granularity: Granularity = Query("hour"),
     start: datetime | None = Query(None),
     end: datetime | None = Query(None),
     chiller_unit_id: int | None = Query(None),
+    max_points: int | None = Query(None, ge=3),
+    series_format: SeriesFormat = Query("rows", alias="format"),
 ):
+    """Per-chiller series; ``max_points`` caps each series with LTTB downsampling."""
+
     org_id = _get_org_id(request)
-    _ensure_scope(db, org_id, None, chiller_unit_id)
-    bucket = _bucket(granularity, telemetry_db)
-    filters = _apply_filters(org_id, start, end, None, chiller_unit_id)
-
-    rows = (
-        _base_query(org_id, telemetry_db)
-        .filter(filters)
-        .with_entities(
-            bucket,
-            ChillerTelemetry.chiller_unit_id.label("unit_id"),
-            func.avg(ChillerTelemetry.inlet_temp).label("ewt"),
-            func.avg(ChillerTelemetry.outlet_temp).label("lwt"),
-            func.avg(ChillerTelemetry.power_kw).label("power_kw"),
-            func.avg(_cooling_load_expr()).label("cooling_rth"),
+    await _ensure_scope(db, org_id, None, chiller_unit_id)
+    scope = TelemetryScope(org_id, start, end, chiller_unit_id=chiller_unit_id)
+
+    async def compute() -> dict:
+        return await telemetry_db.run_sync(
+            _chiller_trends,
+            scope,
+            granularity,
+            await _unit_names(db, org_id),
+            max_points,
+            series_format,
+        )
+
+    return AnalyticsJSONResponse(
+        await analytics_cache.get_or_compute_async(
+            "chiller-trends",
+            scope,
+            compute,
+            granularity=granularity,
+            max_points=max_points,
+            format=series_format,
         )
-        .group_by(bucket, ChillerTelemetry.chiller_unit_id)
-        .order_by(bucket)
-        .all()
     )
 
-    chiller_names = {
-        row.id: row.name
-        for row in db.query(ChillerUnit.id, ChillerUnit.name)
-        .join(Building)
-        .filter(Building.organization_id == org_id)
-        .all()
-    }
 
-    data = {}
-    for row in rows:
-        if row.unit_id not in data:
-            data[row.unit_id] = {
-                "unit_id": row.unit_id,
-                "unit_name": chiller_names.get(row.unit_id, f"Chiller {row.unit_id}"),
-                "points": [],
-            }
-        data[row.unit_id]["points"].append(
+def _chiller_trends(
+    telemetry_db: Session,
+    scope: TelemetryScope,
+    granularity: Granularity,
+    chiller_names: dict[int, str],
+    max_points: int | None = None,
+    series_format: SeriesFormat = "rows",
+) -> dict:
+    partials = aggregate_telemetry(telemetry_db, scope, granularity, by_unit=True)
+    columns = AggregateColumns.from_partials(partials, by_unit=True)
+    trends = trend_columns(columns)
+    if series_format == "columnar" or max_points is not None:
+        millis = epoch_millis(columns.buckets)
+
+    chillers = []
+    for unit_id, rows in columns.unit_slices():
+        keep = rows
+        if max_points is not None and rows.stop - rows.start > max_points:
+            metrics = np.column_stack(
+                [trends[name][rows] for name in ("ewt", "lwt", "power_kw", "cooling_rth")]
+            )
+            keep = rows.start + lttb_indices(millis[rows], metrics, max_points)
+        series = select_rows(trends, keep)
+        if series_format == "columnar":
+            series["timestamp"] = millis[keep]
+        chillers.append(
             {
-                "timestamp": row.bucket,
-                "ewt": round(row.ewt or 0, 3),
-                "lwt": round(row.lwt or 0, 3),
-                "power_kw": round(row.power_kw or 0, 3),
-                "cooling_rth": round(row.cooling_rth or 0, 3),
-                "capacity_pct": round((row.cooling_rth or 0) / 100 * 10, 3),
+                "unit_id": unit_id,
+                "unit_name": chiller_names.get(unit_id, f"Chiller {unit_id}"),
+                "points": format_series(series, series_format),
             }
         )
 
-    return {"chillers": list(data.values())}
+    return {"chillers": chillers}
+
+
+@router.get("/dashboard", response_class=AnalyticsJSONResponse)
+async def dashboard(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db_session),
+    telemetry_db: AsyncSession = Depends(get_async_telemetry_read_session),
+    granularity: Granularity = Query("day"),
+    trend_granularity: Granularity = Query("hour"),
+    max_points: int | None = Query(None, ge=3),
+    start: datetime | None = Query(None),
+    end: datetime | None = Query(None),
+    building_id: int | None = Query(None),
+    chiller_unit_id: int | None = Query(None),
+    series_format: SeriesFormat = Query("rows", alias="format"),
+):
+    """Every overview section for one set of filters, queried concurrently.
+
+    ``granularity`` applies to the consumption series, ``trend_granularity`` and
+    ``max_points`` to the chiller trends, and ``format`` to both. Sections share the
+    result cache with the individual endpoints.
+    """
+
+    org_id = _get_org_id(request)
+    await _ensure_scope(db, org_id, building_id, chiller_unit_id)
+    scope = TelemetryScope(org_id, start, end, building_id, chiller_unit_id)
+    unit_names = await _unit_names(db, org_id)
+
+    sections: dict[str, tuple[str, Callable[[Session], dict], dict]] = {
+        "plant_overview": (
+            "plant-overview",
+            lambda session: _plant_overview(session, scope),
+            {},
+        ),
+        "consumption_efficiency": (
+            "consumption-efficiency",
+            lambda session: _consumption_efficiency(session, scope, granularity, series_format),
+            {"granularity": granularity, "format": series_format},
+        ),
+        "equipment_metrics": (
+            "equipment-metrics",
+            lambda session: _equipment_metrics(session, scope, unit_names),
+            {},
+        ),
+        "chiller_trends": (
+            "chiller-trends",
+            lambda session: _chiller_trends(
+                session, scope, trend_granularity, unit_names, max_points, series_format
+            ),
+            {"granularity": trend_granularity, "max_points": max_points, "format": series_format},
+        ),
+    }
+
+    bind = telemetry_db.bind
+    if bind.dialect.name == "sqlite" or settings.analytics_dashboard_workers <= 1:
+        # SQLite serialises access to its connection anyway; run in the request session.
+        results = {}
+        for name, (endpoint, compute, filters) in sections.items():
+            results[name] = await analytics_cache.get_or_compute_async(
+                endpoint, scope, lambda compute=compute: telemetry_db.run_sync(compute), **filters
+            )
+        return AnalyticsJSONResponse(results)
+
+    slots = asyncio.Semaphore(settings.analytics_dashboard_workers)
+
+    async def run_section(endpoint: str, compute: Callable[[Session], dict], filters: dict) -> dict:
+        async def in_own_session() -> dict:
+            # Sessions are not safe for concurrent use, so every section checks out its own connection.
+            async with slots, AsyncSession(bind=bind) as session:
+                return await session.run_sync(compute)
+
+        return await analytics_cache.get_or_compute_async(endpoint, scope, in_own_session, **filters)
 
+    results = await asyncio.gather(*(run_section(*section) for section in sections.values()))
+    return AnalyticsJSONResponse(dict(zip(sections, results)))
@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 from src.auth.dependencies import get_current_user
 from src.db import get_db_session
 from src.models import Building, User
+from src.services.chiller_cache import chiller_route_cache
 from src.schemas.building import BuildingCreate, BuildingResponse, BuildingUpdate
 from src.services.tenancy import get_building_for_org
 
@@ -57,6 +58,7 @@ def update_building(
     db.add(building)
     db.commit()
     db.refresh(building)
+    chiller_route_cache.invalidate_building(building.id)
     return building
 
 
@@ -69,4 +71,5 @@ def delete_building(
     building = get_building_for_org(db, building_id, current_user)
     db.delete(building)
     db.commit()
+    chiller_route_cache.invalidate_building(building_id)
     return None
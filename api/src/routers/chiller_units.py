@@ -6,6 +6,8 @@ from sqlalchemy.orm import Session
 from src.auth.dependencies import get_current_user
 from src.db import get_db_session
 from src.models import Building, ChillerUnit, User
+from src.services.analytics_cache import analytics_cache
+from src.services.chiller_cache import chiller_route_cache
 from src.schemas.chiller_unit import ChillerUnitCreate, ChillerUnitResponse, ChillerUnitUpdate
 from src.services.tenancy import get_building_for_org, get_chiller_for_org
 
@@ -65,6 +67,9 @@ def update_chiller_unit(
     db.add(chiller_unit)
     db.commit()
     db.refresh(chiller_unit)
+    chiller_route_cache.invalidate_chiller(chiller_unit.id)
+    # Cached equipment metrics and trends carry chiller names.
+    analytics_cache.invalidate_organization(current_user.organization_id)
     return chiller_unit
 
 
@@ -77,4 +82,6 @@ def delete_chiller_unit(
     chiller_unit = get_chiller_for_org(db, chiller_unit_id, current_user)
     db.delete(chiller_unit)
     db.commit()
+    chiller_route_cache.invalidate_chiller(chiller_unit_id)
+    analytics_cache.invalidate_organization(current_user.organization_id)
     return None
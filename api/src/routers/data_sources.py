@@ -7,10 +7,11 @@ from sqlalchemy.engine.url import URL, make_url
 
 from src.auth.dependencies import get_current_user
 from src.config import settings
-from src.db import TelemetryBase, configure_telemetry_engine, get_db_session, telemetry_engine
+from src.db import configure_telemetry_engine, ensure_telemetry_schema, get_db_session
 from src.models import ChillerUnit, DataSourceConfig, HistoricalDBConfig, User
 from src.schemas.data_source import DataSourceCreate, DataSourceResponse, DataSourceUpdate
 from src.schemas.historical_db import HistoricalDBConfigPayload, HistoricalDBConfigResponse
+from src.services.analytics_cache import analytics_cache
 from src.services.tenancy import get_chiller_for_org, get_data_source_for_org
 
 base_router = APIRouter(tags=["data_sources"])
@@ -128,7 +129,8 @@ def update_historical_db_config(
     db.refresh(config)
 
     configure_telemetry_engine(connection_url)
-    TelemetryBase.metadata.create_all(bind=telemetry_engine)
+    ensure_telemetry_schema()
+    analytics_cache.clear()
 
     params = payload.model_dump()
     params["password"] = ""
@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 from src.auth.dependencies import get_current_user, require_admin
 from src.db import get_db_session
 from src.models import Organization, User
+from src.services.chiller_cache import chiller_route_cache
 from src.schemas.organization import OrganizationResponse, OrganizationUpdate
 
 router = APIRouter(prefix="/organizations", tags=["organizations"])
@@ -36,4 +37,5 @@ def update_organization(
     db.add(organization)
     db.commit()
     db.refresh(organization)
+    chiller_route_cache.invalidate_organization(organization.id)
     return organization
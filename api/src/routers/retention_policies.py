@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, status
+from sqlalchemy.orm import Session
+
+from src.auth.dependencies import get_current_user, require_admin
+from src.db import get_db_session, get_telemetry_session
+from src.models import TelemetryRetentionPolicy, User
+from src.schemas.retention_policy import (
+    RetentionPolicyPayload,
+    RetentionPolicyResponse,
+    RetentionRunReport,
+    RetentionStatusResponse,
+)
+from src.services.retention import retention_status, run_retention
+
+router = APIRouter(prefix="/retention-policies", tags=["retention_policies"])
+
+
+def _get_policy(db: Session, current_user: User) -> TelemetryRetentionPolicy | None:
+    return (
+        db.query(TelemetryRetentionPolicy)
+        .filter(TelemetryRetentionPolicy.organization_id == current_user.organization_id)
+        .first()
+    )
+
+
+@router.get("", response_model=RetentionPolicyResponse)
+def get_retention_policy(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db_session),
+):
+    policy = _get_policy(db, current_user)
+    if policy is None:
+        # Without a policy every tier is kept forever.
+        return RetentionPolicyResponse(organization_id=current_user.organization_id)
+    return policy
+
+
+@router.put("", response_model=RetentionPolicyResponse)
+def upsert_retention_policy(
+    payload: RetentionPolicyPayload,
+    current_user: User = Depends(require_admin),
+    db: Session = Depends(get_db_session),
+):
+    policy = _get_policy(db, current_user)
+    if policy is None:
+        policy = TelemetryRetentionPolicy(organization_id=current_user.organization_id)
+    for field, value in payload.model_dump().items():
+        setattr(policy, field, value)
+    db.add(policy)
+    db.commit()
+    db.refresh(policy)
+    return policy
+
+
+@router.delete("", status_code=status.HTTP_204_NO_CONTENT)
+def delete_retention_policy(
+    current_user: User = Depends(require_admin),
+    db: Session = Depends(get_db_session),
+):
+    policy = _get_policy(db, current_user)
+    if policy is not None:
+        db.delete(policy)
+        db.commit()
+    return None
+
+
+@router.get("/preview", response_model=RetentionRunReport)
+def preview_retention(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db_session),
+    telemetry_db: Session = Depends(get_telemetry_session),
+):
+    """Dry run: rows and bytes the next retention run would reclaim for this organization."""
+
+    report = run_retention(
+        db, telemetry_db, dry_run=True, organization_id=current_user.organization_id
+    )
+    return report.as_dict()
+
+
+@router.get("/status", response_model=RetentionStatusResponse)
+def get_retention_status(current_user: User = Depends(get_current_user)):
+    return retention_status.as_dict(organization_id=current_user.organization_id)
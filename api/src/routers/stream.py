@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+
+from src.auth.dependencies import get_current_user
+from src.models import AlertSeverity, User
+from src.services.live_events import ALERTS, TELEMETRY, Filter, live_events, stream_frames
+
+router = APIRouter(prefix="/stream", tags=["stream"])
+
+_SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def _event_stream(topic: str, organization_id: int, accepts: Filter | None) -> StreamingResponse:
+    return StreamingResponse(
+        stream_frames(live_events, topic, organization_id, accepts),
+        media_type="text/event-stream",
+        headers=_SSE_HEADERS,
+    )
+
+
+def _matching(**expected) -> Filter | None:
+    expected = {key: value for key, value in expected.items() if value is not None}
+    if not expected:
+        return None
+    return lambda payload: all(payload.get(key) == value for key, value in expected.items())
+
+
+@router.get("/telemetry")
+async def stream_telemetry(
+    building_id: Optional[int] = Query(None),
+    chiller_unit_id: Optional[int] = Query(None),
+    current_user: User = Depends(get_current_user),
+):
+    """Server-sent ``telemetry`` events for readings of the organization as they are ingested."""
+
+    return _event_stream(
+        TELEMETRY,
+        current_user.organization_id,
+        _matching(building_id=building_id, chiller_unit_id=chiller_unit_id),
+    )
+
+
+@router.get("/alerts")
+async def stream_alerts(
+    severity: Optional[AlertSeverity] = Query(None),
+    chiller_unit_id: Optional[int] = Query(None),
+    current_user: User = Depends(get_current_user),
+):
+    """Server-sent ``alert`` events for the organization's alerts as they are recorded."""
+
+    return _event_stream(
+        ALERTS,
+        current_user.organization_id,
+        _matching(severity=severity.value if severity else None, chiller_unit_id=chiller_unit_id),
+    )
@@ -1,105 +1,237 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from src.auth.dependencies import require_service_or_admin
 from src.config import settings
 from src.constants import DEMO_ORG_NAME
-from src.db import get_db_session, get_telemetry_session
-from src.models import (
-    AlertRule,
-    Building,
-    ChillerTelemetry,
-    ChillerUnit,
-    Organization,
-    User,
-)
+from src.db import get_async_db_session, get_async_telemetry_session
+from src.models import AlertEvent, User
 from src.services.alert_engine import evaluate_alerts_for_payload
-from src.schemas.telemetry import TelemetryIngestRequest, TelemetryResponse
+from src.services.chiller_cache import ChillerRoute, chiller_route_cache
+from src.services.ingest_buffer import BufferFullError, telemetry_buffer
+from src.services.live_events import publish_alerts, publish_readings
+from src.services.telemetry_aggregates import derived_values
+from src.services.telemetry_writer import insert_telemetry_rows
+from src.schemas.telemetry import (
+    TelemetryBatchIngestRequest,
+    TelemetryBatchItemResult,
+    TelemetryBatchResponse,
+    TelemetryIngestRequest,
+    TelemetryResponse,
+)
 
 router = APIRouter(prefix="/telemetry", tags=["telemetry"])
 
 
-def _get_chiller_for_request(
-    payload: TelemetryIngestRequest,
+def _resolve_routes(
     db: Session,
+    unit_ids: set[int],
     current_user: User | None,
     service_authenticated: bool,
-) -> ChillerUnit:
-    query = db.query(ChillerUnit).join(Building)
+) -> dict[int, ChillerRoute]:
+    """Return cached routes for the chillers the caller is allowed to write to."""
 
-    if service_authenticated:
-        chiller = (
-            query.join(Organization)
-            .filter(
-                ChillerUnit.id == payload.unit_id,
-                Organization.name == DEMO_ORG_NAME,
-            )
-            .first()
+    if not service_authenticated and current_user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated"
         )
-    else:
-        if current_user is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated"
-            )
 
-        chiller = (
-            query.filter(
-                ChillerUnit.id == payload.unit_id,
-                Building.organization_id == current_user.organization_id,
-            )
-            .first()
-        )
+    routes = chiller_route_cache.resolve(db, unit_ids)
+    if service_authenticated:
+        return {
+            unit_id: route
+            for unit_id, route in routes.items()
+            if route.organization_name == DEMO_ORG_NAME
+        }
+    return {
+        unit_id: route
+        for unit_id, route in routes.items()
+        if route.organization_id == current_user.organization_id
+    }
+
+
+def _get_route_for_request(
+    db: Session,
+    payload: TelemetryIngestRequest,
+    current_user: User | None,
+    service_authenticated: bool,
+) -> ChillerRoute:
+    route = _resolve_routes(db, {payload.unit_id}, current_user, service_authenticated).get(
+        payload.unit_id
+    )
 
-    if chiller is None:
+    if route is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chiller not found")
 
-    return chiller
+    return route
+
+
+def _telemetry_values(
+    payload: TelemetryIngestRequest, organization_id: int, building_id: int
+) -> dict:
+    values = {
+        "organization_id": organization_id,
+        "building_id": building_id,
+        "chiller_unit_id": payload.unit_id,
+        "timestamp": payload.timestamp,
+        "inlet_temp": payload.inlet_temp,
+        "outlet_temp": payload.outlet_temp,
+        "power_kw": payload.power_kw,
+        "flow_rate": payload.flow_rate,
+        "cop": payload.cop,
+    }
+    values.update(derived_values(values))
+    return values
+
+
+def _evaluate_alerts(db: Session, checks: list[tuple[int, dict]]) -> list[tuple[int, AlertEvent]]:
+    """Evaluate each reading's alert rules; the events recorded, with their organization."""
+
+    events = []
+    for chiller_unit_id, values in checks:
+        for event in evaluate_alerts_for_payload(db, chiller_unit_id, values):
+            events.append((values["organization_id"], event))
+    return events
+
+
+def _enqueue_telemetry(rows: list[dict]) -> None:
+    try:
+        telemetry_buffer.submit(rows)
+    except BufferFullError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(exc),
+            headers={"Retry-After": str(max(1, round(settings.telemetry_flush_max_latency_seconds)))},
+        ) from exc
 
 
 @router.post("/ingest", response_model=TelemetryResponse, status_code=status.HTTP_201_CREATED)
-def ingest_telemetry(
+async def ingest_telemetry(
     payload: TelemetryIngestRequest,
     request: Request,
-    db: Session = Depends(get_db_session),
-    telemetry_db: Session = Depends(get_telemetry_session),
+    db: AsyncSession = Depends(get_async_db_session),
+    telemetry_db: AsyncSession = Depends(get_async_telemetry_session),
 ):
     service_authenticated = request.headers.get("X-Service-Token") == settings.service_token
     current_user: User | None = getattr(request.state, "user", None)
 
-    chiller = _get_chiller_for_request(payload, db, current_user, service_authenticated)
-
-    telemetry = ChillerTelemetry(
-        organization_id=chiller.building.organization_id,
-        building_id=chiller.building_id,
-        chiller_unit_id=chiller.id,
-        timestamp=payload.timestamp,
-        inlet_temp=payload.inlet_temp,
-        outlet_temp=payload.outlet_temp,
-        power_kw=payload.power_kw,
-        flow_rate=payload.flow_rate,
-        cop=payload.cop,
-    )
-    telemetry_db.add(telemetry)
+    route = await db.run_sync(_get_route_for_request, payload, current_user, service_authenticated)
+    values = _telemetry_values(payload, route.organization_id, route.building_id)
+
+    if settings.telemetry_write_behind:
+        # A full buffer turns the reading away before any alert is evaluated for it.
+        _enqueue_telemetry([values])
+        alerts = await db.run_sync(_evaluate_alerts, [(route.chiller_unit_id, values)])
+        await db.commit()
+        publish_readings([values])
+        publish_alerts(alerts)
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={
+                "status": "queued",
+                "unit_id": payload.unit_id,
+                "timestamp": payload.timestamp.isoformat(),
+            },
+        )
+
+    alerts = await db.run_sync(_evaluate_alerts, [(route.chiller_unit_id, values)])
+    (telemetry_id,) = await telemetry_db.run_sync(insert_telemetry_rows, [values], return_ids=True)
+    await telemetry_db.commit()
+    await db.commit()
+    publish_readings([values])
+    publish_alerts(alerts)
 
-    rules = (
-        db.query(AlertRule)
-        .filter(AlertRule.chiller_unit_id == chiller.id, AlertRule.is_active.is_(True))
-        .all()
+    return TelemetryResponse(id=telemetry_id, **payload.model_dump())
+
+
+@router.post("/ingest/batch", response_model=TelemetryBatchResponse)
+async def ingest_telemetry_batch(
+    payload: TelemetryBatchIngestRequest,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db_session),
+    telemetry_db: AsyncSession = Depends(get_async_telemetry_session),
+):
+    """Ingest many readings across chillers with one scoped lookup and one bulk insert."""
+
+    if len(payload.readings) > settings.telemetry_batch_max_size:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch exceeds {settings.telemetry_batch_max_size} readings",
+        )
+
+    service_authenticated = request.headers.get("X-Service-Token") == settings.service_token
+    current_user: User | None = getattr(request.state, "user", None)
+
+    routes = await db.run_sync(
+        _resolve_routes,
+        {reading.unit_id for reading in payload.readings},
+        current_user,
+        service_authenticated,
     )
-    evaluate_alerts_for_payload(db, chiller.id, payload, rules)
-
-    telemetry_db.commit()
-    telemetry_db.refresh(telemetry)
-    db.commit()
-
-    return TelemetryResponse(
-        id=telemetry.id,
-        unit_id=telemetry.chiller_unit_id,
-        timestamp=telemetry.timestamp,
-        inlet_temp=telemetry.inlet_temp,
-        outlet_temp=telemetry.outlet_temp,
-        power_kw=telemetry.power_kw,
-        flow_rate=telemetry.flow_rate,
-        cop=telemetry.cop,
+
+    results: list[TelemetryBatchItemResult] = []
+    rows: list[dict] = []
+    alert_checks: list[tuple[int, dict]] = []
+    accepted_results: list[TelemetryBatchItemResult] = []
+    for index, reading in enumerate(payload.readings):
+        route = routes.get(reading.unit_id)
+        if route is None:
+            results.append(
+                TelemetryBatchItemResult(
+                    index=index,
+                    unit_id=reading.unit_id,
+                    status="rejected",
+                    detail="Chiller not found",
+                )
+            )
+            continue
+
+        values = _telemetry_values(reading, route.organization_id, route.building_id)
+        rows.append(values)
+        alert_checks.append((reading.unit_id, values))
+        result = TelemetryBatchItemResult(index=index, unit_id=reading.unit_id, status="created")
+        results.append(result)
+        accepted_results.append(result)
+
+    response = TelemetryBatchResponse(
+        accepted=len(rows),
+        rejected=len(results) - len(rows),
+        results=results,
     )
+    if not rows:
+        return response
+
+    if settings.telemetry_write_behind:
+        # A full buffer turns the batch away before any alert is evaluated for it.
+        _enqueue_telemetry(rows)
+        alerts = await db.run_sync(_evaluate_alerts, alert_checks)
+        await db.commit()
+        publish_readings(rows)
+        publish_alerts(alerts)
+        for result in accepted_results:
+            result.status = "queued"
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED, content=response.model_dump(mode="json")
+        )
+
+    alerts = await db.run_sync(_evaluate_alerts, alert_checks)
+    ids = await telemetry_db.run_sync(insert_telemetry_rows, rows, return_ids=True)
+    for result, telemetry_id in zip(accepted_results, ids):
+        result.id = telemetry_id
+
+    await telemetry_db.commit()
+    await db.commit()
+    publish_readings(rows)
+    publish_alerts(alerts)
+    return response
+
+
+@router.get("/ingest/stats", dependencies=[Depends(require_service_or_admin)])
+async def ingest_stats():
+    """Expose write-behind queue depth and flush timings."""
+
+    return telemetry_buffer.stats()
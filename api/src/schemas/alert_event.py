@@ -24,8 +24,10 @@ class AlertEventResponse(BaseModel):
 class AlertSummaryResponse(BaseModel):
     total: int
     by_severity: dict[str, int]
+    unacknowledged: int = 0
 
 
 class AlertFeedResponse(BaseModel):
     summary: AlertSummaryResponse
     alerts: list[AlertEventResponse]
+    next_cursor: Optional[str] = None
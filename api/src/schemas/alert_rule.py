@@ -5,7 +5,7 @@ from typing import Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
-from src.models.alert_rule import AlertSeverity, ConditionOperator
+from src.models.alert_rule import AlertSeverity, AlertWindowType, ConditionOperator
 
 
 class AlertRuleBase(BaseModel):
@@ -15,6 +15,11 @@ class AlertRuleBase(BaseModel):
     condition_operator: ConditionOperator
     threshold_value: float
     severity: AlertSeverity
+    window_type: AlertWindowType = AlertWindowType.INSTANT
+    window_seconds: Optional[int] = Field(default=None, gt=0)
+    window_count: Optional[int] = Field(default=None, gt=0)
+    cooldown_seconds: int = Field(default=0, ge=0)
+    hysteresis: float = Field(default=0.0, ge=0)
     is_active: bool = True
     recipient_emails: list[str] = Field(default_factory=list)
 
@@ -29,6 +34,11 @@ class AlertRuleUpdate(BaseModel):
     condition_operator: Optional[ConditionOperator] = None
     threshold_value: Optional[float] = None
     severity: Optional[AlertSeverity] = None
+    window_type: Optional[AlertWindowType] = None
+    window_seconds: Optional[int] = Field(default=None, gt=0)
+    window_count: Optional[int] = Field(default=None, gt=0)
+    cooldown_seconds: Optional[int] = Field(default=None, ge=0)
+    hysteresis: Optional[float] = Field(default=None, ge=0)
     is_active: Optional[bool] = None
     recipient_emails: Optional[list[str]] = None
 
@@ -40,3 +50,31 @@ class AlertRuleResponse(AlertRuleBase):
     updated_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class HistogramBinResponse(BaseModel):
+    lower: float
+    upper: float
+    count: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class AlertRuleBacktestResponse(BaseModel):
+    alert_rule_id: int
+    metric_key: str
+    start: datetime
+    end: datetime
+    readings: int
+    matching_readings: int
+    first_match_at: Optional[datetime] = None
+    last_match_at: Optional[datetime] = None
+    fires: int
+    first_fire_at: Optional[datetime] = None
+    last_fire_at: Optional[datetime] = None
+    minimum: Optional[float] = None
+    maximum: Optional[float] = None
+    mean: Optional[float] = None
+    histogram: list[HistogramBinResponse]
+
+    model_config = ConfigDict(from_attributes=True)
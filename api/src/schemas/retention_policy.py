@@ -0,0 +1,66 @@
+from datetime import datetime
+from typing import Literal, Optional
+
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+RetentionTier = Literal["raw", "minute", "hour", "day", "month"]
+
+# Finest first; a coarser tier may never be kept for less time than a finer one.
+RETENTION_TIERS: tuple[RetentionTier, ...] = ("raw", "minute", "hour", "day", "month")
+
+
+class RetentionPolicyPayload(BaseModel):
+    """Retention in days per tier; ``null`` keeps the tier forever."""
+
+    raw_retention_days: Optional[int] = Field(None, ge=1)
+    minute_retention_days: Optional[int] = Field(None, ge=1)
+    hour_retention_days: Optional[int] = Field(None, ge=1)
+    day_retention_days: Optional[int] = Field(None, ge=1)
+    month_retention_days: Optional[int] = Field(None, ge=1)
+
+    @model_validator(mode="after")
+    def check_tiers_widen(self) -> "RetentionPolicyPayload":
+        previous: tuple[str, float] | None = None
+        for tier in RETENTION_TIERS:
+            days = getattr(self, f"{tier}_retention_days")
+            value = float("inf") if days is None else days
+            if previous is not None and value < previous[1]:
+                raise ValueError(
+                    f"{tier} data must be kept at least as long as {previous[0]} data"
+                )
+            previous = (tier, value)
+        return self
+
+
+class RetentionPolicyResponse(RetentionPolicyPayload):
+    organization_id: int
+    updated_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class RetentionTargetReport(BaseModel):
+    organization_id: int
+    tier: RetentionTier
+    cutoff: datetime
+    effective_cutoff: Optional[datetime]
+    rows: int
+    bytes: int
+    complete: bool
+
+
+class RetentionRunReport(BaseModel):
+    dry_run: bool
+    started_at: datetime
+    finished_at: Optional[datetime]
+    rows: int
+    bytes: int
+    targets: list[RetentionTargetReport]
+
+
+class RetentionStatusResponse(BaseModel):
+    running: bool
+    runs: int
+    failures: int
+    last_error: Optional[str]
+    last_run: Optional[RetentionRunReport]
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 from datetime import datetime
+from typing import Literal, Optional
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class TelemetryIngestRequest(BaseModel):
@@ -26,3 +27,21 @@ class TelemetryResponse(BaseModel):
     cop: float
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class TelemetryBatchIngestRequest(BaseModel):
+    readings: list[TelemetryIngestRequest] = Field(..., min_length=1)
+
+
+class TelemetryBatchItemResult(BaseModel):
+    index: int
+    unit_id: int
+    status: Literal["created", "queued", "rejected"]
+    id: Optional[int] = None
+    detail: Optional[str] = None
+
+
+class TelemetryBatchResponse(BaseModel):
+    accepted: int
+    rejected: int
+    results: list[TelemetryBatchItemResult]
@@ -28,6 +28,8 @@ from src.models import (
     User,
     UserRole,
 )
+from src.services.partitions import telemetry_partitions
+from src.services.telemetry_aggregates import derived_values
 
 def _database_is_empty(session: Session) -> bool:
     return session.query(Organization).count() == 0
@@ -165,19 +167,18 @@ def _generate_historical_telemetry_for_chiller(
         outlet_temp = round(inlet_temp - delta_t, 2)
         cop = round(random.uniform(3.0, 5.0) * seasonal_factor, 2)
 
-        telemetry_records.append(
-            ChillerTelemetry(
-                organization_id=chiller.building.organization_id,
-                building_id=chiller.building_id,
-                chiller_unit_id=chiller.id,
-                timestamp=timestamp,
-                inlet_temp=inlet_temp,
-                outlet_temp=outlet_temp,
-                power_kw=power_kw,
-                flow_rate=flow_rate,
-                cop=cop,
-            )
-        )
+        values = {
+            "organization_id": chiller.building.organization_id,
+            "building_id": chiller.building_id,
+            "chiller_unit_id": chiller.id,
+            "timestamp": timestamp,
+            "inlet_temp": inlet_temp,
+            "outlet_temp": outlet_temp,
+            "power_kw": power_kw,
+            "flow_rate": flow_rate,
+            "cop": cop,
+        }
+        telemetry_records.append(ChillerTelemetry(**values, **derived_values(values)))
 
     return telemetry_records
 
@@ -194,6 +195,9 @@ def _populate_historical_telemetry(
     for chiller in chillers:
         records.extend(_generate_historical_telemetry_for_chiller(chiller))
 
+    telemetry_partitions.ensure_for(
+        telemetry_session.get_bind(), (record.timestamp for record in records)
+    )
     telemetry_session.bulk_save_objects(records)
 
 
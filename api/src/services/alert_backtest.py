@@ -0,0 +1,233 @@
+"""Replaying alert rules over stored telemetry to see how often they would have fired.
+
+One aggregate query counts the readings in range, how many of them meet the rule's
+condition and when the first and last of those were taken. The readings are then
+streamed in timestamp order, ``chunk_size`` rows at a time, as NumPy arrays: each chunk
+adds to a fixed-bin histogram of the metric and advances the same state machine as live
+evaluation (window, hysteresis and cooldown), with the state carried over to the next
+chunk. Memory stays bounded by the chunk size however long the range is, and no Python
+code runs per reading.
+
+Cooldowns are measured between reading timestamps, where live evaluation measures them
+between the times readings arrived. Timestamps are as precise as the database's date
+functions: microseconds on Postgres, milliseconds on SQLite.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+import numpy as np
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from src.models import AlertWindowType, ChillerTelemetry
+from .alert_rule_index import IndexedAlertRule
+from .time_buckets import as_utc, epoch_expression, parse_bucket
+
+CHUNK_SIZE = 50_000
+
+
+@dataclass(frozen=True)
+class HistogramBin:
+    lower: float
+    upper: float
+    count: int
+
+
+@dataclass
+class BacktestResult:
+    alert_rule_id: int
+    metric_key: str
+    start: datetime
+    end: datetime
+    readings: int = 0
+    matching_readings: int = 0
+    first_match_at: datetime | None = None
+    last_match_at: datetime | None = None
+    fires: int = 0
+    first_fire_at: datetime | None = None
+    last_fire_at: datetime | None = None
+    minimum: float | None = None
+    maximum: float | None = None
+    mean: float | None = None
+    histogram: list[HistogramBin] = field(default_factory=list)
+
+
+def _at(epoch: float | None) -> datetime | None:
+    return None if epoch is None else datetime.fromtimestamp(epoch, timezone.utc)
+
+
+class _Replay:
+    """The live state machine of one rule, fed whole arrays of readings at a time."""
+
+    def __init__(self, rule: IndexedAlertRule) -> None:
+        self.rule = rule
+        self.firing = False
+        self.last_fired: float | None = None
+        self.fires = 0
+        self.first_fired: float | None = None
+        # CONSECUTIVE: matching readings in a row at the end of the previous chunk.
+        self.run = 0
+        # AVERAGE: readings still inside the window, and when the current window began.
+        self.tail_times = np.empty(0)
+        self.tail_values = np.empty(0)
+        self.started: float = np.nan
+
+    def feed(self, times: np.ndarray, values: np.ndarray) -> None:
+        rule = self.rule
+        if rule.window_type is AlertWindowType.AVERAGE:
+            values, judged = self._average(times, values)
+            breached = judged & rule.compare(values, rule.threshold_value)
+            cleared = judged & ~rule.compare(values, rule.clear_threshold)
+        else:
+            breached = rule.compare(values, rule.threshold_value)
+            cleared = ~rule.compare(values, rule.clear_threshold)
+            if rule.window_type is AlertWindowType.CONSECUTIVE:
+                breached = self._consecutive(breached) >= rule.window_count
+        if rule.cooldown_seconds:
+            self._scan(times, breached, cleared)
+        else:
+            self._edges(times, breached, cleared)
+
+    def _consecutive(self, matched: np.ndarray) -> np.ndarray:
+        positions = np.arange(len(matched))
+        last_miss = np.maximum.accumulate(np.where(matched, -1, positions))
+        runs = np.where(last_miss < 0, positions + 1 + self.run, positions - last_miss)
+        self.run = int(runs[-1])
+        return runs
+
+    def _average(self, times: np.ndarray, values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Window means at each reading and whether the window was covered (cf. ``_AverageWindow``)."""
+
+        span = float(self.rule.window_seconds)
+        carried = len(self.tail_times)
+        all_times = np.concatenate((self.tail_times, times))
+        all_values = np.concatenate((self.tail_values, values))
+        positions = np.arange(len(all_times))
+        sums = np.concatenate(([0.0], np.cumsum(all_values)))
+        # The window at a reading holds the readings taken less than ``span`` before it.
+        first = np.searchsorted(all_times, all_times - span, side="right")
+        means = (sums[positions + 1] - sums[first]) / (positions + 1 - first)
+        # A reading with nothing else in its window starts a new one after a gap.
+        restarts = np.maximum.accumulate(
+            np.where((first == positions) & (positions >= carried), positions, -1)
+        )
+        started = np.where(restarts >= 0, all_times[np.maximum(restarts, 0)], self.started)
+        judged = all_times - started >= span
+
+        keep = all_times > all_times[-1] - span
+        self.tail_times, self.tail_values = all_times[keep], all_values[keep]
+        self.started = float(started[-1])
+        return means[carried:], judged[carried:]
+
+    def _edges(self, times: np.ndarray, breached: np.ndarray, cleared: np.ndarray) -> None:
+        # Without a cooldown the state is that of the last reading which breached or
+        # cleared the rule, and every OK -> FIRING step is a fire.
+        positions = np.arange(len(times))
+        decisive = np.maximum.accumulate(np.where(breached | cleared, positions, -1))
+        firing = np.where(decisive >= 0, breached[np.maximum(decisive, 0)], self.firing)
+        previous = np.concatenate(([self.firing], firing[:-1]))
+        fired = np.flatnonzero(firing & ~previous)
+        self.firing = bool(firing[-1])
+        if len(fired):
+            self._record(times[fired[0]], len(fired), times[fired[-1]])
+
+    def _scan(self, times: np.ndarray, breached: np.ndarray, cleared: np.ndarray) -> None:
+        # With a cooldown, jump from one fire to the next: the first clearing reading,
+        # then the first breaching reading once the cooldown has passed.
+        hits = np.flatnonzero(breached)
+        clears = np.flatnonzero(cleared)
+        position = 0
+        while True:
+            if self.firing:
+                index = np.searchsorted(clears, position)
+                if index == len(clears):
+                    return
+                self.firing = False
+                position = clears[index] + 1
+            earliest = position
+            if self.last_fired is not None:
+                earliest = max(earliest, np.searchsorted(times, self.last_fired + self.rule.cooldown_seconds))
+            index = np.searchsorted(hits, earliest)
+            if index == len(hits):
+                return
+            fired = hits[index]
+            self.firing = True
+            self._record(times[fired], 1, times[fired])
+            position = fired + 1
+
+    def _record(self, first: float, count: int, last: float) -> None:
+        if self.first_fired is None:
+            self.first_fired = float(first)
+        self.fires += count
+        self.last_fired = float(last)
+
+
+def backtest_rule(
+    telemetry_db: Session,
+    rule: IndexedAlertRule,
+    organization_id: int,
+    start: datetime,
+    end: datetime,
+    bins: int = 20,
+    chunk_size: int = CHUNK_SIZE,
+) -> BacktestResult:
+    """Replay ``rule`` over its chiller's readings taken in ``[start, end)``."""
+
+    start, end = as_utc(start), as_utc(end)
+    result = BacktestResult(alert_rule_id=rule.id, metric_key=rule.metric_key, start=start, end=end)
+    column = getattr(ChillerTelemetry, rule.metric_key)
+    filters = (
+        ChillerTelemetry.organization_id == organization_id,
+        ChillerTelemetry.chiller_unit_id == rule.chiller_unit_id,
+        ChillerTelemetry.timestamp >= start,
+        ChillerTelemetry.timestamp < end,
+        column.is_not(None),
+    )
+    matches = rule.compare(column, rule.threshold_value)
+    summary = telemetry_db.execute(
+        select(
+            func.count(column),
+            func.sum(case((matches, 1), else_=0)),
+            func.min(case((matches, ChillerTelemetry.timestamp))),
+            func.max(case((matches, ChillerTelemetry.timestamp))),
+            func.min(column),
+            func.max(column),
+            func.avg(column),
+        ).where(*filters)
+    ).one()
+    readings, matching, first_match, last_match, minimum, maximum, mean = summary
+    if not readings:
+        return result
+    result.readings = readings
+    result.matching_readings = int(matching or 0)
+    result.first_match_at = parse_bucket(first_match) if first_match is not None else None
+    result.last_match_at = parse_bucket(last_match) if last_match is not None else None
+    result.minimum, result.maximum, result.mean = float(minimum), float(maximum), float(mean)
+
+    replay = _Replay(rule)
+    counts = np.zeros(bins, dtype=np.int64)
+    value_range = (result.minimum, result.maximum)
+    stream = telemetry_db.execute(
+        select(epoch_expression(ChillerTelemetry.timestamp, telemetry_db.get_bind().dialect.name), column)
+        .where(*filters)
+        .order_by(ChillerTelemetry.timestamp, ChillerTelemetry.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    for rows in stream.partitions():
+        chunk = np.array(rows, dtype=np.float64).reshape(-1, 2)
+        # Rounding to the microsecond irons out floating point noise from the database.
+        times, values = np.round(chunk[:, 0], 6), chunk[:, 1]
+        counts += np.histogram(values, bins=bins, range=value_range)[0]
+        replay.feed(times, values)
+
+    edges = np.histogram_bin_edges(np.empty(0), bins=bins, range=value_range)
+    result.histogram = [
+        HistogramBin(lower=float(edges[index]), upper=float(edges[index + 1]), count=int(counts[index]))
+        for index in range(bins)
+    ]
+    result.fires = replay.fires
+    result.first_fire_at = _at(replay.first_fired)
+    result.last_fire_at = _at(replay.last_fired)
+    return result
@@ -0,0 +1,120 @@
+"""Alert event counts maintained alongside the events.
+
+Counters are keyed by organization, severity, UTC day of ``triggered_at`` and chiller.
+Recording an event adds one to its counter's ``total`` and acknowledging it adds one
+to ``acknowledged``, in the same transaction and through an upsert so that concurrent
+writers never race on creating the row. Alert summaries then sum a few counter rows
+instead of grouping events. Events whose chiller was deleted stay counted under it, as
+they stay in their organization's feed.
+"""
+from __future__ import annotations
+
+from datetime import date
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from src.models import AlertEvent, AlertEventCounter, AlertSeverity, Building, ChillerUnit
+from .time_buckets import as_utc
+
+_KEY = ("organization_id", "severity", "day", "chiller_unit_id")
+
+
+def _upsert_statement(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:  # pragma: no cover - only Postgres and SQLite are supported
+        return None
+
+    table = AlertEventCounter.__table__
+    statement = dialect_insert(table)
+    return statement.on_conflict_do_update(
+        index_elements=list(_KEY),
+        set_={
+            "total": table.c.total + statement.excluded.total,
+            "acknowledged": table.c.acknowledged + statement.excluded.acknowledged,
+        },
+    )
+
+
+def _increment(db: Session, key: dict, total: int, acknowledged: int) -> None:
+    statement = _upsert_statement(db)
+    if statement is None:  # pragma: no cover - only Postgres and SQLite are supported
+        counter = db.get(AlertEventCounter, tuple(key[name] for name in _KEY))
+        if counter is None:
+            counter = AlertEventCounter(**key, total=0, acknowledged=0)
+            db.add(counter)
+        counter.total += total
+        counter.acknowledged += acknowledged
+        return
+    db.execute(statement, [{**key, "total": total, "acknowledged": acknowledged}])
+
+
+def _counter_key(db: Session, organization_id: int | None, event: AlertEvent) -> dict | None:
+    if event.chiller_unit_id is None:
+        return None
+    if organization_id is None:
+        organization_id = event.organization_id
+    if organization_id is None:
+        organization_id = db.scalar(
+            select(Building.organization_id).join(ChillerUnit).where(ChillerUnit.id == event.chiller_unit_id)
+        )
+        if organization_id is None:
+            return None
+    return {
+        "organization_id": organization_id,
+        "severity": event.severity,
+        "day": as_utc(event.triggered_at).date(),
+        "chiller_unit_id": event.chiller_unit_id,
+    }
+
+
+def count_alert_event(db: Session, organization_id: int | None, event: AlertEvent) -> None:
+    """Count a newly recorded event, in the caller's transaction."""
+
+    key = _counter_key(db, organization_id, event)
+    if key is not None:
+        _increment(db, key, total=1, acknowledged=0)
+
+
+def count_acknowledgement(db: Session, organization_id: int | None, event: AlertEvent) -> None:
+    """Count an event that has just been acknowledged, in the caller's transaction."""
+
+    key = _counter_key(db, organization_id, event)
+    if key is not None:
+        _increment(db, key, total=0, acknowledged=1)
+
+
+def alert_counts(
+    db: Session,
+    organization_id: int,
+    severity: AlertSeverity | None = None,
+    chiller_unit_id: int | None = None,
+    since: date | None = None,
+) -> dict[AlertSeverity, tuple[int, int]]:
+    """``(total, acknowledged)`` events by severity for the organization.
+
+    Optionally limited to one severity or chiller, or to events from the UTC day
+    ``since`` onwards.
+    """
+
+    query = (
+        select(
+            AlertEventCounter.severity,
+            func.sum(AlertEventCounter.total),
+            func.sum(AlertEventCounter.acknowledged),
+        )
+        .where(AlertEventCounter.organization_id == organization_id)
+        .group_by(AlertEventCounter.severity)
+    )
+    if severity is not None:
+        query = query.where(AlertEventCounter.severity == severity)
+    if chiller_unit_id is not None:
+        query = query.where(AlertEventCounter.chiller_unit_id == chiller_unit_id)
+    if since is not None:
+        query = query.where(AlertEventCounter.day >= since)
+    return {row[0]: (int(row[1]), int(row[2])) for row in db.execute(query) if row[1]}
+
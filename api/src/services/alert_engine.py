@@ -1,44 +1,31 @@
 """Utility functions for evaluating alert rules and notifying recipients."""
 from __future__ import annotations
 
-import logging
-from typing import Iterable
+from datetime import datetime, timezone
+from typing import Mapping
 
+from sqlalchemy import event, select
 from sqlalchemy.orm import Session
 
-from src.models import AlertEvent, AlertRule, ConditionOperator
-from src.schemas.telemetry import TelemetryIngestRequest
-from .email import send_email
+from src.models import AlertEvent, AlertRule, AlertWindowType, Building, ChillerUnit
+from .alert_counters import count_alert_event
+from .alert_rule_index import IndexedAlertRule, RulesByMetric, alert_rule_index
+from .alert_state import alert_state_store
+from .alert_windows import alert_window_engine
+from .notifications import queue_email
 
-logger = logging.getLogger(__name__)
+# Session.info key holding the emails of events not committed yet.
+_PENDING_EMAILS = "alert_emails"
 
 
-def _metric_value(payload: TelemetryIngestRequest, metric_key: str) -> float | None:
-    delta_t = payload.inlet_temp - payload.outlet_temp
-    mapping = {
-        "power_kw": payload.power_kw,
-        "delta_t": delta_t,
-        "cop": payload.cop,
-        "flow_rate": payload.flow_rate,
-    }
-    return mapping.get(metric_key)
-
-
-def _condition_met(operator: ConditionOperator, actual: float, threshold: float) -> bool:
-    if operator == ConditionOperator.GT:
-        return actual > threshold
-    if operator == ConditionOperator.GTE:
-        return actual >= threshold
-    if operator == ConditionOperator.LT:
-        return actual < threshold
-    if operator == ConditionOperator.LTE:
-        return actual <= threshold
-    return False
-
-
-def _render_message(rule: AlertRule, metric_value: float) -> str:
+def _render_message(rule: AlertRule | IndexedAlertRule, metric_value: float) -> str:
+    subject = rule.metric_key
+    if rule.window_type == AlertWindowType.AVERAGE:
+        subject = f"average {rule.metric_key} over {rule.window_seconds}s"
+    elif rule.window_type == AlertWindowType.CONSECUTIVE:
+        subject = f"{rule.metric_key} for {rule.window_count} consecutive readings,"
     return (
-        f"{rule.name}: {rule.metric_key} {metric_value:.2f} "
+        f"{rule.name}: {subject} {metric_value:.2f} "
         f"{rule.condition_operator.value} {rule.threshold_value:.2f}"
     )
 
@@ -46,44 +33,92 @@ def _render_message(rule: AlertRule, metric_value: float) -> str:
 def evaluate_alerts_for_payload(
     db: Session,
     chiller_unit_id: int,
-    payload: TelemetryIngestRequest,
-    rules: Iterable[AlertRule],
+    values: Mapping[str, object],
+    rules: RulesByMetric | None = None,
+    now: datetime | None = None,
 ) -> list[AlertEvent]:
-    """Evaluate telemetry payload against alert rules and record events.
+    """Evaluate a telemetry reading against alert rules and record events.
+
+    ``values`` is the reading as stored, derived columns included, so rules on
+    ``delta_t``, ``cooling_load_rth`` or ``kw_per_ton`` read them directly.
+    ``rules`` defaults to the chiller's entry in the in-memory rule index.
+
+    Events are recorded only when a rule moves from OK to FIRING (see
+    :mod:`src.services.alert_state`), so a chiller staying out of bounds produces one
+    event and one email until the condition clears.
 
-    Email notifications are attempted but will not raise if email delivery fails.
+    Windows and rule states change and email notifications are queued only once
+    ``db`` commits, so a failed ingest neither counts its readings, silences the rule
+    nor notifies anyone; the background dispatcher delivers the emails.
     """
 
+    if rules is None:
+        rules = alert_rule_index.rules_for(db, chiller_unit_id)
+    now = now or datetime.now(timezone.utc)
+    observed_at = values.get("timestamp") or now
+
     events: list[AlertEvent] = []
-    for rule in rules:
-        metric_value = _metric_value(payload, rule.metric_key)
+    for metric_key, metric_rules in rules.items():
+        metric_value = values.get(metric_key)
         if metric_value is None:
             continue
-        if not _condition_met(rule.condition_operator, metric_value, rule.threshold_value):
-            continue
-
-        message = _render_message(rule, metric_value)
-        event = AlertEvent(
-            alert_rule_id=rule.id,
-            chiller_unit_id=chiller_unit_id,
-            severity=rule.severity,
-            metric_key=rule.metric_key,
-            metric_value=metric_value,
-            message=message,
-        )
-        db.add(event)
-        events.append(event)
-
-        if rule.recipient_emails:
-            try:
-                send_email(
-                    to_addresses=rule.recipient_emails,
-                    subject=f"Chiller Alert: {rule.name}",
-                    body=message,
+        for rule in metric_rules:
+            observation = alert_window_engine.observe(rule, metric_value, observed_at, db)
+            if observation is not None and alert_state_store.transition(db, rule, observation, now):
+                events.append(
+                    _record_event(
+                        db, values.get("organization_id"), chiller_unit_id, rule, observation.value, now
+                    )
                 )
-            except Exception as exc:  # pragma: no cover - defensive logging
-                logger.warning("Failed to send alert email for rule %s: %s", rule.id, exc)
 
     if events:
         db.flush()
     return events
+
+
+def _record_event(
+    db: Session,
+    organization_id: int | None,
+    chiller_unit_id: int,
+    rule: IndexedAlertRule,
+    metric_value: float,
+    triggered_at: datetime,
+) -> AlertEvent:
+    message = _render_message(rule, metric_value)
+    if organization_id is None:
+        organization_id = db.scalar(
+            select(Building.organization_id).join(ChillerUnit).where(ChillerUnit.id == chiller_unit_id)
+        )
+    event = AlertEvent(
+        alert_rule_id=rule.id,
+        chiller_unit_id=chiller_unit_id,
+        organization_id=organization_id,
+        severity=rule.severity,
+        metric_key=rule.metric_key,
+        metric_value=metric_value,
+        message=message,
+        triggered_at=triggered_at,
+    )
+    db.add(event)
+    count_alert_event(db, organization_id, event)
+
+    if rule.recipient_emails:
+        db.info.setdefault(_PENDING_EMAILS, []).append(
+            {
+                "to_addresses": rule.recipient_emails,
+                "subject": f"Chiller Alert: {rule.name}",
+                "body": message,
+            }
+        )
+    return event
+
+
+@event.listens_for(Session, "after_commit")
+def _queue_committed_emails(session: Session) -> None:
+    for email in session.info.pop(_PENDING_EMAILS, None) or ():
+        queue_email(**email)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_emails(session: Session) -> None:
+    session.info.pop(_PENDING_EMAILS, None)
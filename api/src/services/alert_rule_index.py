@@ -0,0 +1,219 @@
+"""Process-local index of active alert rules used to evaluate readings at ingest.
+
+Rules are grouped by chiller and then by metric, each carrying its comparison as a
+ready-to-call function, so evaluating a reading is a couple of dictionary lookups and
+one call per rule with no database access. The index is loaded in full on first use,
+updated rule by rule by the alert rule endpoints of this process and reloaded
+periodically so that edits made through other worker processes arrive as well.
+"""
+from __future__ import annotations
+
+import operator
+import threading
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Callable, Iterable, Mapping
+
+from sqlalchemy.orm import Session
+
+from src import db as db_module
+from src.models import AlertRule, AlertSeverity, AlertWindowType, ConditionOperator
+
+ALERT_METRICS = ("power_kw", "delta_t", "cop", "flow_rate", "cooling_load_rth", "kw_per_ton")
+
+Comparator = Callable[[float, float], bool]
+
+COMPARATORS: dict[ConditionOperator, Comparator] = {
+    ConditionOperator.GT: operator.gt,
+    ConditionOperator.GTE: operator.ge,
+    ConditionOperator.LT: operator.lt,
+    ConditionOperator.LTE: operator.le,
+}
+
+RulesByMetric = Mapping[str, tuple["IndexedAlertRule", ...]]
+
+_NO_RULES: RulesByMetric = MappingProxyType({})
+
+
+@dataclass(frozen=True)
+class IndexedAlertRule:
+    """Detached snapshot of an active alert rule with its comparison precompiled."""
+
+    id: int
+    chiller_unit_id: int
+    name: str
+    metric_key: str
+    condition_operator: ConditionOperator
+    threshold_value: float
+    severity: AlertSeverity
+    recipient_emails: tuple[str, ...]
+    compare: Comparator = field(repr=False, compare=False)
+    cooldown_seconds: int = 0
+    clear_threshold: float = 0.0
+    window_type: AlertWindowType = AlertWindowType.INSTANT
+    window_seconds: int | None = None
+    window_count: int | None = None
+
+    @classmethod
+    def from_model(cls, rule: AlertRule, active_only: bool = True) -> "IndexedAlertRule | None":
+        """Snapshot ``rule``, or ``None`` when it can never fire at ingest.
+
+        ``active_only=False`` also snapshots disabled rules, e.g. to backtest them.
+        """
+
+        compare = COMPARATORS.get(rule.condition_operator)
+        if (active_only and not rule.is_active) or compare is None or rule.metric_key not in ALERT_METRICS:
+            return None
+        threshold = float(rule.threshold_value)
+        hysteresis = float(rule.hysteresis or 0.0)
+        # A firing rule clears only once the value is ``hysteresis`` past the threshold
+        # on the safe side, so a reading hovering at the threshold does not flap.
+        if rule.condition_operator in (ConditionOperator.GT, ConditionOperator.GTE):
+            clear_threshold = threshold - hysteresis
+        else:
+            clear_threshold = threshold + hysteresis
+        return cls(
+            id=rule.id,
+            chiller_unit_id=rule.chiller_unit_id,
+            name=rule.name,
+            metric_key=rule.metric_key,
+            condition_operator=rule.condition_operator,
+            threshold_value=threshold,
+            severity=rule.severity,
+            recipient_emails=tuple(rule.recipient_emails or ()),
+            compare=compare,
+            cooldown_seconds=int(rule.cooldown_seconds or 0),
+            clear_threshold=clear_threshold,
+            window_type=rule.window_type or AlertWindowType.INSTANT,
+            window_seconds=rule.window_seconds,
+            window_count=rule.window_count,
+        )
+
+    def matches(self, value: float) -> bool:
+        return self.compare(value, self.threshold_value)
+
+    def clears(self, value: float) -> bool:
+        return not self.compare(value, self.clear_threshold)
+
+    @property
+    def windowed(self) -> bool:
+        return self.window_type is not AlertWindowType.INSTANT
+
+
+def _group(rules: Iterable[IndexedAlertRule]) -> RulesByMetric:
+    by_metric: dict[str, list[IndexedAlertRule]] = {}
+    for rule in sorted(rules, key=lambda rule: rule.id):
+        by_metric.setdefault(rule.metric_key, []).append(rule)
+    return MappingProxyType({metric: tuple(grouped) for metric, grouped in by_metric.items()})
+
+
+class AlertRuleIndex:
+    """Active rules keyed by ``chiller_unit_id`` and then ``metric_key``.
+
+    Readers never lock: each chiller's rules are an immutable mapping that writers
+    replace as a whole. A generation counter makes a full load that raced with an
+    incremental update start over instead of overwriting the newer rule.
+    """
+
+    def __init__(self) -> None:
+        self._by_chiller: dict[int, RulesByMetric] = {}
+        self._rules: dict[int, IndexedAlertRule] = {}
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._loaded = False
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def windowed_rules(self) -> list[IndexedAlertRule]:
+        return [rule for rule in list(self._rules.values()) if rule.windowed]
+
+    def rules_for(self, db: Session, chiller_unit_id: int) -> RulesByMetric:
+        """The chiller's active rules by metric, loading the index on first use."""
+
+        if not self._loaded:
+            self.reload(db)
+        return self._by_chiller.get(chiller_unit_id, _NO_RULES)
+
+    def reload(self, db: Session) -> int:
+        """Replace the index with every active rule in the database; returns the rule count."""
+
+        while True:
+            with self._lock:
+                generation = self._generation
+            compiled = [
+                indexed
+                for indexed in map(
+                    IndexedAlertRule.from_model,
+                    db.query(AlertRule).filter(AlertRule.is_active.is_(True)).all(),
+                )
+                if indexed is not None
+            ]
+            with self._lock:
+                if generation != self._generation:
+                    continue
+                self._rules = {rule.id: rule for rule in compiled}
+                by_chiller: dict[int, list[IndexedAlertRule]] = {}
+                for rule in compiled:
+                    by_chiller.setdefault(rule.chiller_unit_id, []).append(rule)
+                self._by_chiller = {unit_id: _group(rules) for unit_id, rules in by_chiller.items()}
+                self._loaded = True
+                return len(compiled)
+
+    def upsert(self, rule: AlertRule) -> None:
+        """Apply a created or edited rule; inactive rules are dropped from the index."""
+
+        indexed = IndexedAlertRule.from_model(rule)
+        with self._lock:
+            self._generation += 1
+            previous = self._rules.pop(rule.id, None)
+            if previous is not None:
+                self._regroup(previous.chiller_unit_id, drop=rule.id)
+            if indexed is not None:
+                self._rules[rule.id] = indexed
+                self._regroup(indexed.chiller_unit_id, add=indexed)
+
+    def remove(self, rule_id: int) -> None:
+        with self._lock:
+            self._generation += 1
+            previous = self._rules.pop(rule_id, None)
+            if previous is not None:
+                self._regroup(previous.chiller_unit_id, drop=rule_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._rules = {}
+            self._by_chiller = {}
+            self._loaded = False
+
+    def _regroup(
+        self, chiller_unit_id: int, drop: int | None = None, add: IndexedAlertRule | None = None
+    ) -> None:
+        rules = [
+            rule
+            for grouped in self._by_chiller.get(chiller_unit_id, _NO_RULES).values()
+            for rule in grouped
+            if rule.id != drop
+        ]
+        if add is not None:
+            rules.append(add)
+        if rules:
+            self._by_chiller[chiller_unit_id] = _group(rules)
+        else:
+            self._by_chiller.pop(chiller_unit_id, None)
+
+
+def run_scheduled_reload() -> int:
+    session = db_module.SessionLocal()
+    try:
+        return alert_rule_index.reload(session)
+    finally:
+        session.close()
+
+
+alert_rule_index = AlertRuleIndex()
@@ -0,0 +1,199 @@
+"""Per-rule alert state kept in memory and checkpointed to the metadata database.
+
+Each rule is either OK or FIRING. A reading that meets the condition of an OK rule
+fires it, which is the only time an event is recorded and an email queued; further
+matching readings are absorbed while the rule is FIRING. The rule returns to OK once a
+reading clears its hysteresis band, and may fire again no sooner than
+``cooldown_seconds`` after it last fired. Transitions are staged on the session that
+records their events and only take effect when it commits, so a rolled back ingest
+leaves the rule as it was. They only touch memory; a periodic checkpoint writes changed
+states to ``alert_rule_states``, from which they are restored when the process starts.
+"""
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, replace
+from datetime import datetime
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from src import db as db_module
+from src.models import AlertRule, AlertRuleState, AlertState
+from .alert_rule_index import IndexedAlertRule
+from .time_buckets import as_utc
+
+# Session.info key holding each store's uncommitted rule states.
+_PENDING_STATES = "alert_state_transitions"
+
+
+@dataclass(frozen=True)
+class Observation:
+    """What one reading says about a rule: the value to report and whether the
+    condition holds (``breached``) or has recovered past the hysteresis band (``cleared``)."""
+
+    value: float
+    breached: bool
+    cleared: bool
+
+
+@dataclass
+class RuleState:
+    state: AlertState = AlertState.OK
+    changed_at: datetime | None = None
+    last_fired_at: datetime | None = None
+    last_value: float | None = None
+
+
+class AlertStateStore:
+    """States of all evaluated rules, keyed by rule id."""
+
+    def __init__(self) -> None:
+        self._states: dict[int, RuleState] = {}
+        self._dirty: set[int] = set()
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def get(self, rule_id: int) -> RuleState:
+        with self._lock:
+            return replace(self._states.get(rule_id) or RuleState())
+
+    def observe(self, db: Session, rule: IndexedAlertRule, value: float, now: datetime) -> bool:
+        """Apply one reading of an instantaneous rule; ``True`` when the rule starts firing."""
+
+        return self.transition(db, rule, Observation(value, rule.matches(value), rule.clears(value)), now)
+
+    def transition(
+        self, db: Session, rule: IndexedAlertRule, observation: Observation, now: datetime
+    ) -> bool:
+        """Apply an observation to the rule's state; ``True`` when the rule starts firing.
+
+        The new state is visible to later observations on ``db`` at once and to the
+        rest of the process once ``db`` commits.
+        """
+
+        value = observation.value
+        if not self._loaded:
+            self.load(db)
+        staged: dict[int, RuleState] = db.info.setdefault(_PENDING_STATES, {}).setdefault(self, {})
+        current = staged.get(rule.id)
+        if current is None:
+            with self._lock:
+                current = replace(self._states.get(rule.id) or RuleState())
+
+        if current.state is AlertState.FIRING:
+            if observation.cleared:
+                current.state = AlertState.OK
+                current.changed_at = now
+                current.last_value = value
+                staged[rule.id] = current
+            return False
+
+        if not observation.breached:
+            return False
+        if (
+            current.last_fired_at is not None
+            and (now - current.last_fired_at).total_seconds() < rule.cooldown_seconds
+        ):
+            return False
+        current.state = AlertState.FIRING
+        current.changed_at = now
+        current.last_fired_at = now
+        current.last_value = value
+        staged[rule.id] = current
+        return True
+
+    def apply(self, states: dict[int, RuleState]) -> None:
+        """Make committed transitions current and due for the next checkpoint."""
+
+        with self._lock:
+            self._states.update(states)
+            self._dirty.update(states)
+
+    def load(self, db: Session) -> int:
+        """Restore checkpointed states; states already changed in memory win."""
+
+        rows = db.scalars(select(AlertRuleState)).all()
+        with self._lock:
+            for row in rows:
+                if row.alert_rule_id in self._states:
+                    continue
+                self._states[row.alert_rule_id] = RuleState(
+                    state=row.state,
+                    changed_at=as_utc(row.changed_at) if row.changed_at else None,
+                    last_fired_at=as_utc(row.last_fired_at) if row.last_fired_at else None,
+                    last_value=row.last_value,
+                )
+            self._loaded = True
+        return len(rows)
+
+    def checkpoint(self, db: Session) -> int:
+        """Write states changed since the last checkpoint; returns the number written."""
+
+        with self._lock:
+            changed = {
+                rule_id: replace(self._states[rule_id]) for rule_id in self._dirty if rule_id in self._states
+            }
+            self._dirty.clear()
+        if not changed:
+            return 0
+
+        try:
+            # Rules deleted through another process keep no state.
+            live = set(db.scalars(select(AlertRule.id).where(AlertRule.id.in_(changed))))
+            existing = db.scalars(select(AlertRuleState).where(AlertRuleState.alert_rule_id.in_(live)))
+            rows = {row.alert_rule_id: row for row in existing}
+            for rule_id in live:
+                row = rows.get(rule_id)
+                if row is None:
+                    row = AlertRuleState(alert_rule_id=rule_id)
+                    db.add(row)
+                state = changed[rule_id]
+                row.state = state.state
+                row.changed_at = state.changed_at
+                row.last_fired_at = state.last_fired_at
+                row.last_value = state.last_value
+            db.commit()
+        except Exception:
+            db.rollback()
+            with self._lock:
+                self._dirty.update(changed)
+            raise
+
+        with self._lock:
+            for rule_id in changed.keys() - live:
+                self._states.pop(rule_id, None)
+        return len(live)
+
+    def forget(self, rule_id: int) -> None:
+        with self._lock:
+            self._states.pop(rule_id, None)
+            self._dirty.discard(rule_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._states.clear()
+            self._dirty.clear()
+            self._loaded = False
+
+
+def run_scheduled_checkpoint() -> int:
+    session = db_module.SessionLocal()
+    try:
+        return alert_state_store.checkpoint(session)
+    finally:
+        session.close()
+
+
+alert_state_store = AlertStateStore()
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed_transitions(session: Session) -> None:
+    for store, states in (session.info.pop(_PENDING_STATES, None) or {}).items():
+        store.apply(states)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_transitions(session: Session) -> None:
+    session.info.pop(_PENDING_STATES, None)
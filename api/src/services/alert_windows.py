@@ -0,0 +1,240 @@
+"""Streaming evaluation of windowed alert rules.
+
+``AVERAGE`` rules compare the mean of the readings received in the last
+``window_seconds`` (by reading timestamp) with the threshold; ``CONSECUTIVE`` rules
+hold once ``window_count`` readings in a row meet the condition. Every rule keeps its
+own window: a deque of ``(timestamp, value)`` with a running sum, or just a counter, so
+each reading updates it in amortised O(1). A reading older than the newest one a rule
+has already seen is ignored. Readings observed through a session are staged on it and
+only reach the windows once it commits, so a failed ingest leaves no trace in them.
+Windows live in memory and are rebuilt from recent telemetry when the API starts.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Iterable
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from src import db as db_module
+from src.models import AlertWindowType, ChillerTelemetry
+from .alert_rule_index import IndexedAlertRule, alert_rule_index
+from .alert_state import Observation
+from .time_buckets import as_utc
+
+logger = logging.getLogger(__name__)
+
+# Session.info key holding each engine's uncommitted readings, by rule.
+_PENDING_READINGS = "alert_window_readings"
+
+
+class _AverageWindow:
+    __slots__ = ("span", "samples", "total", "started_at", "last_at")
+
+    def __init__(self, span_seconds: int) -> None:
+        self.span = timedelta(seconds=span_seconds)
+        self.samples: deque[tuple[datetime, float]] = deque()
+        self.total = 0.0
+        self.started_at: datetime | None = None
+        self.last_at: datetime | None = None
+
+    def add(self, at: datetime, value: float) -> float | None:
+        """Add a reading; the window mean once the window has been covered, else ``None``."""
+
+        horizon = at - self.span
+        while self.samples and self.samples[0][0] <= horizon:
+            self.total -= self.samples.popleft()[1]
+        if not self.samples:
+            # After a gap the window has to fill up again before it is judged.
+            self.total = 0.0
+            self.started_at = at
+        self.samples.append((at, value))
+        self.total += value
+        self.last_at = at
+        if at - self.started_at < self.span:
+            return None
+        return self.total / len(self.samples)
+
+    def copy(self) -> _AverageWindow:
+        window = _AverageWindow.__new__(_AverageWindow)
+        window.span, window.samples, window.total = self.span, deque(self.samples), self.total
+        window.started_at, window.last_at = self.started_at, self.last_at
+        return window
+
+
+class _ConsecutiveCounter:
+    __slots__ = ("count", "last_at")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.last_at: datetime | None = None
+
+    def add(self, at: datetime, matched: bool) -> int:
+        self.count = self.count + 1 if matched else 0
+        self.last_at = at
+        return self.count
+
+    def copy(self) -> _ConsecutiveCounter:
+        counter = _ConsecutiveCounter()
+        counter.count, counter.last_at = self.count, self.last_at
+        return counter
+
+
+def _window_key(rule: IndexedAlertRule) -> tuple:
+    # Samples and runs only hold for the chiller, metric and condition they were taken under.
+    return (
+        rule.chiller_unit_id,
+        rule.metric_key,
+        rule.condition_operator,
+        rule.window_type,
+        rule.window_seconds,
+        rule.window_count,
+    )
+
+
+def _observe(windows: dict, rule: IndexedAlertRule, value: float, at: datetime) -> Observation | None:
+    key = _window_key(rule)
+    entry = windows.get(rule.id)
+    if entry is None or entry[0] != key:
+        window = (
+            _AverageWindow(rule.window_seconds)
+            if rule.window_type is AlertWindowType.AVERAGE
+            else _ConsecutiveCounter()
+        )
+        windows[rule.id] = (key, window)
+    else:
+        window = entry[1]
+    if window.last_at is not None and at < window.last_at:
+        return None
+
+    if isinstance(window, _AverageWindow):
+        mean = window.add(at, value)
+        if mean is None:
+            return None
+        return Observation(mean, rule.matches(mean), rule.clears(mean))
+    count = window.add(at, rule.matches(value))
+    return Observation(value, count >= rule.window_count, rule.clears(value))
+
+
+class AlertWindowEngine:
+    """Windows of the windowed rules, keyed by rule id."""
+
+    def __init__(self) -> None:
+        self._windows: dict[int, tuple[tuple, _AverageWindow | _ConsecutiveCounter]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+    def observe(
+        self, rule: IndexedAlertRule, value: float, at: datetime, db: Session | None = None
+    ) -> Observation | None:
+        """Feed one reading to the rule; ``None`` while its window cannot be judged yet.
+
+        With ``db`` the reading is judged against the window as ``db`` has seen it so
+        far, and is added to the shared window once ``db`` commits.
+        """
+
+        if not rule.windowed:
+            return Observation(value, rule.matches(value), rule.clears(value))
+        at = as_utc(at)
+        if db is None:
+            with self._lock:
+                return _observe(self._windows, rule, value, at)
+
+        staged = db.info.setdefault(_PENDING_READINGS, {}).setdefault(self, {})
+        pending = staged.get(rule.id)
+        if pending is None:
+            with self._lock:
+                entry = self._windows.get(rule.id)
+                view = {} if entry is None else {rule.id: (entry[0], entry[1].copy())}
+            pending = staged[rule.id] = (view, [])
+        view, readings = pending
+        readings.append((rule, value, at))
+        return _observe(view, rule, value, at)
+
+    def apply(self, staged: dict[int, tuple[dict, list]]) -> None:
+        """Add committed readings to the shared windows, after any committed meanwhile."""
+
+        with self._lock:
+            for _, readings in staged.values():
+                for rule, value, at in readings:
+                    _observe(self._windows, rule, value, at)
+
+    def rebuild(self, telemetry_db: Session, rules: Iterable[IndexedAlertRule], now: datetime) -> int:
+        """Refill the windows of ``rules`` from stored telemetry; returns readings replayed."""
+
+        now = as_utc(now)
+        replayed = 0
+        for rule in rules:
+            if not rule.windowed:
+                continue
+            column = getattr(ChillerTelemetry, rule.metric_key)
+            query = select(ChillerTelemetry.timestamp, column).where(
+                ChillerTelemetry.chiller_unit_id == rule.chiller_unit_id, column.is_not(None)
+            )
+            if rule.window_type is AlertWindowType.AVERAGE:
+                start = now - timedelta(seconds=rule.window_seconds)
+                rows = telemetry_db.execute(
+                    query.where(ChillerTelemetry.timestamp > start).order_by(ChillerTelemetry.timestamp)
+                ).all()
+            else:
+                rows = telemetry_db.execute(
+                    query.order_by(ChillerTelemetry.timestamp.desc()).limit(rule.window_count)
+                ).all()[::-1]
+
+            with self._lock:
+                self._windows.pop(rule.id, None)
+                for timestamp, value in rows:
+                    _observe(self._windows, rule, float(value), as_utc(timestamp))
+                entry = self._windows.get(rule.id)
+                if rule.window_type is AlertWindowType.AVERAGE and entry is not None and entry[1].samples:
+                    # Stored history stands in for the time the process was not running.
+                    entry[1].started_at = min(entry[1].started_at, start)
+            replayed += len(rows)
+        return replayed
+
+    def forget(self, rule_id: int) -> None:
+        with self._lock:
+            self._windows.pop(rule_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._windows.clear()
+
+
+
+def rebuild_alert_windows() -> int:
+    """Rebuild every windowed rule's window at startup; failures leave windows empty."""
+
+    session = db_module.SessionLocal()
+    telemetry_session = db_module.TelemetrySessionLocal()
+    try:
+        alert_rule_index.reload(session)
+        return alert_window_engine.rebuild(
+            telemetry_session, alert_rule_index.windowed_rules(), datetime.now(timezone.utc)
+        )
+    except Exception as exc:  # pragma: no cover - defensive logging
+        logger.warning("Could not rebuild alert windows from telemetry: %s", exc)
+        return 0
+    finally:
+        telemetry_session.close()
+        session.close()
+
+
+alert_window_engine = AlertWindowEngine()
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed_readings(session: Session) -> None:
+    for engine, staged in (session.info.pop(_PENDING_READINGS, None) or {}).items():
+        engine.apply(staged)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_readings(session: Session) -> None:
+    session.info.pop(_PENDING_READINGS, None)
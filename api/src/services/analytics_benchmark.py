@@ -0,0 +1,150 @@
+"""Benchmark per-row against columnar formatting of analytics series.
+
+Run with ``python -m src.services.analytics_benchmark [--sizes 10000 100000 1000000]``.
+Synthetic merged buckets are turned into the consumption-efficiency and chiller-trends
+payloads and serialized. The per-row reference is the previous endpoint implementation
+(one dict and several ``round`` calls per bucket, then FastAPI's ``jsonable_encoder``
+and ``json.dumps``); the columnar path is what the endpoints use now.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Sequence
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+from .analytics_columns import (
+    AggregateColumns,
+    consumption_columns,
+    select_rows,
+    to_rows,
+    trend_columns,
+)
+from .telemetry_aggregates import AggregateKey, AggregatePartial
+
+_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def synthetic_partials(buckets: int, units: int = 1) -> dict[AggregateKey, AggregatePartial]:
+    """Minute buckets spread over ``units`` chillers; every 50th bucket has no cooling load."""
+
+    generator = random.Random(11)
+    per_unit = max(1, buckets // units)
+    partials = {}
+    for unit in range(units):
+        for index in range(per_unit):
+            samples = generator.randint(1, 12)
+            cooling = 0.0 if index % 50 == 0 else generator.uniform(50, 400) * samples
+            partials[(_EPOCH + timedelta(minutes=index), unit + 1 if units > 1 else None)] = AggregatePartial(
+                samples=samples,
+                cooling_sum=cooling,
+                cooling_count=samples if cooling else 0,
+                power_sum=generator.uniform(20, 90) * samples,
+                cop_sum=generator.uniform(3, 6.5) * samples,
+                inlet_sum=generator.uniform(11, 13) * samples,
+                outlet_sum=generator.uniform(6, 8) * samples,
+            )
+    return partials
+
+
+def per_row_consumption(partials: dict[AggregateKey, AggregatePartial]) -> dict:
+    def to_dict(bucket, partial):
+        efficiency = (partial.power_sum / partial.cooling_sum) if partial.cooling_sum else None
+        return {
+            "timestamp": bucket,
+            "cooling_rth": round(partial.cooling_sum, 3),
+            "power_kw": round(partial.power_sum, 3),
+            "efficiency_kwh_per_tr": round(efficiency, 4) if efficiency else None,
+            "avg_cop": round(partial.mean(partial.cop_sum), 3),
+        }
+
+    return {
+        "series": [to_dict(bucket, partials[(bucket, unit_id)]) for bucket, unit_id in sorted(partials)]
+    }
+
+
+def per_row_trends(partials: dict[AggregateKey, AggregatePartial]) -> dict:
+    data = {}
+    for bucket, unit_id in sorted(partials, key=lambda key: (key[1], key[0])):
+        partial = partials[(bucket, unit_id)]
+        if unit_id not in data:
+            data[unit_id] = {"unit_id": unit_id, "points": []}
+        data[unit_id]["points"].append(
+            {
+                "timestamp": bucket,
+                "ewt": round(partial.mean(partial.inlet_sum), 3),
+                "lwt": round(partial.mean(partial.outlet_sum), 3),
+                "power_kw": round(partial.mean(partial.power_sum), 3),
+                "cooling_rth": round(partial.avg_cooling, 3),
+                "capacity_pct": round(partial.avg_cooling / 100 * 10, 3),
+            }
+        )
+    return {"chillers": list(data.values())}
+
+
+def columnar_consumption(partials: dict[AggregateKey, AggregatePartial]) -> dict:
+    return {"series": to_rows(consumption_columns(AggregateColumns.from_partials(partials)))}
+
+
+def columnar_trends(partials: dict[AggregateKey, AggregatePartial]) -> dict:
+    columns = AggregateColumns.from_partials(partials, by_unit=True)
+    trends = trend_columns(columns)
+    return {
+        "chillers": [
+            {"unit_id": unit_id, "points": to_rows(select_rows(trends, rows))}
+            for unit_id, rows in columns.unit_slices()
+        ]
+    }
+
+
+def _legacy_render(content) -> bytes:
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _columnar_render(content) -> bytes:
+    return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def _best_of(repeat: int, run: Callable[[], bytes]) -> tuple[float, int]:
+    best, size = float("inf"), 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        size = len(run())
+        best = min(best, time.perf_counter() - started)
+    return best, size
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark analytics response formatting")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--units", type=int, default=10, help="chillers sharing the trend buckets")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    cases = {
+        "consumption": (per_row_consumption, columnar_consumption, 1),
+        "trends": (per_row_trends, columnar_trends, args.units),
+    }
+    for size in args.sizes:
+        for name, (per_row, columnar, units) in cases.items():
+            partials = synthetic_partials(size, units)
+            legacy, legacy_bytes = _best_of(args.repeat, lambda: _legacy_render(per_row(partials)))
+            current, current_bytes = _best_of(args.repeat, lambda: _columnar_render(columnar(partials)))
+            print(
+                f"[analytics-benchmark] {name} {size} buckets: per-row {legacy * 1000:.1f} ms "
+                f"({legacy_bytes} bytes), columnar {current * 1000:.1f} ms ({current_bytes} bytes), "
+                f"{legacy / current:.1f}x"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,347 @@
+"""Process-local cache of analytics endpoint results.
+
+Results are keyed by ``(organization_id, endpoint, normalized filters)`` and bounded by
+an LRU limit. Windows that are still open expire after ``ANALYTICS_CACHE_TTL_SECONDS``;
+windows that ended more than ``ROLLUP_LAG_SECONDS`` ago are closed and kept until
+evicted. Either kind is dropped as soon as a committed telemetry write for the same
+organization overlaps its time window, so late readings never leave a stale answer
+behind. When analytics read from replicas, a result whose computation started within
+the replica lag allowance of an overlapping write is returned but not stored, since the
+replica may not have replayed that write yet.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Hashable, Iterable, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.config import settings
+from .telemetry_aggregates import TelemetryScope
+from .time_buckets import as_utc
+
+T = TypeVar("T")
+
+# Session.info key collecting the time range written per organization until commit.
+_PENDING_WRITES = "analytics_cache_writes"
+
+
+@dataclass
+class _CachedResult:
+    organization_id: int
+    start: datetime | None
+    end: datetime | None
+    expires_at: float | None
+    value: Any
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+@dataclass
+class _Load:
+    """A computation in flight; concurrent callers with the same key wait for it.
+
+    Threads block on ``done``; coroutines await a future that ``finish`` resolves on
+    their own event loop, so a waiting request never blocks the loop its computing
+    request may be running on.
+    """
+
+    organization_id: int
+    start: datetime | None
+    end: datetime | None
+    started_at: float = 0.0
+    done: threading.Event = field(default_factory=threading.Event)
+    invalidated: bool = False
+    waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = field(default_factory=list)
+
+    def wait_async(self) -> asyncio.Future:
+        # Registered under the cache lock while the load is still pending.
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.waiters.append((loop, future))
+        return future
+
+    def finish(self) -> None:
+        self.done.set()
+        for loop, future in self.waiters:
+            loop.call_soon_threadsafe(_resolve, future)
+
+
+@dataclass
+class _Claim:
+    """Outcome of looking a key up: a fresh value, a load to run, or one to wait for."""
+
+    hit: bool = False
+    value: Any = None
+    load: _Load | None = None
+    pending: _Load | None = None
+    waiter: asyncio.Future | None = None
+
+
+def _overlaps(
+    start: datetime | None, end: datetime | None, written_from: datetime, written_to: datetime
+) -> bool:
+    return (start is None or written_to >= start) and (end is None or written_from <= end)
+
+
+class AnalyticsResultCache:
+    """LRU + TTL cache with per-organization, time-range invalidation.
+
+    Only one request computes a given key at a time; identical requests arriving
+    meanwhile wait for its result instead of scanning telemetry again. A computation
+    that overlaps an invalidation is returned to its caller but not stored.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        closed_after_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+        write_visibility_seconds: float = 0.0,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.closed_after_seconds = closed_after_seconds
+        self.write_visibility_seconds = write_visibility_seconds
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, _CachedResult] = OrderedDict()
+        self._loads: dict[Hashable, _Load] = {}
+        # (written_at, organization_id, written_from, written_to) within the visibility window.
+        self._recent_writes: deque[tuple[float, int, datetime, datetime]] = deque()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(endpoint: str, scope: TelemetryScope, **filters) -> Hashable:
+        """Normalize ``scope`` and extra filters so equivalent requests share a key."""
+
+        def normalize(value):
+            return as_utc(value).isoformat() if isinstance(value, datetime) else value
+
+        return (
+            scope.organization_id,
+            endpoint,
+            normalize(scope.start),
+            normalize(scope.end),
+            scope.building_id,
+            scope.chiller_unit_id,
+            tuple(sorted((name, normalize(value)) for name, value in filters.items())),
+        )
+
+    def is_closed(self, end: datetime | None, now: datetime | None = None) -> bool:
+        """Whether on-time readings can no longer land inside a window ending at ``end``."""
+
+        if end is None:
+            return False
+        now = now or datetime.now(timezone.utc)
+        return as_utc(end) <= now - timedelta(seconds=self.closed_after_seconds)
+
+    def get_or_compute(
+        self, endpoint: str, scope: TelemetryScope, compute: Callable[[], T], **filters
+    ) -> T:
+        if self.max_entries <= 0:
+            return compute()
+
+        key = self.key(endpoint, scope, **filters)
+        while True:
+            claim = self._claim(key, scope)
+            if claim.hit:
+                return claim.value
+            if claim.load is not None:
+                break
+            claim.pending.done.wait()
+            if claim.pending.invalidated:
+                # The waited-for result was never stored; compute our own.
+                self._count_miss()
+                return compute()
+
+        try:
+            value = compute()
+        except BaseException:
+            self._abandon(key, claim.load)
+            raise
+        self._store(key, scope, claim.load, value)
+        return value
+
+    async def get_or_compute_async(
+        self,
+        endpoint: str,
+        scope: TelemetryScope,
+        compute: Callable[[], Awaitable[T]],
+        **filters,
+    ) -> T:
+        """:meth:`get_or_compute` for coroutines; waiting for another load does not block."""
+
+        if self.max_entries <= 0:
+            return await compute()
+
+        key = self.key(endpoint, scope, **filters)
+        while True:
+            claim = self._claim(key, scope, asynchronous=True)
+            if claim.hit:
+                return claim.value
+            if claim.load is not None:
+                break
+            await claim.waiter
+            if claim.pending.invalidated:
+                self._count_miss()
+                return await compute()
+
+        try:
+            value = await compute()
+        except BaseException:
+            self._abandon(key, claim.load)
+            raise
+        self._store(key, scope, claim.load, value)
+        return value
+
+    def _claim(self, key: Hashable, scope: TelemetryScope, asynchronous: bool = False) -> _Claim:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry.expires_at is None or entry.expires_at > self._clock()):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return _Claim(hit=True, value=entry.value)
+            if entry is not None:
+                del self._entries[key]
+            pending = self._loads.get(key)
+            if pending is None:
+                start = as_utc(scope.start) if scope.start is not None else None
+                end = as_utc(scope.end) if scope.end is not None else None
+                load = _Load(scope.organization_id, start, end, self._clock())
+                self._loads[key] = load
+                self.misses += 1
+                return _Claim(load=load)
+            return _Claim(pending=pending, waiter=pending.wait_async() if asynchronous else None)
+
+    def _count_miss(self) -> None:
+        with self._lock:
+            self.misses += 1
+
+    def _abandon(self, key: Hashable, load: _Load) -> None:
+        with self._lock:
+            self._loads.pop(key, None)
+            load.invalidated = True
+        load.finish()
+
+    def _store(self, key: Hashable, scope: TelemetryScope, load: _Load, value: Any) -> None:
+        expires_at = None if self.is_closed(load.end) else self._clock() + self.ttl_seconds
+        with self._lock:
+            self._loads.pop(key, None)
+            if self._written_recently(load):
+                load.invalidated = True
+            if not load.invalidated and (expires_at is None or self.ttl_seconds > 0):
+                self._entries[key] = _CachedResult(
+                    scope.organization_id, load.start, load.end, expires_at, value
+                )
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            else:
+                load.invalidated = True
+        load.finish()
+
+    def _written_recently(self, load: _Load) -> bool:
+        # Caller holds the lock.
+        if self.write_visibility_seconds <= 0:
+            return False
+        horizon = self._clock() - self.write_visibility_seconds
+        while self._recent_writes and self._recent_writes[0][0] < horizon:
+            self._recent_writes.popleft()
+        return any(
+            organization_id == load.organization_id
+            and written_at > load.started_at - self.write_visibility_seconds
+            and _overlaps(load.start, load.end, written_from, written_to)
+            for written_at, organization_id, written_from, written_to in self._recent_writes
+        )
+
+    def invalidate_window(
+        self, organization_id: int, written_from: datetime, written_to: datetime
+    ) -> int:
+        """Drop results of ``organization_id`` whose window overlaps the written range."""
+
+        written_from, written_to = as_utc(written_from), as_utc(written_to)
+        with self._lock:
+            if self.write_visibility_seconds > 0:
+                self._recent_writes.append((self._clock(), organization_id, written_from, written_to))
+            for load in self._loads.values():
+                if load.organization_id == organization_id and _overlaps(
+                    load.start, load.end, written_from, written_to
+                ):
+                    load.invalidated = True
+            stale = [
+                key
+                for key, entry in self._entries.items()
+                if entry.organization_id == organization_id
+                and _overlaps(entry.start, entry.end, written_from, written_to)
+            ]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def invalidate_organization(self, organization_id: int) -> None:
+        with self._lock:
+            for load in self._loads.values():
+                if load.organization_id == organization_id:
+                    load.invalidated = True
+            for key in [key for key, entry in self._entries.items() if entry.organization_id == organization_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            for load in self._loads.values():
+                load.invalidated = True
+            self._entries.clear()
+            self._recent_writes.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def record_write(self, session: Session, rows: Iterable[dict]) -> None:
+        """Remember the time range ``rows`` cover; it is invalidated once ``session`` commits."""
+
+        pending: dict[int, list[datetime]] = session.info.setdefault(_PENDING_WRITES, {})
+        for row in rows:
+            timestamp = as_utc(row["timestamp"])
+            window = pending.get(row["organization_id"])
+            if window is None:
+                pending[row["organization_id"]] = [timestamp, timestamp]
+            elif timestamp < window[0]:
+                window[0] = timestamp
+            elif timestamp > window[1]:
+                window[1] = timestamp
+
+
+analytics_cache = AnalyticsResultCache(
+    max_entries=settings.analytics_cache_max_entries,
+    ttl_seconds=settings.analytics_cache_ttl_seconds,
+    closed_after_seconds=settings.rollup_lag_seconds,
+    # A replica can trail the primary by its lag allowance plus one health-check interval.
+    write_visibility_seconds=(
+        settings.historical_replica_max_lag_seconds + settings.historical_replica_check_interval_seconds
+        if settings.historical_read_replica_urls
+        else 0.0
+    ),
+)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_writes(session: Session) -> None:
+    pending = session.info.pop(_PENDING_WRITES, None)
+    for organization_id, (written_from, written_to) in (pending or {}).items():
+        analytics_cache.invalidate_window(organization_id, written_from, written_to)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_writes(session: Session) -> None:
+    session.info.pop(_PENDING_WRITES, None)
@@ -0,0 +1,150 @@
+"""Vectorised formatting of aggregated telemetry for the analytics responses.
+
+Merged :class:`AggregatePartial` buckets are copied once into NumPy columns; means,
+ratios and rounding then run on whole arrays instead of per bucket. Undefined values
+(for example efficiency without cooling load) are NaN in the columns and ``None`` in
+rows. Series go out either as one object per bucket (``rows``) or as one array per
+field with epoch-millisecond timestamps (``columnar``).
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Literal, Mapping, Optional
+
+import numpy as np
+
+from .telemetry_aggregates import AggregateKey, AggregatePartial
+from .time_buckets import as_utc
+
+SeriesFormat = Literal["rows", "columnar"]
+
+_SUMS = ("samples", "cooling_sum", "cooling_count", "power_sum", "cop_sum", "inlet_sum", "outlet_sum")
+
+
+@dataclass
+class AggregateColumns:
+    """Sums and counts of aggregated buckets, one array entry per bucket."""
+
+    buckets: list[Optional[datetime]]
+    unit_ids: np.ndarray
+    samples: np.ndarray
+    cooling_sum: np.ndarray
+    cooling_count: np.ndarray
+    power_sum: np.ndarray
+    cop_sum: np.ndarray
+    inlet_sum: np.ndarray
+    outlet_sum: np.ndarray
+
+    @classmethod
+    def from_partials(
+        cls, partials: Mapping[AggregateKey, AggregatePartial], by_unit: bool = False
+    ) -> "AggregateColumns":
+        """Columns ordered by bucket, or by unit and then bucket when ``by_unit`` is set."""
+
+        keys = sorted(partials, key=lambda key: (key[1], key[0]) if by_unit else key)
+        values = np.array(
+            [tuple(getattr(partials[key], name) for name in _SUMS) for key in keys], dtype=float
+        ).reshape(len(keys), len(_SUMS))
+        return cls(
+            [bucket for bucket, _ in keys],
+            np.array([-1 if unit_id is None else unit_id for _, unit_id in keys], dtype=np.int64),
+            *values.T,
+        )
+
+    def __len__(self) -> int:
+        return len(self.buckets)
+
+    def mean(self, total: np.ndarray) -> np.ndarray:
+        return np.divide(total, self.samples, out=np.zeros_like(total), where=self.samples > 0)
+
+    @property
+    def avg_cooling(self) -> np.ndarray:
+        return np.divide(
+            self.cooling_sum,
+            self.cooling_count,
+            out=np.zeros_like(self.cooling_sum),
+            where=self.cooling_count > 0,
+        )
+
+    def unit_slices(self) -> list[tuple[int, slice]]:
+        """Contiguous row ranges per unit; requires columns built with ``by_unit``."""
+
+        if not len(self):
+            return []
+        starts = np.flatnonzero(np.diff(self.unit_ids, prepend=self.unit_ids[0] - 1))
+        stops = np.append(starts[1:], len(self))
+        return [(int(self.unit_ids[start]), slice(start, stop)) for start, stop in zip(starts, stops)]
+
+
+def consumption_columns(columns: AggregateColumns) -> dict[str, object]:
+    cooling = columns.cooling_sum
+    efficiency = np.divide(
+        columns.power_sum, cooling, out=np.full_like(cooling, np.nan), where=cooling != 0
+    )
+    efficiency[efficiency == 0] = np.nan
+    return {
+        "timestamp": columns.buckets,
+        "cooling_rth": np.round(cooling, 3),
+        "power_kw": np.round(columns.power_sum, 3),
+        "efficiency_kwh_per_tr": np.round(efficiency, 4),
+        "avg_cop": np.round(columns.mean(columns.cop_sum), 3),
+    }
+
+
+def trend_columns(columns: AggregateColumns) -> dict[str, object]:
+    cooling = columns.avg_cooling
+    return {
+        "timestamp": columns.buckets,
+        "ewt": np.round(columns.mean(columns.inlet_sum), 3),
+        "lwt": np.round(columns.mean(columns.outlet_sum), 3),
+        "power_kw": np.round(columns.mean(columns.power_sum), 3),
+        "cooling_rth": np.round(cooling, 3),
+        "capacity_pct": np.round(cooling / 100 * 10, 3),
+    }
+
+
+def epoch_millis(buckets) -> np.ndarray:
+    return np.array(
+        [round(as_utc(bucket).timestamp() * 1000) for bucket in buckets], dtype=np.int64
+    ).reshape(-1)
+
+
+def select_rows(series: Mapping[str, object], rows) -> dict[str, object]:
+    """Subset every column of ``series`` by a slice or index array."""
+
+    subset = {}
+    for name, values in series.items():
+        if isinstance(values, np.ndarray):
+            subset[name] = values[rows]
+        else:
+            subset[name] = np.asarray(values, dtype=object)[rows].tolist()
+    return subset
+
+
+def _plain(values) -> list:
+    if isinstance(values, np.ndarray):
+        missing = np.isnan(values) if values.dtype.kind == "f" else None
+        if missing is not None and missing.any():
+            values = values.astype(object)
+            values[missing] = None
+        return values.tolist()
+    return list(values)
+
+
+def to_rows(series: Mapping[str, object]) -> list[dict]:
+    """One dict per bucket, the response shape of the row-oriented endpoints."""
+
+    names = list(series)
+    return [dict(zip(names, row)) for row in zip(*(_plain(values) for values in series.values()))]
+
+
+def format_series(series: Mapping[str, object], series_format: SeriesFormat):
+    """Rows, or columns with the ``timestamp`` column in epoch milliseconds."""
+
+    if series_format == "columnar":
+        timestamps = series["timestamp"]
+        if not isinstance(timestamps, np.ndarray):
+            timestamps = epoch_millis(timestamps)
+        return {**series, "timestamp": timestamps}
+    return to_rows(series)
@@ -0,0 +1,199 @@
+"""Move closed months of raw telemetry into Parquet cold storage.
+
+A month is closed for archiving once it ends more than ``TELEMETRY_ARCHIVE_AFTER_DAYS``
+ago and minute rollups cover it. Each (organization, chiller, month) is exported to
+its own file; the manifest row and the deletion of the exported rows commit together,
+so a crash leaves at worst an unreferenced file and never loses readings.
+
+Run manually with ``python -m src.services.archiver [--dry-run]``.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Sequence
+
+from sqlalchemy import delete, func
+from sqlalchemy.orm import Session
+
+from src import db as db_module
+from src.config import settings
+from src.models import ChillerTelemetry, TelemetryArchiveSegment
+from .partitions import drop_empty_partitions
+from .rollups import refresh_rollups
+from .telemetry_aggregates import load_watermarks
+from .telemetry_archive import archive_root, write_segment
+from .time_buckets import advance, as_utc, bucket_expression, floor_timestamp, parse_bucket
+
+logger = logging.getLogger(__name__)
+
+_ARCHIVED_COLUMNS = (
+    ChillerTelemetry.id,
+    ChillerTelemetry.organization_id,
+    ChillerTelemetry.building_id,
+    ChillerTelemetry.chiller_unit_id,
+    ChillerTelemetry.timestamp,
+    ChillerTelemetry.inlet_temp,
+    ChillerTelemetry.outlet_temp,
+    ChillerTelemetry.power_kw,
+    ChillerTelemetry.flow_rate,
+    ChillerTelemetry.cop,
+)
+
+
+@dataclass
+class ArchiveReport:
+    dry_run: bool
+    cutoff: datetime | None
+    files: int = 0
+    rows: int = 0
+    bytes: int = 0
+    months: list[str] = field(default_factory=list)
+
+
+def archive_cutoff(session: Session, now: datetime, after_days: int) -> datetime | None:
+    """Start of the oldest month that must stay in the row store."""
+
+    watermark = load_watermarks(session).get("minute")
+    if watermark is None:
+        return None
+    return min(
+        floor_timestamp(now - timedelta(days=after_days), "month"),
+        floor_timestamp(watermark, "month"),
+    )
+
+
+def _archive_month(
+    session: Session, organization_id: int, chiller_unit_id: int, month_start: datetime
+) -> tuple[int, int]:
+    filters = [
+        ChillerTelemetry.organization_id == organization_id,
+        ChillerTelemetry.chiller_unit_id == chiller_unit_id,
+        ChillerTelemetry.timestamp >= month_start,
+        ChillerTelemetry.timestamp < advance(month_start, "month"),
+    ]
+    # Readings inserted while the export runs stay behind for the next run.
+    max_id = session.query(func.max(ChillerTelemetry.id)).filter(*filters).scalar()
+    if max_id is None:
+        return 0, 0
+    filters.append(ChillerTelemetry.id <= max_id)
+
+    rows = [
+        {**row._mapping, "timestamp": as_utc(row.timestamp)}
+        for row in session.query(*_ARCHIVED_COLUMNS).filter(*filters).order_by(ChillerTelemetry.timestamp)
+    ]
+    path, size = write_segment(rows, organization_id, chiller_unit_id, month_start)
+    try:
+        session.add(
+            TelemetryArchiveSegment(
+                organization_id=organization_id,
+                chiller_unit_id=chiller_unit_id,
+                month_start=month_start,
+                path=path,
+                row_count=len(rows),
+                size_bytes=size,
+                min_timestamp=rows[0]["timestamp"],
+                max_timestamp=rows[-1]["timestamp"],
+            )
+        )
+        session.execute(delete(ChillerTelemetry).where(*filters))
+        session.commit()
+    except Exception:
+        session.rollback()
+        (archive_root() / path).unlink(missing_ok=True)
+        raise
+    return len(rows), size
+
+
+def archive_closed_months(
+    session: Session,
+    now: datetime | None = None,
+    after_days: int | None = None,
+    dry_run: bool = False,
+) -> ArchiveReport:
+    """Export and delete raw telemetry of closed months, one chiller-month at a time."""
+
+    now = as_utc(now or datetime.now(timezone.utc))
+    after_days = settings.telemetry_archive_after_days if after_days is None else after_days
+    if not dry_run:
+        # Archived months must already be rolled up; the refresh only reads the row store.
+        refresh_rollups(session, now)
+
+    cutoff = archive_cutoff(session, now, after_days)
+    report = ArchiveReport(dry_run=dry_run, cutoff=cutoff)
+    if cutoff is None:
+        return report
+
+    month = bucket_expression(ChillerTelemetry.timestamp, "month", session.get_bind().dialect.name)
+    groups = (
+        session.query(
+            ChillerTelemetry.organization_id,
+            ChillerTelemetry.chiller_unit_id,
+            month,
+            func.count(ChillerTelemetry.id).label("rows"),
+        )
+        .filter(ChillerTelemetry.timestamp < cutoff)
+        .group_by(ChillerTelemetry.organization_id, ChillerTelemetry.chiller_unit_id, month)
+        .order_by(month)
+        .all()
+    )
+
+    for group in groups:
+        month_start = parse_bucket(group.bucket)
+        label = f"{group.organization_id}/{group.chiller_unit_id}/{month_start:%Y-%m}"
+        if dry_run:
+            report.rows += group.rows
+        else:
+            rows, size = _archive_month(
+                session, group.organization_id, group.chiller_unit_id, month_start
+            )
+            report.rows += rows
+            report.bytes += size
+            report.files += 1
+            logger.info("Archived %s telemetry rows for %s", rows, label)
+        report.months.append(label)
+
+    if not dry_run and report.files:
+        drop_empty_partitions(session.get_bind(), cutoff)
+    return report
+
+
+def run_scheduled_archive() -> ArchiveReport:
+    session = db_module.TelemetrySessionLocal()
+    try:
+        return archive_closed_months(session)
+    finally:
+        session.close()
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Archive closed telemetry months to Parquet")
+    parser.add_argument("--dry-run", action="store_true", help="only list what would be archived")
+    parser.add_argument("--after-days", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    session = db_module.TelemetrySessionLocal()
+    try:
+        report = archive_closed_months(session, after_days=args.after_days, dry_run=args.dry_run)
+    finally:
+        session.close()
+
+    if report.cutoff is None:
+        print("[archive] minute rollups are not built yet; nothing can be archived")
+        return 0
+    verb = "would archive" if report.dry_run else "archived"
+    print(
+        f"[archive] {verb} {report.rows} rows from {len(report.months)} chiller-months "
+        f"before {report.cutoff:%Y-%m} into {Path(settings.telemetry_archive_dir).resolve()}"
+    )
+    if not report.dry_run:
+        print(f"[archive] wrote {report.files} files ({report.bytes} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
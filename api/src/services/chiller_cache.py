@@ -0,0 +1,118 @@
+"""Process-local cache of chiller routing metadata used on the ingest hot path."""
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterable
+
+from sqlalchemy.orm import Session
+
+from src.config import settings
+from src.models import Building, ChillerUnit, Organization
+
+
+@dataclass(frozen=True)
+class ChillerRoute:
+    """Where a chiller's telemetry belongs."""
+
+    chiller_unit_id: int
+    building_id: int
+    organization_id: int
+    organization_name: str
+
+
+class ChillerRouteCache:
+    """TTL cache keyed by ``unit_id``.
+
+    Entries are loaded in bulk (one routing query for all misses) and dropped
+    explicitly by the routers that edit chillers, buildings or organizations. A
+    generation counter prevents a load that raced with an invalidation from
+    re-inserting stale data. Alert rules are indexed separately in
+    :mod:`src.services.alert_rule_index`.
+    """
+
+    def __init__(self, ttl_seconds: float) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._entries: dict[int, tuple[float, ChillerRoute]] = {}
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, db: Session, unit_ids: Iterable[int]) -> dict[int, ChillerRoute]:
+        """Return routes for the known ``unit_ids``; unknown ids are omitted."""
+
+        now = time.monotonic()
+        routes: dict[int, ChillerRoute] = {}
+        missing: set[int] = set()
+        with self._lock:
+            generation = self._generation
+            for unit_id in set(unit_ids):
+                entry = self._entries.get(unit_id)
+                if entry is not None and entry[0] > now:
+                    routes[unit_id] = entry[1]
+                else:
+                    missing.add(unit_id)
+            self.hits += len(routes)
+            self.misses += len(missing)
+
+        if missing:
+            loaded = self._load(db, missing)
+            routes.update(loaded)
+            with self._lock:
+                if generation == self._generation:
+                    expires_at = now + self.ttl_seconds
+                    for unit_id, route in loaded.items():
+                        self._entries[unit_id] = (expires_at, route)
+
+        return routes
+
+    def invalidate_chiller(self, unit_id: int) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(unit_id, None)
+
+    def invalidate_building(self, building_id: int) -> None:
+        self._invalidate_where(lambda route: route.building_id == building_id)
+
+    def invalidate_organization(self, organization_id: int) -> None:
+        self._invalidate_where(lambda route: route.organization_id == organization_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def _invalidate_where(self, predicate) -> None:
+        with self._lock:
+            self._generation += 1
+            for unit_id in [key for key, (_, route) in self._entries.items() if predicate(route)]:
+                del self._entries[unit_id]
+
+    @staticmethod
+    def _load(db: Session, unit_ids: set[int]) -> dict[int, ChillerRoute]:
+        rows = (
+            db.query(
+                ChillerUnit.id,
+                ChillerUnit.building_id,
+                Building.organization_id,
+                Organization.name,
+            )
+            .join(Building, ChillerUnit.building_id == Building.id)
+            .join(Organization, Building.organization_id == Organization.id)
+            .filter(ChillerUnit.id.in_(unit_ids))
+            .all()
+        )
+        return {
+            row.id: ChillerRoute(
+                chiller_unit_id=row.id,
+                building_id=row.building_id,
+                organization_id=row.organization_id,
+                organization_name=row.name,
+            )
+            for row in rows
+        }
+
+
+chiller_route_cache = ChillerRouteCache(ttl_seconds=settings.chiller_cache_ttl_seconds)
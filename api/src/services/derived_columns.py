@@ -0,0 +1,105 @@
+"""Fill the derived telemetry columns of readings stored before they existed.
+
+New readings get ``delta_t``, ``cooling_load_rth`` and ``kw_per_ton`` at ingest. Older
+rows are found through the partial index on ``delta_t IS NULL`` and updated in bounded,
+individually committed batches in ascending id order, so an interrupted run simply
+continues where it stopped. Once the table is caught up a run costs one index probe.
+
+Run manually with ``python -m src.services.derived_columns [--max-batches N]``.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+from dataclasses import dataclass
+from typing import Sequence
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from src import db as db_module
+from src.config import settings
+from src.models import ChillerTelemetry
+from .telemetry_aggregates import computed_cooling_load_expression
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BackfillReport:
+    rows: int = 0
+    batches: int = 0
+    complete: bool = True
+
+
+def backfill_derived_columns(
+    session: Session, batch_size: int | None = None, max_batches: int | None = None
+) -> BackfillReport:
+    """Compute the derived columns in SQL for rows that do not have them yet."""
+
+    batch_size = batch_size or settings.telemetry_backfill_batch_size
+    cooling = computed_cooling_load_expression()
+    report = BackfillReport()
+    while True:
+        if max_batches is not None and report.batches >= max_batches:
+            report.complete = False
+            break
+        pending = (
+            select(ChillerTelemetry.id)
+            .where(ChillerTelemetry.delta_t.is_(None))
+            .order_by(ChillerTelemetry.id)
+            .limit(batch_size)
+            .subquery()
+        )
+        upper = session.scalar(select(func.max(pending.c.id)))
+        if upper is None:
+            break
+        result = session.execute(
+            update(ChillerTelemetry)
+            .where(ChillerTelemetry.delta_t.is_(None), ChillerTelemetry.id <= upper)
+            .values(
+                delta_t=ChillerTelemetry.inlet_temp - ChillerTelemetry.outlet_temp,
+                cooling_load_rth=cooling,
+                kw_per_ton=ChillerTelemetry.power_kw / func.nullif(cooling, 0),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        session.commit()
+        report.rows += result.rowcount
+        report.batches += 1
+        logger.info(
+            "Backfilled derived columns for %s telemetry rows up to id %s", result.rowcount, upper
+        )
+    return report
+
+
+def run_scheduled_backfill() -> BackfillReport:
+    session = db_module.TelemetrySessionLocal()
+    try:
+        return backfill_derived_columns(session)
+    finally:
+        session.close()
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Backfill derived telemetry columns")
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--max-batches", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    session = db_module.TelemetrySessionLocal()
+    try:
+        report = backfill_derived_columns(
+            session, batch_size=args.batch_size, max_batches=args.max_batches
+        )
+    finally:
+        session.close()
+
+    suffix = "" if report.complete else " (incomplete, run again to continue)"
+    print(f"[derived-backfill] updated {report.rows} rows in {report.batches} batches{suffix}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
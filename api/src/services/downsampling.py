@@ -0,0 +1,48 @@
+"""Reduce long time series to a bounded number of visually representative points."""
+from __future__ import annotations
+
+import numpy as np
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """Indices of the points kept by Largest-Triangle-Three-Buckets.
+
+    ``x`` holds ascending positions and ``y`` either one series or one column per
+    series sharing ``x``. Columns are scaled to their own range and a point's weight is
+    its largest triangle area over all columns, so a spike in any one metric survives.
+    The first and last points are always kept; missing values count as the column
+    minimum. Triangle areas are computed for a whole bucket at once, which leaves one
+    Python iteration per output point.
+    """
+
+    count = len(x)
+    if max_points < 3 or count <= max_points:
+        return np.arange(count)
+
+    values = np.asarray(y, dtype=float).reshape(count, -1)
+    low = np.nanmin(values, axis=0)
+    span = np.nanmax(values, axis=0) - low
+    span[~(span > 0)] = 1.0
+    values = np.nan_to_num((values - low) / span, nan=0.0)
+    positions = np.asarray(x, dtype=float)
+
+    # max_points - 2 buckets over the interior points; the last bucket looks ahead to the final point.
+    edges = np.linspace(1, count - 1, max_points - 1).astype(int)
+    selected = np.empty(max_points, dtype=int)
+    selected[0], selected[-1] = 0, count - 1
+
+    anchor = 0
+    for bucket in range(max_points - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        next_stop = edges[bucket + 2] if bucket + 2 < len(edges) else count
+        next_x = positions[stop:next_stop].mean()
+        next_y = values[stop:next_stop].mean(axis=0)
+
+        dx = positions[anchor] - next_x
+        area = np.abs(
+            dx * (values[start:stop] - values[anchor])
+            - (positions[anchor] - positions[start:stop, None]) * (next_y - values[anchor])
+        ).max(axis=1)
+        anchor = start + int(area.argmax())
+        selected[bucket + 1] = anchor
+    return selected
@@ -1,4 +1,4 @@
-"""Simple SMTP email sender used by the alert engine."""
+"""SMTP delivery used by the alert notification dispatcher."""
 from __future__ import annotations
 
 import smtplib
@@ -7,28 +7,111 @@ from typing import Iterable
 
 from src.config import settings
 
+# Failures after which a fresh connection is worth one more try: the server closed an
+# idle session or the socket broke.
+_CONNECTION_LOST = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
 
-def send_email(to_addresses: Iterable[str], subject: str, body: str) -> bool:
-    recipients = [address.strip() for address in to_addresses if address.strip()]
-    if not recipients or not settings.smtp_host:
-        return False
 
+def normalize_recipients(to_addresses: Iterable[str]) -> tuple[str, ...]:
+    """Distinct, trimmed addresses in a stable order."""
+
+    return tuple(sorted({address.strip() for address in to_addresses if address and address.strip()}))
+
+
+def build_message(recipients: Iterable[str], subject: str, body: str) -> EmailMessage:
     message = EmailMessage()
     message["Subject"] = subject
     message["From"] = settings.email_from
     message["To"] = ", ".join(recipients)
     message.set_content(body)
+    return message
+
+
+class SmtpConnection:
+    """One SMTP session reused across messages.
+
+    The session is opened (with STARTTLS and login when configured) on the first send
+    and reopened once when the server has dropped it in the meantime.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str = "",
+        password: str = "",
+        use_tls: bool = True,
+        timeout_seconds: float = 30.0,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout_seconds = timeout_seconds
+        self.connects = 0
+        self._smtp: smtplib.SMTP | None = None
 
-    if settings.smtp_use_tls:
-        with smtplib.SMTP(settings.smtp_host, settings.smtp_port) as smtp:
-            if settings.smtp_username and settings.smtp_password:
-                smtp.starttls()
-                smtp.login(settings.smtp_username, settings.smtp_password)
-            smtp.send_message(message)
-    else:
-        with smtplib.SMTP(settings.smtp_host, settings.smtp_port) as smtp:
-            if settings.smtp_username and settings.smtp_password:
-                smtp.login(settings.smtp_username, settings.smtp_password)
-            smtp.send_message(message)
+    @classmethod
+    def from_settings(cls) -> "SmtpConnection":
+        return cls(
+            host=settings.smtp_host,
+            port=settings.smtp_port,
+            username=settings.smtp_username,
+            password=settings.smtp_password,
+            use_tls=settings.smtp_use_tls,
+            timeout_seconds=settings.smtp_timeout_seconds,
+        )
+
+    @property
+    def connected(self) -> bool:
+        return self._smtp is not None
+
+    def send(self, message: EmailMessage) -> None:
+        for attempt in range(2):
+            if self._smtp is None:
+                self._smtp = self._connect()
+            try:
+                self._smtp.send_message(message)
+                return
+            except _CONNECTION_LOST:
+                self.close()
+                if attempt:
+                    raise
+
+    def close(self) -> None:
+        smtp, self._smtp = self._smtp, None
+        if smtp is None:
+            return
+        try:
+            smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            smtp.close()
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout_seconds)
+        try:
+            if self.username and self.password:
+                if self.use_tls:
+                    smtp.starttls()
+                smtp.login(self.username, self.password)
+        except BaseException:
+            smtp.close()
+            raise
+        self.connects += 1
+        return smtp
+
+
+def send_email(to_addresses: Iterable[str], subject: str, body: str) -> bool:
+    """Deliver one message over a short-lived connection; alerts go through the dispatcher."""
+
+    recipients = normalize_recipients(to_addresses)
+    if not recipients or not settings.smtp_host:
+        return False
 
+    connection = SmtpConnection.from_settings()
+    try:
+        connection.send(build_message(recipients, subject, body))
+    finally:
+        connection.close()
     return True
@@ -0,0 +1,266 @@
+"""EXPLAIN the analytics telemetry queries and flag full table scans.
+
+Run against the configured history database with
+``python -m src.services.index_advisor``. ``--seed-rows`` first loads a synthetic
+multi-tenant dataset (removed again afterwards unless ``--keep``) so the planner sees
+realistic selectivity. On a partitioned table the report also lists how many monthly
+partitions survive pruning. The command exits non-zero when any analytics query scans
+``chiller_telemetry`` or ``chiller_telemetry_rollups`` without an index, which makes
+it usable as a regression check.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Sequence
+
+from sqlalchemy import delete, insert, text
+from sqlalchemy.orm import Session
+
+from src import db as db_module
+from src.models import ChillerTelemetry, TelemetryRollup
+from .partitions import months_between, telemetry_partitions
+from .telemetry_aggregates import (
+    RollupSegment,
+    TelemetryScope,
+    raw_aggregate_query,
+    rollup_aggregate_query,
+    with_derived_values,
+)
+from .time_buckets import floor_timestamp
+
+WATCHED_TABLES = (ChillerTelemetry.__tablename__, TelemetryRollup.__tablename__)
+
+# Synthetic tenants use ids far above anything a real deployment hands out.
+SYNTHETIC_ORGANIZATION_OFFSET = 900_000
+_CHILLERS_PER_BUILDING = 5
+
+_SQLITE_INDEX = re.compile(r"USING (?:COVERING )?INDEX (\w+)")
+_TELEMETRY_PARTITION = re.compile(rf"^{ChillerTelemetry.__tablename__}_y\d{{4}}m\d{{2}}$")
+
+
+@dataclass
+class PlanReport:
+    """Outcome of EXPLAIN for one analytics query."""
+
+    name: str
+    indexes: list[str] = field(default_factory=list)
+    full_scans: list[str] = field(default_factory=list)
+    partitions: list[str] = field(default_factory=list)
+    plan: list[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.full_scans
+
+
+def analytics_queries(
+    session: Session,
+    organization_id: int,
+    building_id: int,
+    chiller_unit_id: int,
+    start: datetime,
+    end: datetime,
+) -> dict[str, object]:
+    """The query shapes issued by the analytics endpoints, keyed by a readable name."""
+
+    plant = TelemetryScope(organization_id, start, end)
+    building = TelemetryScope(organization_id, start, end, building_id=building_id)
+    chiller = TelemetryScope(organization_id, start, end, chiller_unit_id=chiller_unit_id)
+    closed = RollupSegment(grain="day", start=floor_timestamp(start, "day"), end=floor_timestamp(end, "day"))
+
+    return {
+        "plant_overview.raw": raw_aggregate_query(session, plant, None, None, None, False),
+        "plant_overview.rollup": rollup_aggregate_query(session, plant, closed, None, False),
+        "consumption_efficiency.raw": raw_aggregate_query(session, building, None, None, "day", False),
+        "consumption_efficiency.rollup": rollup_aggregate_query(session, building, closed, "day", False),
+        "equipment_metrics.raw": raw_aggregate_query(session, building, None, None, None, True),
+        "equipment_metrics.rollup": rollup_aggregate_query(session, building, closed, None, True),
+        "chiller_trends.raw": raw_aggregate_query(session, chiller, None, None, "hour", True),
+        "chiller_trends.rollup": rollup_aggregate_query(session, chiller, closed, "day", True),
+    }
+
+
+def _compile(session: Session, query) -> str:
+    return str(
+        query.statement.compile(
+            dialect=session.get_bind().dialect, compile_kwargs={"literal_binds": True}
+        )
+    )
+
+
+def _explain_sqlite(session: Session, sql: str, report: PlanReport) -> None:
+    for row in session.execute(text(f"EXPLAIN QUERY PLAN {sql}")):
+        detail = row[-1]
+        report.plan.append(detail)
+        match = _SQLITE_INDEX.search(detail)
+        if match:
+            report.indexes.append(match.group(1))
+            continue
+        for table in WATCHED_TABLES:
+            if re.match(rf"SCAN {table}\b", detail):
+                report.full_scans.append(table)
+
+
+def _walk_postgres(node: dict, report: PlanReport, depth: int = 0) -> None:
+    relation = node.get("Relation Name")
+    label = node["Node Type"] + (f" on {relation}" if relation else "")
+    if node.get("Index Name"):
+        report.indexes.append(node["Index Name"])
+        label += f" using {node['Index Name']}"
+    report.plan.append("  " * depth + label)
+    is_partition = relation is not None and _TELEMETRY_PARTITION.match(relation) is not None
+    if is_partition:
+        # Each monthly partition left after pruning shows up as its own scan node.
+        report.partitions.append(relation)
+    if node["Node Type"] == "Seq Scan" and (relation in WATCHED_TABLES or is_partition):
+        report.full_scans.append(relation)
+    for child in node.get("Plans", []):
+        _walk_postgres(child, report, depth + 1)
+
+
+def _explain_postgres(session: Session, sql: str, report: PlanReport) -> None:
+    raw = session.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+    document = json.loads(raw) if isinstance(raw, str) else raw
+    _walk_postgres(document[0]["Plan"], report)
+
+
+def explain_queries(session: Session, queries: dict[str, object]) -> list[PlanReport]:
+    dialect = session.get_bind().dialect.name
+    if dialect not in {"sqlite", "postgresql"}:
+        raise ValueError(f"EXPLAIN is not supported for the {dialect} dialect")
+
+    reports = []
+    for name, query in queries.items():
+        report = PlanReport(name=name)
+        sql = _compile(session, query)
+        if dialect == "sqlite":
+            _explain_sqlite(session, sql, report)
+        else:
+            _explain_postgres(session, sql, report)
+        reports.append(report)
+    return reports
+
+
+def seed_synthetic_telemetry(
+    session: Session,
+    rows: int,
+    organizations: int,
+    buildings_per_organization: int = 2,
+    end: datetime | None = None,
+) -> None:
+    """Spread ``rows`` readings over synthetic tenants, one reading per chiller per step."""
+
+    end = end or datetime.now(timezone.utc)
+    chillers = [
+        (SYNTHETIC_ORGANIZATION_OFFSET + org, building, building * _CHILLERS_PER_BUILDING + unit)
+        for org in range(organizations)
+        for building in range(
+            SYNTHETIC_ORGANIZATION_OFFSET + org * buildings_per_organization,
+            SYNTHETIC_ORGANIZATION_OFFSET + (org + 1) * buildings_per_organization,
+        )
+        for unit in range(_CHILLERS_PER_BUILDING)
+    ]
+    steps = max(1, rows // len(chillers))
+    generator = random.Random(7)
+
+    telemetry_partitions.ensure_for(
+        session.get_bind(), months_between(end - timedelta(minutes=5 * steps), end)
+    )
+    batch: list[dict] = []
+    for step in range(steps):
+        timestamp = end - timedelta(minutes=5 * (steps - step))
+        for organization_id, building_id, chiller_unit_id in chillers:
+            batch.append(
+                with_derived_values(
+                    {
+                        "organization_id": organization_id,
+                        "building_id": building_id,
+                        "chiller_unit_id": chiller_unit_id,
+                        "timestamp": timestamp,
+                        "inlet_temp": generator.uniform(11, 13),
+                        "outlet_temp": generator.uniform(6, 8),
+                        "power_kw": generator.uniform(300, 500),
+                        "flow_rate": generator.uniform(900, 1100),
+                        "cop": generator.uniform(5, 6.5),
+                    }
+                )
+            )
+        if len(batch) >= 10_000:
+            session.execute(insert(ChillerTelemetry), batch)
+            batch = []
+    if batch:
+        session.execute(insert(ChillerTelemetry), batch)
+    session.commit()
+    session.execute(text("ANALYZE"))
+    session.commit()
+
+
+def remove_synthetic_telemetry(session: Session) -> None:
+    session.execute(
+        delete(ChillerTelemetry).where(
+            ChillerTelemetry.organization_id >= SYNTHETIC_ORGANIZATION_OFFSET
+        )
+    )
+    session.commit()
+
+
+def _default_target(session: Session) -> tuple[int, int, int] | None:
+    row = (
+        session.query(
+            ChillerTelemetry.organization_id,
+            ChillerTelemetry.building_id,
+            ChillerTelemetry.chiller_unit_id,
+        )
+        .order_by(ChillerTelemetry.organization_id.desc())
+        .first()
+    )
+    return tuple(row) if row else None
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="EXPLAIN analytics telemetry queries")
+    parser.add_argument("--seed-rows", type=int, default=0, help="synthetic readings to load first")
+    parser.add_argument("--organizations", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="keep the synthetic readings")
+    parser.add_argument("--days", type=int, default=7, help="query window ending now")
+    parser.add_argument("--verbose", action="store_true", help="print full plans")
+    args = parser.parse_args(argv)
+
+    session = db_module.TelemetrySessionLocal()
+    try:
+        if args.seed_rows:
+            seed_synthetic_telemetry(session, args.seed_rows, args.organizations)
+
+        target = _default_target(session)
+        if target is None:
+            print("[index-advisor] no telemetry found; pass --seed-rows to load a dataset")
+            return 1
+
+        end = datetime.now(timezone.utc)
+        queries = analytics_queries(session, *target, end - timedelta(days=args.days), end)
+        reports = explain_queries(session, queries)
+
+        for report in reports:
+            status = "ok" if report.ok else "FULL SCAN " + ", ".join(sorted(set(report.full_scans)))
+            indexes = ", ".join(dict.fromkeys(report.indexes)) or "-"
+            pruning = f", partitions: {len(set(report.partitions))}" if report.partitions else ""
+            print(f"[index-advisor] {report.name}: {status} (indexes: {indexes}{pruning})")
+            if args.verbose or not report.ok:
+                for line in report.plan:
+                    print(f"    {line}")
+    finally:
+        if args.seed_rows and not args.keep:
+            remove_synthetic_telemetry(session)
+        session.close()
+
+    return 0 if all(report.ok for report in reports) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
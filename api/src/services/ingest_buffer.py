@@ -0,0 +1,236 @@
+"""Write-behind buffer that batches accepted telemetry into bulk inserts."""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Sequence
+
+from src import db as db_module
+from src.config import settings
+from .telemetry_writer import insert_telemetry_rows
+
+logger = logging.getLogger(__name__)
+
+
+class BufferFullError(Exception):
+    """Raised when the buffer cannot accept more readings without exceeding its bound."""
+
+
+class TelemetryWriteBuffer:
+    """Bounded in-process queue drained by a background flusher thread.
+
+    Readings are flushed when ``flush_batch_size`` rows are waiting or when the oldest
+    queued row has waited ``max_latency_seconds``, whichever comes first. A failed batch
+    goes back to the head of the queue; once it has failed ``max_attempts`` times in a
+    row it is bisected, and rows that still fail on their own are logged and dropped so
+    that one bad reading cannot hold up the rest.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        flush_batch_size: int,
+        max_latency_seconds: float,
+        max_attempts: int = 5,
+    ) -> None:
+        self.max_size = max_size
+        self.flush_batch_size = flush_batch_size
+        self.max_latency_seconds = max_latency_seconds
+        self.max_attempts = max_attempts
+
+        # ``(enqueued_at, row)`` in arrival order; the head holds the oldest row.
+        self._rows: deque[tuple[float, dict]] = deque()
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._stopping = False
+        # Failed flushes in a row of the batch at the head of the queue.
+        self._attempts = 0
+
+        self.enqueued_total = 0
+        self.rejected_total = 0
+        self.flushed_total = 0
+        self.flush_count = 0
+        self.failed_flushes = 0
+        self.dropped_total = 0
+        self.last_flush_duration_ms = 0.0
+        self.max_flush_duration_ms = 0.0
+
+    @classmethod
+    def from_settings(cls) -> "TelemetryWriteBuffer":
+        return cls(
+            max_size=settings.telemetry_buffer_max_size,
+            flush_batch_size=settings.telemetry_flush_batch_size,
+            max_latency_seconds=settings.telemetry_flush_max_latency_seconds,
+            max_attempts=settings.telemetry_flush_max_attempts,
+        )
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def submit(self, rows: Sequence[dict]) -> None:
+        """Queue rows for a later bulk insert, all-or-nothing."""
+
+        if not self.running:
+            self.start()
+
+        with self._condition:
+            if len(self._rows) + len(rows) > self.max_size:
+                self.rejected_total += len(rows)
+                raise BufferFullError(
+                    f"Telemetry buffer is full ({len(self._rows)}/{self.max_size} rows queued)"
+                )
+            enqueued_at = time.monotonic()
+            self._rows.extend((enqueued_at, row) for row in rows)
+            self.enqueued_total += len(rows)
+            if len(self._rows) >= self.flush_batch_size:
+                self._condition.notify()
+
+    def start(self) -> None:
+        with self._condition:
+            if self.running:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(
+                target=self._run, name="telemetry-write-behind", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stop the flusher thread and write out everything still queued."""
+
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    def flush(self) -> int:
+        """Synchronously drain the queue in ``flush_batch_size`` chunks."""
+
+        flushed = 0
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return flushed
+            if not self._write(batch):
+                return flushed
+            flushed += len(batch)
+
+    def stats(self) -> dict:
+        with self._condition:
+            depth = len(self._rows)
+            oldest = self._oldest_enqueued_at()
+        return {
+            "enabled": settings.telemetry_write_behind,
+            "running": self.running,
+            "queue_depth": depth,
+            "max_size": self.max_size,
+            "oldest_row_age_seconds": round(time.monotonic() - oldest, 3) if oldest is not None else 0.0,
+            "enqueued_total": self.enqueued_total,
+            "rejected_total": self.rejected_total,
+            "flushed_total": self.flushed_total,
+            "flush_count": self.flush_count,
+            "failed_flushes": self.failed_flushes,
+            "dropped_total": self.dropped_total,
+            "last_flush_duration_ms": round(self.last_flush_duration_ms, 3),
+            "max_flush_duration_ms": round(self.max_flush_duration_ms, 3),
+        }
+
+    def _oldest_enqueued_at(self) -> float | None:
+        return self._rows[0][0] if self._rows else None
+
+    def _take_batch(self) -> list[tuple[float, dict]]:
+        with self._condition:
+            size = min(self.flush_batch_size, len(self._rows))
+            return [self._rows.popleft() for _ in range(size)]
+
+    def _requeue(self, batch: list[tuple[float, dict]]) -> None:
+        # Back at the head with their original enqueue times, so their age keeps counting.
+        with self._condition:
+            self._rows.extendleft(reversed(batch))
+
+    def _write(self, batch: list[tuple[float, dict]]) -> bool:
+        """Write ``batch``; ``False`` when it went back to the queue to be retried."""
+
+        with self._flush_lock:
+            if self._insert(batch) is None:
+                self._attempts = 0
+                return True
+            self._attempts += 1
+            if self._attempts < self.max_attempts:
+                self._requeue(batch)
+                return False
+            # Retrying has not helped: write what can be written and drop the rest.
+            self._attempts = 0
+            middle = len(batch) // 2
+            for part in (batch[:middle], batch[middle:]):
+                self._isolate(part)
+            return True
+
+    def _isolate(self, batch: list[tuple[float, dict]]) -> None:
+        if not batch:
+            return
+        error = self._insert(batch)
+        if error is None:
+            return
+        if len(batch) == 1:
+            self.dropped_total += 1
+            logger.error("Dropping telemetry row that cannot be written: %s (%s)", batch[0][1], error)
+            return
+        middle = len(batch) // 2
+        self._isolate(batch[:middle])
+        self._isolate(batch[middle:])
+
+    def _insert(self, batch: list[tuple[float, dict]]) -> Exception | None:
+        """Insert and commit ``batch`` in one transaction; the error if that failed."""
+
+        started = time.perf_counter()
+        session = db_module.TelemetrySessionLocal()
+        try:
+            insert_telemetry_rows(session, [row for _, row in batch])
+            session.commit()
+        except Exception as exc:
+            session.rollback()
+            self.failed_flushes += 1
+            logger.warning("Telemetry flush of %s rows failed: %s", len(batch), exc)
+            return exc
+        finally:
+            session.close()
+
+        duration_ms = (time.perf_counter() - started) * 1000
+        self.flush_count += 1
+        self.flushed_total += len(batch)
+        self.last_flush_duration_ms = duration_ms
+        self.max_flush_duration_ms = max(self.max_flush_duration_ms, duration_ms)
+        return None
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._stopping:
+                    if len(self._rows) >= self.flush_batch_size:
+                        break
+                    oldest = self._oldest_enqueued_at()
+                    if oldest is not None:
+                        waited = time.monotonic() - oldest
+                        remaining = self.max_latency_seconds - waited
+                        if remaining <= 0:
+                            break
+                        self._condition.wait(remaining)
+                    else:
+                        self._condition.wait()
+                if self._stopping:
+                    return
+
+            batch = self._take_batch()
+            if batch and not self._write(batch):
+                time.sleep(self.max_latency_seconds)
+
+
+telemetry_buffer = TelemetryWriteBuffer.from_settings()
@@ -0,0 +1,195 @@
+"""In-process fan-out of accepted telemetry and recorded alert events to live streams.
+
+Ingest publishes each reading and each alert event once, encoded a single time as a
+server-sent event, to the subscribers of the reading's organization on that topic.
+Every subscriber has its own bounded buffer drained by its streaming response; one that
+falls ``max_buffer`` events behind is disconnected with an ``overflow`` event instead
+of slowing ingest or holding memory, and is expected to reconnect. Publishing never
+blocks and never touches a database, so live views add no load per viewer.
+
+Subscribers only see what their own API process ingests.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections import deque
+from typing import AsyncIterator, Callable
+
+import orjson
+
+from src.config import settings
+from src.models import AlertEvent
+from src.schemas.alert_event import AlertEventResponse
+
+TELEMETRY = "telemetry"
+ALERTS = "alerts"
+
+Filter = Callable[[dict], bool]
+
+
+def encode_event(event: str, payload: dict) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(payload) + b"\n\n"
+
+
+_OVERFLOW = encode_event("overflow", {"detail": "Stream fell behind; reconnect to resume"})
+_HEARTBEAT = b": keepalive\n\n"
+
+
+class Subscriber:
+    """One streaming client: a bounded buffer of encoded events on its event loop."""
+
+    def __init__(self, topic: str, organization_id: int, max_buffer: int, accepts: Filter | None) -> None:
+        self.topic = topic
+        self.organization_id = organization_id
+        self.max_buffer = max_buffer
+        self.accepts = accepts
+        self.dropped = False
+        self._buffer: deque[bytes] = deque()
+        self._closed = False
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+
+    def push(self, frame: bytes) -> None:
+        """Queue ``frame`` from any thread."""
+
+        try:
+            on_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self._offer(frame)
+        else:
+            try:
+                self._loop.call_soon_threadsafe(self._offer, frame)
+            except RuntimeError:  # the subscriber's loop has closed
+                self._closed = True
+
+    def close(self) -> None:
+        self._closed = True
+        self._wakeup.set()
+
+    def _offer(self, frame: bytes) -> None:
+        if self._closed:
+            return
+        if len(self._buffer) >= self.max_buffer:
+            self.dropped = True
+            self._closed = True
+            self._buffer.clear()
+        else:
+            self._buffer.append(frame)
+        self._wakeup.set()
+
+    async def frames(self, heartbeat_seconds: float) -> AsyncIterator[bytes]:
+        """Buffered events as they arrive, with a comment line after ``heartbeat_seconds`` of quiet."""
+
+        while True:
+            while self._buffer:
+                yield self._buffer.popleft()
+            if self._closed:
+                if self.dropped:
+                    yield _OVERFLOW
+                return
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), heartbeat_seconds)
+            except asyncio.TimeoutError:
+                yield _HEARTBEAT
+
+
+class LiveEventBroker:
+    """Subscribers keyed by ``(topic, organization_id)``."""
+
+    def __init__(self, max_buffer: int) -> None:
+        self.max_buffer = max_buffer
+        self._subscribers: dict[tuple[str, int], set[Subscriber]] = {}
+        self._lock = threading.Lock()
+        self._published_total = 0
+        self._dropped_total = 0
+
+    def subscribe(self, topic: str, organization_id: int, accepts: Filter | None = None) -> Subscriber:
+        """Register a subscriber on the running event loop."""
+
+        subscriber = Subscriber(topic, organization_id, self.max_buffer, accepts)
+        with self._lock:
+            self._subscribers.setdefault((topic, organization_id), set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        subscriber.close()
+        with self._lock:
+            key = (subscriber.topic, subscriber.organization_id)
+            subscribers = self._subscribers.get(key)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._subscribers[key]
+            if subscriber.dropped:
+                self._dropped_total += 1
+
+    def wants(self, topic: str, organization_id: int) -> bool:
+        return (topic, organization_id) in self._subscribers
+
+    def publish(self, topic: str, organization_id: int, event: str, payload: dict) -> int:
+        """Send ``payload`` to the organization's subscribers; returns how many it reached."""
+
+        with self._lock:
+            subscribers = list(self._subscribers.get((topic, organization_id), ()))
+            self._published_total += 1
+        if not subscribers:
+            return 0
+        frame = encode_event(event, payload)
+        reached = 0
+        for subscriber in subscribers:
+            if subscriber.accepts is None or subscriber.accepts(payload):
+                subscriber.push(frame)
+                reached += 1
+        return reached
+
+    def stats(self) -> dict:
+        with self._lock:
+            subscribers = {TELEMETRY: 0, ALERTS: 0}
+            for (topic, _), members in self._subscribers.items():
+                subscribers[topic] = subscribers.get(topic, 0) + len(members)
+            return {
+                "subscribers": subscribers,
+                "published_total": self._published_total,
+                "dropped_subscribers_total": self._dropped_total,
+            }
+
+
+async def stream_frames(
+    broker: LiveEventBroker, topic: str, organization_id: int, accepts: Filter | None = None
+) -> AsyncIterator[bytes]:
+    """A new subscriber's server-sent event stream; unsubscribes when the client goes away."""
+
+    subscriber = broker.subscribe(topic, organization_id, accepts)
+    try:
+        # Sent once subscribed; also tells the client how soon to reconnect after a drop.
+        yield f"retry: {settings.stream_retry_milliseconds}\n\n".encode()
+        async for frame in subscriber.frames(settings.stream_heartbeat_seconds):
+            yield frame
+    finally:
+        broker.unsubscribe(subscriber)
+
+
+def publish_readings(rows: list[dict]) -> None:
+    """Publish accepted readings, as stored, to the telemetry streams."""
+
+    for row in rows:
+        if live_events.wants(TELEMETRY, row["organization_id"]):
+            payload = {key: value for key, value in row.items() if key != "organization_id"}
+            live_events.publish(TELEMETRY, row["organization_id"], "telemetry", payload)
+
+
+def publish_alerts(alerts: list[tuple[int, AlertEvent]]) -> None:
+    """Publish committed alert events, given with their organization, to the alert streams."""
+
+    for organization_id, alert in alerts:
+        if not live_events.wants(ALERTS, organization_id):
+            continue
+        payload = AlertEventResponse.model_validate(alert).model_dump(mode="json")
+        live_events.publish(ALERTS, organization_id, "alert", payload)
+
+
+live_events = LiveEventBroker(max_buffer=settings.stream_buffer_size)
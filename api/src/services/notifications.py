@@ -0,0 +1,267 @@
+"""Background delivery of alert emails so that ingest only has to enqueue them."""
+from __future__ import annotations
+
+import logging
+import smtplib
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+from src.config import settings
+from .email import SmtpConnection, build_message, normalize_recipients
+
+logger = logging.getLogger(__name__)
+
+_MAX_BACKOFF_SECONDS = 300.0
+
+
+@dataclass(frozen=True)
+class EmailNotification:
+    recipients: tuple[str, ...]
+    subject: str
+    body: str
+
+
+def _permanent(exc: Exception) -> bool:
+    """Rejections that retrying will not fix, such as unknown recipients."""
+
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return True
+    return isinstance(exc, smtplib.SMTPResponseException) and exc.smtp_code >= 500
+
+
+def digest(notifications: list[EmailNotification]) -> EmailNotification:
+    """One email carrying every notification for the same recipients."""
+
+    if len(notifications) == 1:
+        return notifications[0]
+    sections = [f"{notification.subject}\n{notification.body}" for notification in notifications]
+    return EmailNotification(
+        recipients=notifications[0].recipients,
+        subject=f"Chiller Alerts: {len(notifications)} notifications",
+        body="\n\n".join(sections),
+    )
+
+
+class EmailDispatcher:
+    """Bounded queue of alert emails drained by one background thread.
+
+    The worker holds a single SMTP connection open between batches. After the first
+    message of a burst it waits ``batch_window_seconds`` so that notifications for the
+    same recipients leave as one digest. Temporary failures are retried with exponential
+    backoff starting at ``retry_backoff_seconds``; when the queue is full new
+    notifications are dropped rather than slowing down ingest.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        batch_window_seconds: float,
+        batch_max_messages: int,
+        max_retries: int,
+        retry_backoff_seconds: float,
+        connection_factory: Callable[[], SmtpConnection] = SmtpConnection.from_settings,
+    ) -> None:
+        self.max_size = max_size
+        self.batch_window_seconds = batch_window_seconds
+        self.batch_max_messages = batch_max_messages
+        self.max_retries = max_retries
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.connection_factory = connection_factory
+
+        self._queue: deque[EmailNotification] = deque()
+        self._oldest_enqueued_at: float | None = None
+        self._condition = threading.Condition()
+        self._send_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._connection: SmtpConnection | None = None
+
+        self.enqueued_total = 0
+        self.rejected_total = 0
+        self.sent_emails = 0
+        self.delivered_total = 0
+        self.failed_attempts = 0
+        self.dropped_total = 0
+        self.connects = 0
+
+    @classmethod
+    def from_settings(cls) -> "EmailDispatcher":
+        return cls(
+            max_size=settings.email_queue_max_size,
+            batch_window_seconds=settings.email_batch_window_seconds,
+            batch_max_messages=settings.email_batch_max_messages,
+            max_retries=settings.email_max_retries,
+            retry_backoff_seconds=settings.email_retry_backoff_seconds,
+        )
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def submit(self, to_addresses: Iterable[str], subject: str, body: str) -> bool:
+        """Queue a notification; ``False`` when there is nobody to send to or no room."""
+
+        recipients = normalize_recipients(to_addresses)
+        if not recipients or not settings.smtp_host:
+            return False
+
+        if not self.running:
+            self.start()
+
+        with self._condition:
+            if len(self._queue) >= self.max_size:
+                self.rejected_total += 1
+                logger.warning(
+                    "Email queue is full (%s queued); dropping alert %r", len(self._queue), subject
+                )
+                return False
+            opens_batch = not self._queue
+            if opens_batch:
+                self._oldest_enqueued_at = time.monotonic()
+            self._queue.append(EmailNotification(recipients, subject, body))
+            self.enqueued_total += 1
+            # Wake the worker to start the batch window, or to send a full batch now.
+            if opens_batch or len(self._queue) >= self.batch_max_messages:
+                self._condition.notify()
+        return True
+
+    def start(self) -> None:
+        with self._condition:
+            if self.running:
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="email-dispatcher", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stop the worker, attempt everything still queued once and close the connection."""
+
+        with self._condition:
+            self._stop_event.set()
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush(retries=0)
+        with self._send_lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def flush(self, retries: int | None = None) -> int:
+        """Synchronously deliver the queue; returns the number of notifications sent."""
+
+        delivered = 0
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return delivered
+            delivered += self._deliver(batch, self.max_retries if retries is None else retries)
+
+    def stats(self) -> dict:
+        with self._condition:
+            depth = len(self._queue)
+        return {
+            "running": self.running,
+            "queue_depth": depth,
+            "max_size": self.max_size,
+            "enqueued_total": self.enqueued_total,
+            "rejected_total": self.rejected_total,
+            "delivered_total": self.delivered_total,
+            "sent_emails": self.sent_emails,
+            "failed_attempts": self.failed_attempts,
+            "dropped_total": self.dropped_total,
+            "smtp_connects": self.connects,
+        }
+
+    def _take_batch(self) -> list[EmailNotification]:
+        with self._condition:
+            size = min(self.batch_max_messages, len(self._queue))
+            batch = [self._queue.popleft() for _ in range(size)]
+            self._oldest_enqueued_at = time.monotonic() if self._queue else None
+            return batch
+
+    def _deliver(self, batch: list[EmailNotification], retries: int) -> int:
+        groups: dict[tuple[str, ...], list[EmailNotification]] = {}
+        for notification in batch:
+            groups.setdefault(notification.recipients, []).append(notification)
+
+        delivered = 0
+        for notifications in groups.values():
+            sent = self._send(notifications, retries)
+            if sent:
+                delivered += len(notifications)
+            elif sent is not None:
+                self.dropped_total += len(notifications)
+        self.delivered_total += delivered
+        return delivered
+
+    def _send(self, notifications: list[EmailNotification], retries: int) -> bool | None:
+        """Send one digest; ``None`` when it was put back on the queue for shutdown."""
+
+        notification = digest(notifications)
+        message = build_message(notification.recipients, notification.subject, notification.body)
+        for attempt in range(retries + 1):
+            with self._send_lock:
+                if self._connection is None:
+                    self._connection = self.connection_factory()
+                connects = self._connection.connects
+                try:
+                    self._connection.send(message)
+                except Exception as exc:
+                    self.failed_attempts += 1
+                    self._connection.close()
+                    if _permanent(exc) or attempt == retries:
+                        logger.warning(
+                            "Dropping email %r to %s: %s", notification.subject, notification.recipients, exc
+                        )
+                        return False
+                    logger.info("Email %r failed (%s); retrying", notification.subject, exc)
+                else:
+                    self.sent_emails += 1
+                    return True
+                finally:
+                    self.connects += self._connection.connects - connects
+            delay = min(self.retry_backoff_seconds * 2**attempt, _MAX_BACKOFF_SECONDS)
+            if self._stop_event.wait(delay):
+                # Shutting down: one last attempt happens in the final flush.
+                self._requeue(notifications)
+                return None
+        return False
+
+    def _requeue(self, notifications: list[EmailNotification]) -> None:
+        with self._condition:
+            self._queue.extendleft(reversed(notifications))
+            if self._oldest_enqueued_at is None:
+                self._oldest_enqueued_at = time.monotonic()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._stop_event.is_set():
+                    if len(self._queue) >= self.batch_max_messages:
+                        break
+                    if self._oldest_enqueued_at is not None:
+                        waited = time.monotonic() - self._oldest_enqueued_at
+                        remaining = self.batch_window_seconds - waited
+                        if remaining <= 0:
+                            break
+                        self._condition.wait(remaining)
+                    else:
+                        self._condition.wait()
+                if self._stop_event.is_set():
+                    return
+
+            batch = self._take_batch()
+            if batch:
+                self._deliver(batch, self.max_retries)
+
+
+email_dispatcher = EmailDispatcher.from_settings()
+
+
+def queue_email(to_addresses: Iterable[str], subject: str, body: str) -> bool:
+    return email_dispatcher.submit(to_addresses, subject, body)
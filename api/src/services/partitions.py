@@ -0,0 +1,330 @@
+"""Monthly range partitioning of ``chiller_telemetry`` on Postgres.
+
+Partitioning is opt-in via ``TELEMETRY_PARTITIONING``. Once the table has been
+converted (by the Alembic migration, ``python -m src.services.partitions convert`` or
+automatically when the table is still empty), every month lives in its own
+``chiller_telemetry_yYYYYmMM`` partition. Partitions are created ahead of time by a
+background task and on demand for back-dated readings. SQLite and unpartitioned
+Postgres databases are left alone.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import re
+import sys
+import threading
+from datetime import datetime, timezone
+from typing import Iterable, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateIndex
+
+from src import db as db_module
+from src.config import settings
+from src.models import ChillerTelemetry
+from .time_buckets import advance, as_utc, floor_timestamp
+
+logger = logging.getLogger(__name__)
+
+PARENT = ChillerTelemetry.__tablename__
+_PARTITION_NAME = re.compile(rf"^{PARENT}_y(\d{{4}})m(\d{{2}})$")
+
+
+def partition_name(month: datetime) -> str:
+    return f"{PARENT}_y{month:%Y}m{month:%m}"
+
+
+def months_between(start: datetime, end: datetime) -> list[datetime]:
+    """Month starts from ``start``'s month through ``end``'s month, inclusive."""
+
+    month = floor_timestamp(start, "month")
+    last = floor_timestamp(end, "month")
+    months = []
+    while month <= last:
+        months.append(month)
+        month = advance(month, "month")
+    return months
+
+
+def partition_ddl(month: datetime) -> str:
+    month = floor_timestamp(month, "month")
+    upper = advance(month, "month")
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF {PARENT} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+    )
+
+
+def is_partitioned(connection: Connection) -> bool:
+    if connection.dialect.name != "postgresql":
+        return False
+    return bool(
+        connection.execute(
+            text(
+                "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table p "
+                "JOIN pg_class c ON c.oid = p.partrelid "
+                "WHERE c.relname = :name AND pg_table_is_visible(c.oid))"
+            ),
+            {"name": PARENT},
+        ).scalar()
+    )
+
+
+def existing_partitions(connection: Connection) -> set[datetime]:
+    names = connection.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits i "
+            "JOIN pg_class parent ON parent.oid = i.inhparent "
+            "JOIN pg_class child ON child.oid = i.inhrelid "
+            "WHERE parent.relname = :name AND pg_table_is_visible(parent.oid)"
+        ),
+        {"name": PARENT},
+    ).scalars()
+    months = set()
+    for name in names:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            months.add(datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=timezone.utc))
+    return months
+
+
+class PartitionRegistry:
+    """Per-engine memory of whether telemetry is partitioned and which months exist.
+
+    Keeps the ingest path to a set lookup; the catalog is only read the first time an
+    engine is seen and after :meth:`forget`.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._state: dict[str, tuple[bool, set[datetime]]] = {}
+
+    def ensure_for(self, bind: Engine | Connection, timestamps: Iterable[datetime]) -> int:
+        """Create any missing partitions for ``timestamps``; returns how many were created."""
+
+        if bind.dialect.name != "postgresql":
+            return 0
+        engine = bind.engine
+        partitioned, months = self._load(engine)
+        if not partitioned:
+            return 0
+        needed = {floor_timestamp(as_utc(value), "month") for value in timestamps} - months
+        return self._create(engine, needed)
+
+    def ensure_ahead(
+        self, bind: Engine | Connection, months_ahead: int, now: datetime | None = None
+    ) -> int:
+        now = as_utc(now or datetime.now(timezone.utc))
+        return self.ensure_for(bind, months_between(now, advance(now, "month", months_ahead)))
+
+    def forget(self) -> None:
+        with self._lock:
+            self._state.clear()
+
+    def _load(self, engine: Engine) -> tuple[bool, set[datetime]]:
+        key = str(engine.url)
+        with self._lock:
+            state = self._state.get(key)
+        if state is not None:
+            return state
+        with engine.connect() as connection:
+            partitioned = is_partitioned(connection)
+            months = existing_partitions(connection) if partitioned else set()
+        with self._lock:
+            return self._state.setdefault(key, (partitioned, months))
+
+    def _create(self, engine: Engine, months: set[datetime]) -> int:
+        if not months:
+            return 0
+        # Created outside the caller's transaction so a rolled-back insert does not
+        # take the partition with it.
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            for month in sorted(months):
+                connection.execute(text(partition_ddl(month)))
+                logger.info("Created telemetry partition %s", partition_name(month))
+        with self._lock:
+            state = self._state.get(str(engine.url))
+            if state is not None:
+                state[1].update(months)
+        return len(months)
+
+
+telemetry_partitions = PartitionRegistry()
+
+
+def _table_columns(connection: Connection, table: str) -> set[str]:
+    return set(
+        connection.execute(
+            text(
+                "SELECT column_name FROM information_schema.columns "
+                "WHERE table_name = :table AND table_schema = current_schema()"
+            ),
+            {"table": table},
+        ).scalars()
+    )
+
+
+def _rebuild(
+    connection: Connection, partitioned: bool, months_ahead: int, now: datetime | None
+) -> int:
+    """Recreate the telemetry table with or without partitioning and copy its rows."""
+
+    staging = f"{PARENT}_previous"
+    connection.execute(text(f"LOCK TABLE {PARENT} IN ACCESS EXCLUSIVE MODE"))
+    sequence = connection.execute(
+        text("SELECT pg_get_serial_sequence(:table, 'id')"), {"table": PARENT}
+    ).scalar()
+    columns = _table_columns(connection, PARENT)
+
+    connection.execute(text(f"ALTER TABLE {PARENT} RENAME TO {staging}"))
+    connection.execute(text(f"ALTER TABLE {staging} RENAME CONSTRAINT {PARENT}_pkey TO {staging}_pkey"))
+    for index in ChillerTelemetry.__table__.indexes:
+        connection.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+
+    if partitioned:
+        connection.execute(
+            text(
+                f"CREATE TABLE {PARENT} (LIKE {staging} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+                'PARTITION BY RANGE ("timestamp")'
+            )
+        )
+        # The partition key has to be part of every unique constraint.
+        connection.execute(text(f'ALTER TABLE {PARENT} ADD PRIMARY KEY (id, "timestamp")'))
+        bounds = connection.execute(text(f'SELECT min("timestamp"), max("timestamp") FROM {staging}')).one()
+        now = as_utc(now or datetime.now(timezone.utc))
+        first = as_utc(bounds[0]) if bounds[0] is not None else now
+        last = max(as_utc(bounds[1]) if bounds[1] is not None else now, now)
+        for month in months_between(first, advance(floor_timestamp(last, "month"), "month", months_ahead)):
+            connection.execute(text(partition_ddl(month)))
+    else:
+        connection.execute(
+            text(f"CREATE TABLE {PARENT} (LIKE {staging} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+        )
+        connection.execute(text(f"ALTER TABLE {PARENT} ADD PRIMARY KEY (id)"))
+
+    if sequence:
+        connection.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {PARENT}.id"))
+    copied = connection.execute(text(f"INSERT INTO {PARENT} SELECT * FROM {staging}")).rowcount
+    connection.execute(text(f"DROP TABLE {staging} CASCADE"))
+
+    for index in ChillerTelemetry.__table__.indexes:
+        if {column.name for column in index.columns} <= columns:
+            connection.execute(CreateIndex(index))
+    telemetry_partitions.forget()
+    return copied
+
+
+def convert_to_partitioned(
+    connection: Connection, months_ahead: int | None = None, now: datetime | None = None
+) -> int:
+    """Convert the unpartitioned table in place; returns the number of rows copied.
+
+    Runs inside the caller's transaction and holds an exclusive lock on the table for
+    the duration of the copy.
+    """
+
+    if connection.dialect.name != "postgresql":
+        raise ValueError("Telemetry partitioning requires Postgres")
+    if is_partitioned(connection):
+        return 0
+    if months_ahead is None:
+        months_ahead = settings.telemetry_partition_months_ahead
+    return _rebuild(connection, partitioned=True, months_ahead=months_ahead, now=now)
+
+
+def revert_partitioning(connection: Connection) -> int:
+    """Fold all partitions back into a plain table; returns the number of rows copied."""
+
+    if not is_partitioned(connection):
+        return 0
+    return _rebuild(connection, partitioned=False, months_ahead=0, now=None)
+
+
+def partition_empty_table(bind: Engine) -> bool:
+    """Partition a freshly created, still empty table when partitioning is enabled."""
+
+    if not settings.telemetry_partitioning or bind.dialect.name != "postgresql":
+        return False
+    with bind.begin() as connection:
+        if is_partitioned(connection):
+            return False
+        if connection.execute(text(f"SELECT EXISTS (SELECT 1 FROM {PARENT})")).scalar():
+            logger.warning(
+                "TELEMETRY_PARTITIONING is enabled but %s holds data; run "
+                "`python -m src.services.partitions convert` to partition it",
+                PARENT,
+            )
+            return False
+        convert_to_partitioned(connection)
+    return True
+
+
+def drop_empty_partitions(bind: Engine | Connection, before: datetime) -> list[str]:
+    """Drop partitions that end by ``before`` and hold no rows (e.g. after archiving)."""
+
+    if bind.dialect.name != "postgresql":
+        return []
+    dropped = []
+    with bind.engine.begin() as connection:
+        if not is_partitioned(connection):
+            return []
+        for month in sorted(existing_partitions(connection)):
+            if advance(month, "month") > as_utc(before):
+                continue
+            name = partition_name(month)
+            if connection.execute(text(f"SELECT EXISTS (SELECT 1 FROM {name})")).scalar():
+                continue
+            connection.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+    if dropped:
+        telemetry_partitions.forget()
+        logger.info("Dropped empty telemetry partitions: %s", ", ".join(dropped))
+    return dropped
+
+
+def run_partition_maintenance() -> int:
+    """Re-read the catalog and create partitions for the coming months."""
+
+    telemetry_partitions.forget()
+    return telemetry_partitions.ensure_ahead(
+        db_module.telemetry_engine, settings.telemetry_partition_months_ahead
+    )
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Manage chiller_telemetry partitions")
+    parser.add_argument("command", choices=["status", "convert", "ensure", "revert"])
+    parser.add_argument("--months-ahead", type=int, default=settings.telemetry_partition_months_ahead)
+    args = parser.parse_args(argv)
+
+    engine = db_module.telemetry_engine
+    if engine.dialect.name != "postgresql":
+        print(f"[partitions] {engine.dialect.name} databases are never partitioned")
+        return 1
+
+    if args.command == "convert":
+        with engine.begin() as connection:
+            copied = convert_to_partitioned(connection, args.months_ahead)
+        print(f"[partitions] copied {copied} rows into the partitioned table")
+    elif args.command == "revert":
+        with engine.begin() as connection:
+            copied = revert_partitioning(connection)
+        print(f"[partitions] copied {copied} rows back into a plain table")
+    elif args.command == "ensure":
+        telemetry_partitions.forget()
+        created = telemetry_partitions.ensure_ahead(engine, args.months_ahead)
+        print(f"[partitions] created {created} partitions")
+
+    with engine.connect() as connection:
+        if not is_partitioned(connection):
+            print(f"[partitions] {PARENT} is not partitioned")
+            return 0
+        months = sorted(existing_partitions(connection))
+    print(f"[partitions] {len(months)} partitions: {', '.join(partition_name(m) for m in months)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
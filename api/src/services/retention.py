@@ -0,0 +1,355 @@
+"""Expire raw telemetry and rollups according to per-organization retention policies.
+
+Each run first catches rollups up, then deletes expired rows tier by tier in bounded,
+individually committed batches. A tier's rows are only deleted once the next coarser
+grain has absorbed them, so expiring raw data never loses history that a kept rollup
+still needs. Re-running after an interruption simply continues with what is left.
+
+Run manually with ``python -m src.services.retention [--dry-run]``.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass, field, replace
+from datetime import datetime, timedelta, timezone
+from typing import Sequence
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.orm import Session
+
+from src import db as db_module
+from src.config import settings
+from src.models import ChillerTelemetry, TelemetryRetentionPolicy, TelemetryRollup
+from src.schemas.retention_policy import RETENTION_TIERS, RetentionTier
+from .analytics_cache import analytics_cache
+from .rollups import refresh_rollups
+from .telemetry_aggregates import load_watermarks
+from .telemetry_archive import expire_segments
+from .time_buckets import as_utc, floor_timestamp
+
+logger = logging.getLogger(__name__)
+
+# Fixed-width tuple header plus per-index entry overhead, used when the database has no
+# size statistics to offer.
+_TUPLE_HEADER_BYTES = 24
+_INDEX_ENTRY_BYTES = 16
+
+
+@dataclass
+class RetentionTarget:
+    """Rows of one tier of one organization that fall outside its policy."""
+
+    organization_id: int
+    tier: RetentionTier
+    cutoff: datetime
+    # Cutoff after holding back rows a coarser rollup has not absorbed yet.
+    effective_cutoff: datetime | None
+    rows: int = 0
+    bytes: int = 0
+    complete: bool = True
+
+
+@dataclass
+class RetentionReport:
+    dry_run: bool
+    started_at: datetime
+    finished_at: datetime | None = None
+    targets: list[RetentionTarget] = field(default_factory=list)
+
+    @property
+    def rows(self) -> int:
+        return sum(target.rows for target in self.targets)
+
+    @property
+    def bytes(self) -> int:
+        return sum(target.bytes for target in self.targets)
+
+    def as_dict(self) -> dict:
+        return {**asdict(self), "rows": self.rows, "bytes": self.bytes}
+
+    def for_organization(self, organization_id: int) -> RetentionReport:
+        """This report narrowed to the targets of one organization."""
+
+        targets = [target for target in self.targets if target.organization_id == organization_id]
+        return replace(self, targets=targets)
+
+
+class RetentionStatus:
+    """Progress and outcome of the retention job in this process."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.runs = 0
+        self.failures = 0
+        self.last_error: str | None = None
+        self.last_run: RetentionReport | None = None
+        self.current: RetentionReport | None = None
+
+    def as_dict(self, organization_id: int | None = None) -> dict:
+        """The job's status; with ``organization_id``, only what that organization may see.
+
+        The last error and other organizations' targets are left out of a scoped status.
+        """
+
+        report = self.current or self.last_run
+        if report is not None and organization_id is not None:
+            report = report.for_organization(organization_id)
+        return {
+            "running": self.current is not None,
+            "runs": self.runs,
+            "failures": self.failures,
+            "last_error": self.last_error if organization_id is None else None,
+            "last_run": report.as_dict() if report is not None else None,
+        }
+
+
+retention_status = RetentionStatus()
+
+
+def policy_cutoffs(policy: TelemetryRetentionPolicy, now: datetime) -> dict[str, datetime]:
+    cutoffs = {}
+    for tier in RETENTION_TIERS:
+        days = getattr(policy, f"{tier}_retention_days")
+        if days:
+            cutoff = now - timedelta(days=days)
+            cutoffs[tier] = cutoff if tier == "raw" else floor_timestamp(cutoff, tier)
+    return cutoffs
+
+
+def effective_cutoff(
+    tier: RetentionTier, cutoff: datetime, watermarks: dict[str, datetime]
+) -> datetime | None:
+    """Clamp ``cutoff`` to what the next coarser grain has already rolled up."""
+
+    index = RETENTION_TIERS.index(tier)
+    if index == len(RETENTION_TIERS) - 1:
+        return cutoff
+    watermark = watermarks.get(RETENTION_TIERS[index + 1])
+    if watermark is None:
+        return None
+    return min(cutoff, watermark)
+
+
+def _tier_model(tier: RetentionTier):
+    return ChillerTelemetry if tier == "raw" else TelemetryRollup
+
+
+def _tier_filters(tier: RetentionTier, organization_id: int, before: datetime) -> list:
+    if tier == "raw":
+        return [
+            ChillerTelemetry.organization_id == organization_id,
+            ChillerTelemetry.timestamp < before,
+        ]
+    return [
+        TelemetryRollup.organization_id == organization_id,
+        TelemetryRollup.grain == tier,
+        TelemetryRollup.bucket_start < before,
+    ]
+
+
+def estimate_row_bytes(session: Session, model) -> int:
+    """Average on-disk size of a row including its index entries."""
+
+    table = model.__table__
+    if session.get_bind().dialect.name == "postgresql":
+        # Partitions carry the data of a partitioned table, so include them.
+        size, tuples = session.execute(
+            text(
+                "SELECT sum(pg_total_relation_size(c.oid)), sum(greatest(c.reltuples, 0)) "
+                "FROM pg_class c WHERE c.oid = CAST(:table AS regclass) OR c.oid IN "
+                "(SELECT inhrelid FROM pg_inherits WHERE inhparent = CAST(:table AS regclass))"
+            ),
+            {"table": table.name},
+        ).one()
+        if size and tuples:
+            return int(size / tuples)
+
+    row_bytes = _TUPLE_HEADER_BYTES + 8 * len(table.columns)
+    for index in table.indexes:
+        row_bytes += _INDEX_ENTRY_BYTES + 8 * len(index.columns)
+    for constraint in table.constraints:
+        row_bytes += _INDEX_ENTRY_BYTES + 8 * len(getattr(constraint, "columns", ()))
+    return row_bytes
+
+
+def _purge(
+    session: Session,
+    target: RetentionTarget,
+    batch_size: int,
+    max_batches: int | None,
+    pause_seconds: float,
+) -> None:
+    model = _tier_model(target.tier)
+    filters = _tier_filters(target.tier, target.organization_id, target.effective_cutoff)
+    batches = 0
+    while True:
+        if max_batches is not None and batches >= max_batches:
+            target.complete = False
+            return
+        expired_ids = select(model.id).where(*filters).limit(batch_size).scalar_subquery()
+        deleted = session.execute(
+            delete(model).where(model.id.in_(expired_ids)),
+            execution_options={"synchronize_session": False},
+        ).rowcount
+        session.commit()
+        batches += 1
+        target.rows += deleted
+        if deleted < batch_size:
+            return
+        if pause_seconds:
+            time.sleep(pause_seconds)
+
+
+def run_retention(
+    db: Session,
+    telemetry_db: Session,
+    dry_run: bool = False,
+    organization_id: int | None = None,
+    now: datetime | None = None,
+    batch_size: int | None = None,
+    max_batches: int | None = None,
+    report: RetentionReport | None = None,
+) -> RetentionReport:
+    """Apply retention policies, or only measure them when ``dry_run`` is set.
+
+    ``max_batches`` bounds the deletes per tier and organization for maintenance
+    windows; targets cut short are reported with ``complete=False``. Targets are
+    appended to ``report`` as they are processed, so a caller can watch progress.
+    """
+
+    now = as_utc(now or datetime.now(timezone.utc))
+    batch_size = batch_size or settings.retention_batch_size
+    if report is None:
+        report = RetentionReport(dry_run=dry_run, started_at=datetime.now(timezone.utc))
+
+    query = db.query(TelemetryRetentionPolicy)
+    if organization_id is not None:
+        query = query.filter(TelemetryRetentionPolicy.organization_id == organization_id)
+    policies = query.order_by(TelemetryRetentionPolicy.organization_id).all()
+    if not policies:
+        report.finished_at = datetime.now(timezone.utc)
+        return report
+
+    if not dry_run:
+        # Downsample first so the newest expired rows are already in the rollups.
+        refresh_rollups(telemetry_db, now)
+    watermarks = load_watermarks(telemetry_db)
+    row_bytes = {
+        model: estimate_row_bytes(telemetry_db, model) for model in (ChillerTelemetry, TelemetryRollup)
+    }
+
+    for policy in policies:
+        for tier, cutoff in policy_cutoffs(policy, now).items():
+            target = RetentionTarget(
+                organization_id=policy.organization_id,
+                tier=tier,
+                cutoff=cutoff,
+                effective_cutoff=effective_cutoff(tier, cutoff, watermarks),
+            )
+            report.targets.append(target)
+            if target.effective_cutoff is None:
+                continue
+
+            if dry_run:
+                model = _tier_model(tier)
+                target.rows = telemetry_db.execute(
+                    select(func.count(model.id)).where(
+                        *_tier_filters(tier, target.organization_id, target.effective_cutoff)
+                    )
+                ).scalar_one()
+            else:
+                _purge(
+                    telemetry_db,
+                    target,
+                    batch_size,
+                    max_batches,
+                    settings.retention_batch_pause_seconds,
+                )
+            target.bytes = target.rows * row_bytes[_tier_model(tier)]
+            if tier == "raw":
+                # Raw readings moved to cold storage expire with the raw tier too.
+                archived_rows, archived_bytes = expire_segments(
+                    telemetry_db, target.organization_id, target.effective_cutoff, dry_run
+                )
+                target.rows += archived_rows
+                target.bytes += archived_bytes
+            if not dry_run:
+                if target.rows:
+                    analytics_cache.invalidate_organization(target.organization_id)
+                logger.info(
+                    "Retention removed %s %s rows for organization %s older than %s",
+                    target.rows,
+                    tier,
+                    target.organization_id,
+                    target.effective_cutoff.isoformat(),
+                )
+
+    report.finished_at = datetime.now(timezone.utc)
+    return report
+
+
+def run_scheduled_retention() -> RetentionReport | None:
+    if not retention_status.lock.acquire(blocking=False):
+        logger.info("Retention run already in progress; skipping")
+        return None
+    db = db_module.SessionLocal()
+    telemetry_db = db_module.TelemetrySessionLocal()
+    try:
+        retention_status.current = RetentionReport(
+            dry_run=False, started_at=datetime.now(timezone.utc)
+        )
+        report = run_retention(db, telemetry_db, report=retention_status.current)
+        retention_status.last_run = report
+        retention_status.last_error = None
+        retention_status.runs += 1
+        return report
+    except Exception as exc:
+        retention_status.failures += 1
+        retention_status.last_error = str(exc)
+        raise
+    finally:
+        retention_status.current = None
+        telemetry_db.close()
+        db.close()
+        retention_status.lock.release()
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Apply telemetry retention policies")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would be removed")
+    parser.add_argument("--organization-id", type=int, default=None)
+    parser.add_argument("--max-batches", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    db = db_module.SessionLocal()
+    telemetry_db = db_module.TelemetrySessionLocal()
+    try:
+        report = run_retention(
+            db,
+            telemetry_db,
+            dry_run=args.dry_run,
+            organization_id=args.organization_id,
+            max_batches=args.max_batches,
+        )
+    finally:
+        telemetry_db.close()
+        db.close()
+
+    verb = "would remove" if report.dry_run else "removed"
+    for target in report.targets:
+        held = "" if target.effective_cutoff == target.cutoff else " (held back until rolled up)"
+        suffix = "" if target.complete else " (incomplete)"
+        print(
+            f"[retention] org {target.organization_id} {target.tier}: {verb} "
+            f"{target.rows} rows (~{target.bytes} bytes){held}{suffix}"
+        )
+    print(f"[retention] total: {verb} {report.rows} rows (~{report.bytes} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
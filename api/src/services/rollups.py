@@ -0,0 +1,346 @@
+"""Maintain minute/hour/day/month telemetry rollups.
+
+Rollups are materialised by a catch-up job that advances a per-grain watermark:
+minute buckets are built from raw telemetry and every coarser grain from the grain
+below it. Readings that arrive after their bucket has been rolled up are folded in
+incrementally at ingest time, so rollups stay exact without rescanning history.
+
+Run the catch-up job manually with ``python -m src.services.rollups``.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Sequence
+
+from sqlalchemy import delete, func, insert, text
+from sqlalchemy.orm import Session
+
+from src import db as db_module
+from src.config import settings
+from src.models import ChillerTelemetry, TelemetryRollup, TelemetryRollupWatermark
+from .telemetry_aggregates import cooling_load_expression, load_watermarks
+from .time_buckets import GRAINS, Granularity, advance, as_utc, bucket_expression, floor_timestamp, parse_bucket
+
+logger = logging.getLogger(__name__)
+
+_SOURCE_GRAIN: dict[str, Granularity | None] = {
+    "minute": None,
+    "hour": "minute",
+    "day": "hour",
+    "month": "day",
+}
+_CHUNK_BUCKETS = {"minute": 1440, "hour": 24 * 7, "day": 92, "month": 12}
+_SUM_COLUMNS = (
+    "sample_count",
+    "cooling_load_sum",
+    "cooling_load_count",
+    "power_kw_sum",
+    "cop_sum",
+    "inlet_temp_sum",
+    "outlet_temp_sum",
+)
+_ADVISORY_LOCK_KEY = 727_001
+# Taken exclusively by every refresh chunk and shared by ingest of late readings, so a
+# late reading is either committed before a chunk reads its source rows or folded in
+# against the watermark that chunk commits. SQLite serialises the two on its write lock.
+_WATERMARK_LOCK_KEY = 727_002
+
+
+def _dialect(session: Session) -> str:
+    return session.get_bind().dialect.name
+
+
+def _earliest_source(session: Session, grain: Granularity) -> datetime | None:
+    source = _SOURCE_GRAIN[grain]
+    if source is None:
+        value = session.query(func.min(ChillerTelemetry.timestamp)).scalar()
+    else:
+        value = (
+            session.query(func.min(TelemetryRollup.bucket_start))
+            .filter(TelemetryRollup.grain == source)
+            .scalar()
+        )
+    return as_utc(value) if value is not None else None
+
+
+def _next_source_timestamp(
+    session: Session, grain: Granularity, after: datetime, before: datetime
+) -> datetime | None:
+    source = _SOURCE_GRAIN[grain]
+    if source is None:
+        value = (
+            session.query(func.min(ChillerTelemetry.timestamp))
+            .filter(ChillerTelemetry.timestamp >= after, ChillerTelemetry.timestamp < before)
+            .scalar()
+        )
+    else:
+        value = (
+            session.query(func.min(TelemetryRollup.bucket_start))
+            .filter(
+                TelemetryRollup.grain == source,
+                TelemetryRollup.bucket_start >= after,
+                TelemetryRollup.bucket_start < before,
+            )
+            .scalar()
+        )
+    return as_utc(value) if value is not None else None
+
+
+def _source_rows(session: Session, grain: Granularity, start: datetime, end: datetime):
+    dialect = _dialect(session)
+    source = _SOURCE_GRAIN[grain]
+    if source is None:
+        bucket = bucket_expression(ChillerTelemetry.timestamp, grain, dialect)
+        cooling = cooling_load_expression()
+        return (
+            session.query(
+                bucket,
+                ChillerTelemetry.chiller_unit_id.label("chiller_unit_id"),
+                func.max(ChillerTelemetry.organization_id).label("organization_id"),
+                func.max(ChillerTelemetry.building_id).label("building_id"),
+                func.count(ChillerTelemetry.id).label("sample_count"),
+                func.coalesce(func.sum(cooling), 0).label("cooling_load_sum"),
+                func.count(cooling).label("cooling_load_count"),
+                func.sum(ChillerTelemetry.power_kw).label("power_kw_sum"),
+                func.sum(ChillerTelemetry.cop).label("cop_sum"),
+                func.sum(ChillerTelemetry.inlet_temp).label("inlet_temp_sum"),
+                func.sum(ChillerTelemetry.outlet_temp).label("outlet_temp_sum"),
+            )
+            .filter(ChillerTelemetry.timestamp >= start, ChillerTelemetry.timestamp < end)
+            .group_by(bucket, ChillerTelemetry.chiller_unit_id)
+            .all()
+        )
+
+    bucket = bucket_expression(TelemetryRollup.bucket_start, grain, dialect)
+    return (
+        session.query(
+            bucket,
+            TelemetryRollup.chiller_unit_id.label("chiller_unit_id"),
+            func.max(TelemetryRollup.organization_id).label("organization_id"),
+            func.max(TelemetryRollup.building_id).label("building_id"),
+            *(func.sum(getattr(TelemetryRollup, column)).label(column) for column in _SUM_COLUMNS),
+        )
+        .filter(
+            TelemetryRollup.grain == source,
+            TelemetryRollup.bucket_start >= start,
+            TelemetryRollup.bucket_start < end,
+        )
+        .group_by(bucket, TelemetryRollup.chiller_unit_id)
+        .all()
+    )
+
+
+def _materialise(session: Session, grain: Granularity, start: datetime, end: datetime) -> int:
+    session.execute(
+        delete(TelemetryRollup).where(
+            TelemetryRollup.grain == grain,
+            TelemetryRollup.bucket_start >= start,
+            TelemetryRollup.bucket_start < end,
+        )
+    )
+    rows = [
+        {
+            "grain": grain,
+            "bucket_start": parse_bucket(row.bucket),
+            "organization_id": row.organization_id,
+            "building_id": row.building_id,
+            "chiller_unit_id": row.chiller_unit_id,
+            **{column: getattr(row, column) or 0 for column in _SUM_COLUMNS},
+        }
+        for row in _source_rows(session, grain, start, end)
+    ]
+    if rows:
+        session.execute(insert(TelemetryRollup), rows)
+    return len(rows)
+
+
+def _lock_watermarks(session: Session, shared: bool = False) -> None:
+    """Hold the watermark lock until the session's transaction ends."""
+
+    if _dialect(session) != "postgresql":
+        return
+    function = "pg_advisory_xact_lock_shared" if shared else "pg_advisory_xact_lock"
+    session.execute(text(f"SELECT {function}(:key)"), {"key": _WATERMARK_LOCK_KEY})
+
+
+def _set_watermark(session: Session, grain: Granularity, value: datetime) -> None:
+    watermark = session.get(TelemetryRollupWatermark, grain)
+    if watermark is None:
+        session.add(TelemetryRollupWatermark(grain=grain, rolled_up_to=value))
+    else:
+        watermark.rolled_up_to = value
+
+
+def _refresh_grains(session: Session, horizon: datetime) -> dict[str, int]:
+    watermarks = load_watermarks(session)
+    written: dict[str, int] = {}
+    for grain in GRAINS:
+        stop = floor_timestamp(horizon, grain)
+        source = _SOURCE_GRAIN[grain]
+        if source is not None:
+            if source not in watermarks:
+                continue
+            stop = min(stop, floor_timestamp(watermarks[source], grain))
+
+        cursor = watermarks.get(grain) or _earliest_source(session, grain)
+        if cursor is None:
+            continue
+        cursor = floor_timestamp(cursor, grain)
+
+        count = 0
+        while cursor < stop:
+            chunk_end = min(advance(cursor, grain, _CHUNK_BUCKETS[grain]), stop)
+            _lock_watermarks(session)
+            materialised = _materialise(session, grain, cursor, chunk_end)
+            count += materialised
+            next_cursor = chunk_end
+            if not materialised and chunk_end < stop:
+                # Skip empty stretches instead of walking them chunk by chunk.
+                upcoming = _next_source_timestamp(session, grain, chunk_end, stop)
+                next_cursor = stop if upcoming is None else max(chunk_end, floor_timestamp(upcoming, grain))
+            _set_watermark(session, grain, next_cursor)
+            session.commit()
+            watermarks[grain] = next_cursor
+            cursor = next_cursor
+
+        written[grain] = count
+    return written
+
+
+def refresh_rollups(session: Session, until: datetime | None = None) -> dict[str, int]:
+    """Materialise all closed buckets up to ``until`` minus the configured lag.
+
+    Work is committed chunk by chunk together with the watermark, so an interrupted
+    run resumes where it stopped. Returns the number of rollup rows written per grain.
+    """
+
+    horizon = as_utc(until or datetime.now(timezone.utc)) - timedelta(
+        seconds=settings.rollup_lag_seconds
+    )
+
+    if _dialect(session) != "postgresql":
+        return _refresh_grains(session, horizon)
+
+    # Only one process may advance the watermarks at a time.
+    lock_connection = session.get_bind().connect()
+    try:
+        acquired = lock_connection.execute(
+            text("SELECT pg_try_advisory_lock(:key)"), {"key": _ADVISORY_LOCK_KEY}
+        ).scalar()
+        lock_connection.commit()
+        if not acquired:
+            logger.info("Rollup refresh already running elsewhere; skipping")
+            return {}
+        try:
+            return _refresh_grains(session, horizon)
+        finally:
+            lock_connection.execute(
+                text("SELECT pg_advisory_unlock(:key)"), {"key": _ADVISORY_LOCK_KEY}
+            )
+            lock_connection.commit()
+    finally:
+        lock_connection.close()
+
+
+def _upsert_statement(session: Session):
+    dialect = _dialect(session)
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:  # pragma: no cover - only Postgres and SQLite are supported
+        return None
+
+    table = TelemetryRollup.__table__
+    statement = dialect_insert(table)
+    return statement.on_conflict_do_update(
+        index_elements=["grain", "chiller_unit_id", "bucket_start"],
+        set_={column: table.c[column] + statement.excluded[column] for column in _SUM_COLUMNS},
+    )
+
+
+def apply_late_readings(session: Session, rows: Sequence[dict]) -> int:
+    """Fold readings whose buckets are already rolled up into those rollups.
+
+    Readings newer than the refresh lag can never sit behind a watermark, so the
+    common on-time ingest path returns without touching the database. Rows carry
+    their derived columns, as prepared by ``insert_telemetry_rows``, and must already
+    be inserted in the session's transaction: the watermarks are read under the lock
+    that refresh chunks take, so no chunk can roll a bucket up between this read and
+    the commit without seeing the rows.
+    """
+
+    horizon = datetime.now(timezone.utc) - timedelta(seconds=settings.rollup_lag_seconds)
+    late = [row for row in rows if as_utc(row["timestamp"]) < horizon]
+    if not late:
+        return 0
+
+    _lock_watermarks(session, shared=True)
+    watermarks = load_watermarks(session)
+    if not watermarks:
+        return 0
+
+    increments: dict[tuple, dict] = {}
+    for row in late:
+        timestamp = as_utc(row["timestamp"])
+        cooling = row["cooling_load_rth"]
+        for grain, watermark in watermarks.items():
+            if timestamp >= watermark:
+                continue
+            bucket_start = floor_timestamp(timestamp, grain)
+            entry = increments.setdefault(
+                (grain, row["chiller_unit_id"], bucket_start),
+                {
+                    "grain": grain,
+                    "bucket_start": bucket_start,
+                    "organization_id": row["organization_id"],
+                    "building_id": row["building_id"],
+                    "chiller_unit_id": row["chiller_unit_id"],
+                    **{column: 0 for column in _SUM_COLUMNS},
+                },
+            )
+            entry["sample_count"] += 1
+            if cooling is not None:
+                entry["cooling_load_sum"] += cooling
+                entry["cooling_load_count"] += 1
+            entry["power_kw_sum"] += row["power_kw"]
+            entry["cop_sum"] += row["cop"]
+            entry["inlet_temp_sum"] += row["inlet_temp"]
+            entry["outlet_temp_sum"] += row["outlet_temp"]
+
+    statement = _upsert_statement(session)
+    if not increments or statement is None:
+        return 0
+    session.execute(statement, list(increments.values()))
+    return len(increments)
+
+
+def run_scheduled_refresh() -> dict[str, int]:
+    session = db_module.TelemetrySessionLocal()
+    try:
+        return refresh_rollups(session)
+    finally:
+        session.close()
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Catch up telemetry rollups")
+    parser.add_argument("--until", type=datetime.fromisoformat, default=None)
+    args = parser.parse_args(argv)
+
+    session = db_module.TelemetrySessionLocal()
+    try:
+        written = refresh_rollups(session, args.until)
+    finally:
+        session.close()
+
+    for grain in GRAINS:
+        print(f"[rollups] {grain}: {written.get(grain, 0)} buckets written")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
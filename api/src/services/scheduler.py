@@ -0,0 +1,60 @@
+"""Minimal periodic background task runner for in-process maintenance jobs."""
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """Run ``func`` every ``interval_seconds`` on a daemon thread until stopped.
+
+    With ``run_immediately`` the first run happens as soon as the task starts instead of
+    one interval later.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        interval_seconds: float,
+        func: Callable[[], object],
+        run_immediately: bool = False,
+    ) -> None:
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.func = func
+        self.run_immediately = run_immediately
+        self.runs = 0
+        self.failures = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running or self.interval_seconds <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        delay = 0 if self.run_immediately else self.interval_seconds
+        while not self._stop.wait(delay):
+            delay = self.interval_seconds
+            try:
+                self.func()
+                self.runs += 1
+            except Exception as exc:  # pragma: no cover - defensive logging
+                self.failures += 1
+                logger.warning("Periodic task %s failed: %s", self.name, exc)
@@ -0,0 +1,358 @@
+"""Exact telemetry aggregates served from rollups with a raw-row tail."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Mapping, Optional
+
+from sqlalchemy import and_, case, func
+from sqlalchemy.orm import Session
+
+from src.models import ChillerTelemetry, TelemetryRollup, TelemetryRollupWatermark
+from .telemetry_archive import archived_aggregates, load_archive_segments
+from .time_buckets import (
+    GRAIN_RANK,
+    GRAINS,
+    Granularity,
+    advance,
+    as_utc,
+    bucket_expression,
+    floor_timestamp,
+    is_aligned,
+    parse_bucket,
+)
+
+AggregateKey = tuple[Optional[datetime], Optional[int]]
+
+
+@dataclass
+class AggregatePartial:
+    """Mergeable sums and counts for one output bucket."""
+
+    samples: int = 0
+    cooling_sum: float = 0.0
+    cooling_count: int = 0
+    power_sum: float = 0.0
+    cop_sum: float = 0.0
+    inlet_sum: float = 0.0
+    outlet_sum: float = 0.0
+
+    def merge(self, row) -> None:
+        self.samples += int(row.samples or 0)
+        self.cooling_sum += float(row.cooling_sum or 0)
+        self.cooling_count += int(row.cooling_count or 0)
+        self.power_sum += float(row.power_sum or 0)
+        self.cop_sum += float(row.cop_sum or 0)
+        self.inlet_sum += float(row.inlet_sum or 0)
+        self.outlet_sum += float(row.outlet_sum or 0)
+
+    def mean(self, total: float) -> float:
+        return total / self.samples if self.samples else 0.0
+
+    @property
+    def avg_cooling(self) -> float:
+        return self.cooling_sum / self.cooling_count if self.cooling_count else 0.0
+
+
+@dataclass(frozen=True)
+class TelemetryScope:
+    """Tenant and filter window for an analytics query."""
+
+    organization_id: int
+    start: datetime | None = None
+    end: datetime | None = None
+    building_id: int | None = None
+    chiller_unit_id: int | None = None
+
+
+@dataclass(frozen=True)
+class RollupSegment:
+    """A half-open ``[start, end)`` range answered from one rollup grain.
+
+    ``grain`` is ``None`` for a short raw-telemetry head that lines the range up with
+    the first rollup bucket boundary.
+    """
+
+    grain: Granularity | None
+    start: datetime | None
+    end: datetime
+
+
+def computed_cooling_load_expression():
+    # Basic approximation using flow rate (gpm) * delta T * 500 to BTU/hr then convert to refrigeration tons
+    delta_t = func.nullif(ChillerTelemetry.inlet_temp - ChillerTelemetry.outlet_temp, 0)
+    return ChillerTelemetry.flow_rate * delta_t * 500 / 12000
+
+
+def cooling_load_expression():
+    """Cooling load per reading, read from the stored column where it is filled.
+
+    Only rows written before the derived columns existed and not yet backfilled fall
+    back to the arithmetic.
+    """
+
+    return case(
+        (ChillerTelemetry.delta_t.is_(None), computed_cooling_load_expression()),
+        else_=ChillerTelemetry.cooling_load_rth,
+    )
+
+
+def cooling_load_rth(inlet_temp: float, outlet_temp: float, flow_rate: float) -> float | None:
+    """Python twin of :func:`computed_cooling_load_expression` for a single reading."""
+
+    delta_t = inlet_temp - outlet_temp
+    if delta_t == 0:
+        return None
+    return flow_rate * delta_t * 500 / 12000
+
+
+def derived_values(reading: Mapping) -> dict[str, float | None]:
+    """Derived columns stored with each reading.
+
+    ``kw_per_ton`` is ``None`` whenever the cooling load is undefined or zero.
+    """
+
+    cooling = cooling_load_rth(reading["inlet_temp"], reading["outlet_temp"], reading["flow_rate"])
+    return {
+        "delta_t": reading["inlet_temp"] - reading["outlet_temp"],
+        "cooling_load_rth": cooling,
+        "kw_per_ton": reading["power_kw"] / cooling if cooling else None,
+    }
+
+
+def with_derived_values(reading: Mapping) -> Mapping:
+    """``reading`` with its derived columns, computed only if it does not carry them."""
+
+    if "delta_t" in reading:
+        return reading
+    return {**reading, **derived_values(reading)}
+
+
+def telemetry_filters(
+    scope: TelemetryScope, start: datetime | None = None, before: datetime | None = None
+):
+    """Filters on raw telemetry.
+
+    ``start`` overrides ``scope.start`` for tail reads; ``before`` replaces the
+    inclusive ``scope.end`` with an exclusive bound for head reads.
+    """
+
+    lower = start if start is not None else scope.start
+    filters = [ChillerTelemetry.organization_id == scope.organization_id]
+    if lower is not None:
+        filters.append(ChillerTelemetry.timestamp >= lower)
+    if before is not None:
+        filters.append(ChillerTelemetry.timestamp < before)
+    elif scope.end is not None:
+        filters.append(ChillerTelemetry.timestamp <= scope.end)
+    if scope.building_id is not None:
+        filters.append(ChillerTelemetry.building_id == scope.building_id)
+    if scope.chiller_unit_id is not None:
+        filters.append(ChillerTelemetry.chiller_unit_id == scope.chiller_unit_id)
+    return and_(*filters)
+
+
+def load_watermarks(session: Session) -> dict[str, datetime]:
+    return {
+        row.grain: as_utc(row.rolled_up_to)
+        for row in session.query(
+            TelemetryRollupWatermark.grain, TelemetryRollupWatermark.rolled_up_to
+        ).all()
+    }
+
+
+def plan_rollup_segments(
+    watermarks: dict[str, datetime],
+    granularity: Granularity | None,
+    start: datetime | None,
+    end: datetime | None,
+) -> tuple[list[RollupSegment], datetime | None]:
+    """Cover ``[start, end]`` with the coarsest usable rollups, oldest first.
+
+    Only grains no coarser than ``granularity`` are usable. From ``start`` the plan
+    climbs through finer grains until it reaches a coarse bucket boundary, then walks
+    back down as each coarser grain's watermark is exhausted. Returns the segments and
+    the timestamp from which the remaining tail must be read from raw telemetry.
+    """
+
+    usable = [
+        grain
+        for grain in GRAINS
+        if granularity is None or GRAIN_RANK[grain] <= GRAIN_RANK[granularity]
+    ]
+    original_start = as_utc(start) if start is not None else None
+    cursor = original_start
+    segments: list[RollupSegment] = []
+
+    def append(grain: Granularity | None, segment_end: datetime) -> None:
+        nonlocal cursor
+        previous = segments[-1] if segments else None
+        if previous is not None and previous.grain == grain and previous.end == cursor:
+            segments[-1] = RollupSegment(grain=grain, start=previous.start, end=segment_end)
+        else:
+            segments.append(RollupSegment(grain=grain, start=cursor, end=segment_end))
+        cursor = segment_end
+
+    def cover(grain: Granularity, limit: datetime | None) -> None:
+        watermark = watermarks.get(grain)
+        if watermark is None:
+            return
+        segment_end = watermark if limit is None else min(watermark, limit)
+        if end is not None:
+            segment_end = min(segment_end, floor_timestamp(end, grain))
+        if cursor is None or segment_end > cursor:
+            append(grain, segment_end)
+
+    if cursor is not None and usable:
+        finest = usable[0]
+        if not is_aligned(cursor, finest):
+            append(None, advance(floor_timestamp(cursor, finest), finest))
+        for index, grain in enumerate(usable[:-1]):
+            coarser = usable[index + 1]
+            if is_aligned(cursor, coarser):
+                continue
+            boundary = advance(floor_timestamp(cursor, coarser), coarser)
+            cover(grain, boundary)
+            if cursor != boundary:
+                break
+
+    for grain in reversed(usable):
+        if cursor is None or is_aligned(cursor, grain):
+            cover(grain, None)
+
+    if not any(segment.grain is not None for segment in segments):
+        return [], original_start
+    return segments, cursor
+
+
+def _dialect(session: Session) -> str:
+    bind = session.get_bind()
+    return bind.dialect.name if bind is not None else "sqlite"
+
+
+def raw_aggregate_query(
+    session: Session,
+    scope: TelemetryScope,
+    start: datetime | None,
+    before: datetime | None,
+    granularity: Granularity | None,
+    by_unit: bool,
+):
+    cooling = cooling_load_expression()
+    group_columns = []
+    if granularity is not None:
+        group_columns.append(
+            bucket_expression(ChillerTelemetry.timestamp, granularity, _dialect(session))
+        )
+    if by_unit:
+        group_columns.append(ChillerTelemetry.chiller_unit_id.label("unit_id"))
+
+    query = session.query(
+        *group_columns,
+        func.count(ChillerTelemetry.id).label("samples"),
+        func.sum(cooling).label("cooling_sum"),
+        func.count(cooling).label("cooling_count"),
+        func.sum(ChillerTelemetry.power_kw).label("power_sum"),
+        func.sum(ChillerTelemetry.cop).label("cop_sum"),
+        func.sum(ChillerTelemetry.inlet_temp).label("inlet_sum"),
+        func.sum(ChillerTelemetry.outlet_temp).label("outlet_sum"),
+    ).filter(telemetry_filters(scope, start, before))
+    if group_columns:
+        query = query.group_by(*group_columns)
+    return query
+
+
+def rollup_aggregate_query(
+    session: Session,
+    scope: TelemetryScope,
+    segment: RollupSegment,
+    granularity: Granularity | None,
+    by_unit: bool,
+):
+    group_columns = []
+    if granularity is not None:
+        if granularity == segment.grain:
+            group_columns.append(TelemetryRollup.bucket_start.label("bucket"))
+        else:
+            group_columns.append(
+                bucket_expression(TelemetryRollup.bucket_start, granularity, _dialect(session))
+            )
+    if by_unit:
+        group_columns.append(TelemetryRollup.chiller_unit_id.label("unit_id"))
+
+    filters = [
+        TelemetryRollup.organization_id == scope.organization_id,
+        TelemetryRollup.grain == segment.grain,
+        TelemetryRollup.bucket_start < segment.end,
+    ]
+    if segment.start is not None:
+        filters.append(TelemetryRollup.bucket_start >= segment.start)
+    if scope.building_id is not None:
+        filters.append(TelemetryRollup.building_id == scope.building_id)
+    if scope.chiller_unit_id is not None:
+        filters.append(TelemetryRollup.chiller_unit_id == scope.chiller_unit_id)
+
+    query = session.query(
+        *group_columns,
+        func.sum(TelemetryRollup.sample_count).label("samples"),
+        func.sum(TelemetryRollup.cooling_load_sum).label("cooling_sum"),
+        func.sum(TelemetryRollup.cooling_load_count).label("cooling_count"),
+        func.sum(TelemetryRollup.power_kw_sum).label("power_sum"),
+        func.sum(TelemetryRollup.cop_sum).label("cop_sum"),
+        func.sum(TelemetryRollup.inlet_temp_sum).label("inlet_sum"),
+        func.sum(TelemetryRollup.outlet_temp_sum).label("outlet_sum"),
+    ).filter(and_(*filters))
+    if group_columns:
+        query = query.group_by(*group_columns)
+    return query
+
+
+def aggregate_telemetry(
+    session: Session,
+    scope: TelemetryScope,
+    granularity: Granularity | None = None,
+    by_unit: bool = False,
+) -> dict[AggregateKey, AggregatePartial]:
+    """Aggregate telemetry keyed by ``(bucket, unit_id)``.
+
+    ``bucket`` is ``None`` unless ``granularity`` is given and ``unit_id`` is ``None``
+    unless ``by_unit`` is set. Closed ranges come from the coarsest suitable rollup;
+    only the not-yet-rolled tail is scanned in ``chiller_telemetry``, together with any
+    archived Parquet files that overlap the raw ranges.
+    """
+
+    segments, raw_start = plan_rollup_segments(
+        load_watermarks(session), granularity, scope.start, scope.end
+    )
+    raw_ranges = [(segment.start, segment.end) for segment in segments if segment.grain is None]
+    raw_ranges.append((raw_start, None))
+
+    queries = [
+        rollup_aggregate_query(session, scope, segment, granularity, by_unit)
+        for segment in segments
+        if segment.grain is not None
+    ]
+    queries.extend(
+        raw_aggregate_query(session, scope, start, before, granularity, by_unit)
+        for start, before in raw_ranges
+    )
+    sources = [query.all() for query in queries]
+
+    archive = load_archive_segments(
+        session, scope.organization_id, scope.start, scope.end, scope.chiller_unit_id
+    )
+    if archive:
+        sources.extend(
+            archived_aggregates(archive, scope, start, before, granularity, by_unit)
+            for start, before in raw_ranges
+        )
+
+    partials: dict[AggregateKey, AggregatePartial] = {}
+    for rows in sources:
+        for row in rows:
+            if not row.samples:
+                continue
+            bucket = parse_bucket(row.bucket) if granularity is not None else None
+            unit_id = row.unit_id if by_unit else None
+            partials.setdefault((bucket, unit_id), AggregatePartial()).merge(row)
+    return partials
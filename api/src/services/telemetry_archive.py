@@ -0,0 +1,233 @@
+"""Parquet cold storage for raw telemetry.
+
+Archived readings live under ``TELEMETRY_ARCHIVE_DIR`` in a Hive-style layout,
+``organization_id=<id>/chiller_unit_id=<id>/month=<YYYY-MM>/<file>.parquet``, with one
+manifest row per file in ``chiller_telemetry_archive_segments``. Readers only open
+files whose manifest range overlaps the query, and row-group statistics prune the rest.
+"""
+from __future__ import annotations
+
+import os
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple, Optional, Sequence
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from src.config import settings
+from src.models import TelemetryArchiveSegment
+from .time_buckets import Granularity, as_utc
+
+ARCHIVE_SCHEMA = pa.schema(
+    [
+        ("id", pa.int64()),
+        ("organization_id", pa.int64()),
+        ("building_id", pa.int64()),
+        ("chiller_unit_id", pa.int64()),
+        ("timestamp", pa.timestamp("us", tz="UTC")),
+        ("inlet_temp", pa.float64()),
+        ("outlet_temp", pa.float64()),
+        ("power_kw", pa.float64()),
+        ("flow_rate", pa.float64()),
+        ("cop", pa.float64()),
+    ]
+)
+
+
+class ArchivedAggregate(NamedTuple):
+    """Archived counterpart of a grouped raw-telemetry aggregate row."""
+
+    bucket: Optional[datetime]
+    unit_id: Optional[int]
+    samples: int
+    cooling_sum: Optional[float]
+    cooling_count: int
+    power_sum: Optional[float]
+    cop_sum: Optional[float]
+    inlet_sum: Optional[float]
+    outlet_sum: Optional[float]
+
+
+def archive_root() -> Path:
+    return Path(settings.telemetry_archive_dir)
+
+
+def write_segment(
+    rows: Sequence[dict], organization_id: int, chiller_unit_id: int, month_start: datetime
+) -> tuple[str, int]:
+    """Write ``rows`` to a new zstd-compressed Parquet file.
+
+    Returns the path relative to the archive root and the file size. The file is
+    written under a temporary name and renamed, so readers never see partial files.
+    """
+
+    relative = (
+        Path(f"organization_id={organization_id}")
+        / f"chiller_unit_id={chiller_unit_id}"
+        / f"month={month_start:%Y-%m}"
+        / f"{uuid.uuid4().hex}.parquet"
+    )
+    target = archive_root() / relative
+    target.parent.mkdir(parents=True, exist_ok=True)
+    staging = target.with_suffix(".parquet.tmp")
+
+    table = pa.Table.from_pylist(list(rows), schema=ARCHIVE_SCHEMA)
+    pq.write_table(table, staging, compression="zstd", row_group_size=64_000)
+    os.replace(staging, target)
+    return relative.as_posix(), target.stat().st_size
+
+
+def remove_segment_files(segments: Sequence[TelemetryArchiveSegment]) -> None:
+    for segment in segments:
+        (archive_root() / segment.path).unlink(missing_ok=True)
+
+
+def load_archive_segments(
+    session: Session,
+    organization_id: int,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    chiller_unit_id: int | None = None,
+) -> list[TelemetryArchiveSegment]:
+    """Manifest entries whose time range overlaps ``[start, end]``."""
+
+    query = session.query(TelemetryArchiveSegment).filter(
+        TelemetryArchiveSegment.organization_id == organization_id
+    )
+    if start is not None:
+        query = query.filter(TelemetryArchiveSegment.max_timestamp >= start)
+    if end is not None:
+        query = query.filter(TelemetryArchiveSegment.min_timestamp <= end)
+    if chiller_unit_id is not None:
+        query = query.filter(TelemetryArchiveSegment.chiller_unit_id == chiller_unit_id)
+    return query.order_by(TelemetryArchiveSegment.id).all()
+
+
+def expire_segments(
+    session: Session, organization_id: int, before: datetime, dry_run: bool = False
+) -> tuple[int, int]:
+    """Drop archived files that only hold readings older than ``before``.
+
+    Returns the number of readings and bytes removed (or that would be removed). Files
+    are deleted only after the manifest change is committed.
+    """
+
+    segments = (
+        session.query(TelemetryArchiveSegment)
+        .filter(
+            TelemetryArchiveSegment.organization_id == organization_id,
+            TelemetryArchiveSegment.max_timestamp < before,
+        )
+        .all()
+    )
+    rows = sum(segment.row_count for segment in segments)
+    size = sum(segment.size_bytes for segment in segments)
+    if segments and not dry_run:
+        session.execute(
+            delete(TelemetryArchiveSegment).where(
+                TelemetryArchiveSegment.id.in_([segment.id for segment in segments])
+            )
+        )
+        session.commit()
+        remove_segment_files(segments)
+    return rows, size
+
+
+def archived_aggregates(
+    segments: Sequence[TelemetryArchiveSegment],
+    scope,
+    start: datetime | None,
+    before: datetime | None,
+    granularity: Granularity | None,
+    by_unit: bool,
+) -> list[ArchivedAggregate]:
+    """Aggregate archived readings with the same filters as the raw SQL path.
+
+    ``scope``, ``start`` and ``before`` follow :func:`telemetry_filters`.
+    """
+
+    lower = start if start is not None else scope.start
+    lower = as_utc(lower) if lower is not None else None
+    before = as_utc(before) if before is not None else None
+    end = as_utc(scope.end) if scope.end is not None else None
+    relevant = [
+        segment
+        for segment in segments
+        if (lower is None or as_utc(segment.max_timestamp) >= lower)
+        and (before is None or as_utc(segment.min_timestamp) < before)
+        and (end is None or as_utc(segment.min_timestamp) <= end)
+        and (scope.chiller_unit_id is None or segment.chiller_unit_id == scope.chiller_unit_id)
+    ]
+    if not relevant:
+        return []
+
+    timestamp_type = ARCHIVE_SCHEMA.field("timestamp").type
+    timestamp = ds.field("timestamp")
+    condition = ds.field("organization_id") == scope.organization_id
+    if lower is not None:
+        condition &= timestamp >= pa.scalar(lower, timestamp_type)
+    if before is not None:
+        condition &= timestamp < pa.scalar(before, timestamp_type)
+    elif end is not None:
+        condition &= timestamp <= pa.scalar(end, timestamp_type)
+    if scope.building_id is not None:
+        condition &= ds.field("building_id") == scope.building_id
+    if scope.chiller_unit_id is not None:
+        condition &= ds.field("chiller_unit_id") == scope.chiller_unit_id
+
+    dataset = ds.dataset(
+        [str(archive_root() / segment.path) for segment in relevant],
+        schema=ARCHIVE_SCHEMA,
+        format="parquet",
+    )
+    table = dataset.to_table(filter=condition)
+    if table.num_rows == 0:
+        return []
+
+    # Same approximation as cooling_load_expression(): null when delta T is zero.
+    delta_t = pc.subtract(table["inlet_temp"], table["outlet_temp"])
+    cooling = pc.if_else(
+        pc.equal(delta_t, 0),
+        pa.scalar(None, pa.float64()),
+        pc.divide(pc.multiply(pc.multiply(table["flow_rate"], delta_t), 500), 12000),
+    )
+    table = table.append_column("cooling", cooling)
+
+    keys = []
+    if granularity is not None:
+        table = table.append_column("bucket", pc.floor_temporal(table["timestamp"], unit=granularity))
+        keys.append("bucket")
+    if by_unit:
+        keys.append("chiller_unit_id")
+
+    grouped = table.group_by(keys).aggregate(
+        [
+            ("timestamp", "count"),
+            ("cooling", "sum"),
+            ("cooling", "count"),
+            ("power_kw", "sum"),
+            ("cop", "sum"),
+            ("inlet_temp", "sum"),
+            ("outlet_temp", "sum"),
+        ]
+    )
+    return [
+        ArchivedAggregate(
+            bucket=row.get("bucket"),
+            unit_id=row.get("chiller_unit_id"),
+            samples=row["timestamp_count"],
+            cooling_sum=row["cooling_sum"],
+            cooling_count=row["cooling_count"],
+            power_sum=row["power_kw_sum"],
+            cop_sum=row["cop_sum"],
+            inlet_sum=row["inlet_temp_sum"],
+            outlet_sum=row["outlet_temp_sum"],
+        )
+        for row in grouped.to_pylist()
+    ]
@@ -0,0 +1,46 @@
+"""Shared persistence path for accepted telemetry readings."""
+from __future__ import annotations
+
+from typing import Sequence
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from src.models import ChillerTelemetry
+from .analytics_cache import analytics_cache
+from .partitions import telemetry_partitions
+from .rollups import apply_late_readings
+from .telemetry_aggregates import with_derived_values
+
+
+def insert_telemetry_rows(
+    session: Session, rows: Sequence[dict], return_ids: bool = False
+) -> list[int]:
+    """Bulk insert telemetry rows using a single multi-row INSERT.
+
+    The caller owns the transaction. Derived columns are computed for rows that do not
+    carry them yet. When ``return_ids`` is set, generated ids are
+    returned in the same order as ``rows``. Missing monthly partitions are created
+    first, and late readings are folded into any rollup buckets that have already been
+    materialised. Cached analytics results overlapping the rows are dropped once the
+    transaction commits.
+    """
+
+    if not rows:
+        return []
+
+    rows = [with_derived_values(row) for row in rows]
+    telemetry_partitions.ensure_for(session.get_bind(), (row["timestamp"] for row in rows))
+
+    ids: list[int] = []
+    if return_ids:
+        statement = insert(ChillerTelemetry).returning(
+            ChillerTelemetry.id, sort_by_parameter_order=True
+        )
+        ids = list(session.scalars(statement, rows).all())
+    else:
+        session.execute(insert(ChillerTelemetry), rows)
+
+    apply_late_readings(session, rows)
+    analytics_cache.record_write(session, rows)
+    return ids
@@ -0,0 +1,87 @@
+"""Time bucket helpers shared by analytics queries and telemetry rollups."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Literal
+
+from sqlalchemy import Float, cast, extract, func
+from sqlalchemy.sql.elements import ColumnElement
+
+Granularity = Literal["minute", "hour", "day", "month"]
+
+# Ordered from finest to coarsest.
+GRAINS: tuple[Granularity, ...] = ("minute", "hour", "day", "month")
+GRAIN_RANK = {grain: rank for rank, grain in enumerate(GRAINS)}
+
+_SQLITE_FORMATS = {
+    "minute": "%Y-%m-%dT%H:%M:00",
+    "hour": "%Y-%m-%dT%H:00:00",
+    "day": "%Y-%m-%d 00:00:00",
+    "month": "%Y-%m-01 00:00:00",
+}
+
+
+def as_utc(value: datetime) -> datetime:
+    """Return ``value`` as an aware UTC datetime (naive values are assumed to be UTC)."""
+
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def parse_bucket(value: datetime | str) -> datetime:
+    """Normalise a bucket value returned by SQLite (text) or Postgres (timestamp)."""
+
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return as_utc(value)
+
+
+def floor_timestamp(value: datetime, grain: Granularity) -> datetime:
+    value = as_utc(value)
+    if grain == "minute":
+        return value.replace(second=0, microsecond=0)
+    if grain == "hour":
+        return value.replace(minute=0, second=0, microsecond=0)
+    if grain == "day":
+        return value.replace(hour=0, minute=0, second=0, microsecond=0)
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def advance(value: datetime, grain: Granularity, steps: int = 1) -> datetime:
+    """Move ``value`` forward by ``steps`` buckets of ``grain``."""
+
+    if grain == "month":
+        month_index = value.month - 1 + steps
+        return value.replace(year=value.year + month_index // 12, month=month_index % 12 + 1)
+    unit = {
+        "minute": timedelta(minutes=1),
+        "hour": timedelta(hours=1),
+        "day": timedelta(days=1),
+    }[grain]
+    return value + unit * steps
+
+
+def is_aligned(value: datetime, grain: Granularity) -> bool:
+    return floor_timestamp(value, grain) == as_utc(value)
+
+
+def bucket_expression(column, grain: Granularity, dialect: str) -> ColumnElement:
+    """SQL expression truncating ``column`` to ``grain``, labelled ``bucket``."""
+
+    if dialect == "sqlite":
+        return func.strftime(_SQLITE_FORMATS[grain], column).label("bucket")
+    return func.date_trunc(grain, column).label("bucket")
+
+
+def epoch_expression(column, dialect: str) -> ColumnElement:
+    """SQL expression for ``column`` in seconds since the Unix epoch, labelled ``epoch``.
+
+    SQLite date functions resolve milliseconds, Postgres microseconds.
+    """
+
+    if dialect == "sqlite":
+        seconds = cast(func.strftime("%s", column), Float)
+        fraction = cast(func.strftime("%f", column), Float) - cast(func.strftime("%S", column), Float)
+        return (seconds + fraction).label("epoch")
+    return cast(extract("epoch", column), Float).label("epoch")
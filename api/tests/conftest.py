@@ -1,5 +1,11 @@
 import os
+import socket
+import socketserver
 import sys
+import tempfile
+import threading
+from email import message_from_bytes
+from email.message import Message
 from pathlib import Path
 
 import pytest
@@ -9,29 +15,52 @@ ROOT_DIR = Path(__file__).resolve().parents[1]
 if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
 
-os.environ.setdefault("DATABASE_URL", "sqlite+pysqlite:///:memory:")
-os.environ.setdefault("HISTORICAL_DATABASE_URL", "sqlite+pysqlite:///:memory:")
+# File databases, so the sync and async engines of the API share their data.
+_DATABASE_DIR = tempfile.mkdtemp(prefix="chiller-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite+pysqlite:///{_DATABASE_DIR}/metadata.db")
+os.environ.setdefault("HISTORICAL_DATABASE_URL", f"sqlite+pysqlite:///{_DATABASE_DIR}/history.db")
 
 from src.db import (  # noqa: E402
+    AsyncSessionLocal,
+    AsyncTelemetrySessionLocal,
     SessionLocal,
     TelemetrySessionLocal,
+    async_telemetry_engine,
     telemetry_engine,
     engine,
+    get_async_db_session,
+    get_async_telemetry_session,
     get_db_session,
     get_telemetry_session,
 )
 from src.db_base import Base, TelemetryBase
 from src.main import app  # noqa: E402
+import src.db as db_module  # noqa: E402
+from src.services.alert_rule_index import alert_rule_index  # noqa: E402
+from src.services.alert_state import alert_state_store  # noqa: E402
+from src.services.alert_windows import alert_window_engine  # noqa: E402
+from src.services.analytics_cache import analytics_cache  # noqa: E402
+from src.services.chiller_cache import chiller_route_cache  # noqa: E402
 
 
 from sqlalchemy import text
 
 @pytest.fixture(autouse=True)
 def seed_database():
+    chiller_route_cache.clear()
+    alert_rule_index.clear()
+    alert_state_store.clear()
+    alert_window_engine.clear()
+    analytics_cache.clear()
     Base.metadata.create_all(bind=engine)
     TelemetryBase.metadata.create_all(bind=telemetry_engine)
     seed_demo_data()
     yield
+    # Tests that reconfigure the historical database must not leak the new engine.
+    db_module.telemetry_engine = telemetry_engine
+    db_module.TelemetrySessionLocal = TelemetrySessionLocal
+    db_module.async_telemetry_engine = async_telemetry_engine
+    db_module.AsyncTelemetrySessionLocal = AsyncTelemetrySessionLocal
     Base.metadata.drop_all(bind=engine)
     TelemetryBase.metadata.drop_all(bind=telemetry_engine)
 
@@ -58,6 +87,22 @@ def _override_get_telemetry_db():
 app.dependency_overrides[get_telemetry_session] = _override_get_telemetry_db
 
 
+async def _override_get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+app.dependency_overrides[get_async_db_session] = _override_get_async_db
+
+
+async def _override_get_async_telemetry_db():
+    async with AsyncTelemetrySessionLocal() as db:
+        yield db
+
+
+app.dependency_overrides[get_async_telemetry_session] = _override_get_async_telemetry_db
+
+
 from src.models import (
     Building,
     ChillerUnit,
@@ -147,3 +192,98 @@ def default_chiller_unit(db_session: SessionLocal) -> ChillerUnit:
         return unit
 
     return _default_chiller_unit
+
+
+class LocalSmtpServer(socketserver.ThreadingTCPServer):
+    """Minimal SMTP server on localhost that records delivered messages.
+
+    ``fail_next`` answers that many DATA commands with a temporary 451 error and
+    ``disconnect_all`` drops every open session, as a server closing idle clients would.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _SmtpHandler)
+        self.messages: list[tuple[list[str], Message]] = []
+        self.connections = 0
+        self.fail_next = 0
+        self._sessions: set[socket.socket] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def disconnect_all(self) -> None:
+        with self._lock:
+            for session in list(self._sessions):
+                try:
+                    session.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+
+class _SmtpHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        server: LocalSmtpServer = self.server
+        with server._lock:
+            server.connections += 1
+            server._sessions.add(self.connection)
+        try:
+            self._reply("220 localhost SMTP stand-in")
+            recipients: list[str] = []
+            while True:
+                line = self.rfile.readline()
+                if not line:
+                    return
+                command = line.decode("ascii", "replace").strip()
+                verb = command[:4].upper()
+                if verb in ("EHLO", "HELO", "NOOP", "RSET"):
+                    self._reply("250 OK")
+                elif verb == "MAIL":
+                    recipients = []
+                    self._reply("250 OK")
+                elif verb == "RCPT":
+                    recipients.append(command.split(":", 1)[1].strip().strip("<>"))
+                    self._reply("250 OK")
+                elif verb == "DATA":
+                    with server._lock:
+                        failing = server.fail_next > 0
+                        server.fail_next -= int(failing)
+                    if failing:
+                        self._reply("451 Try again later")
+                        continue
+                    self._reply("354 End data with <CR><LF>.<CR><LF>")
+                    data = b""
+                    for chunk in iter(self.rfile.readline, b""):
+                        if chunk == b".\r\n":
+                            break
+                        data += chunk[1:] if chunk.startswith(b"..") else chunk
+                    with server._lock:
+                        server.messages.append((recipients, message_from_bytes(data)))
+                    self._reply("250 OK")
+                elif verb == "QUIT":
+                    self._reply("221 Bye")
+                    return
+                else:
+                    self._reply("502 Command not implemented")
+        finally:
+            with server._lock:
+                server._sessions.discard(self.connection)
+
+    def _reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode("ascii"))
+
+
+@pytest.fixture
+def smtp_server():
+    server = LocalSmtpServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,197 @@
+from datetime import datetime, timedelta, timezone
+
+from src.db import SessionLocal
+from src.models import AlertEvent, AlertEventCounter, AlertSeverity, ChillerUnit, Organization, OrganizationType
+from src.services.alert_engine import evaluate_alerts_for_payload
+
+
+def test_alert_feed_pages_by_keyset_and_counts_from_counters(client, monkeypatch):
+    login = client.post("/auth/login", json={"email": "demo@demo.com", "password": "demo123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    session = SessionLocal()
+    try:
+        unit_id = session.query(ChillerUnit.id).first()[0]
+    finally:
+        session.close()
+    monkeypatch.setattr("src.services.alert_engine.queue_email", lambda **_: True)
+    for name, threshold, severity in [("Low flow", 10.0, "WARNING"), ("Very low flow", 5.0, "CRITICAL")]:
+        created = client.post(
+            "/alert_rules",
+            json={
+                "chiller_unit_id": unit_id,
+                "name": name,
+                "metric_key": "flow_rate",
+                "condition_operator": "LT",
+                "threshold_value": threshold,
+                "severity": severity,
+            },
+            headers=headers,
+        )
+        assert created.status_code == 201
+
+    # Both rules fire together, so pairs of events share a timestamp.
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    session = SessionLocal()
+    try:
+        for index in range(5):
+            fired = start + timedelta(minutes=index)
+            assert len(evaluate_alerts_for_payload(session, unit_id, {"flow_rate": 4.0}, now=fired)) == 2
+            evaluate_alerts_for_payload(session, unit_id, {"flow_rate": 12.0}, now=fired + timedelta(seconds=30))
+        session.commit()
+        expected = [
+            event.id
+            for event in session.query(AlertEvent).order_by(AlertEvent.triggered_at.desc(), AlertEvent.id.desc())
+        ]
+        assert sum(counter.total for counter in session.query(AlertEventCounter)) == 10
+    finally:
+        session.close()
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/alerts", params=params, headers=headers).json()
+        assert len(page["alerts"]) <= 3
+        assert page["summary"] == {
+            "total": 10,
+            "by_severity": {"WARNING": 5, "CRITICAL": 5},
+            "unacknowledged": 10,
+        }
+        seen.extend(alert["id"] for alert in page["alerts"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == expected
+
+    critical = client.get("/alerts", params={"severity": "CRITICAL"}, headers=headers).json()
+    assert critical["summary"]["total"] == 5 and len(critical["alerts"]) == 5
+    assert critical["next_cursor"] is None
+    # A time range is counted from the events themselves.
+    recent = client.get(
+        "/alerts", params={"start": (start + timedelta(minutes=3)).isoformat()}, headers=headers
+    ).json()
+    assert recent["summary"]["total"] == 4
+    assert client.get("/alerts", params={"cursor": "not-a-cursor"}, headers=headers).status_code == 400
+
+
+def test_acknowledgements_and_daily_counters(client, monkeypatch):
+    login = client.post("/auth/login", json={"email": "demo@demo.com", "password": "demo123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    session = SessionLocal()
+    try:
+        unit_id = session.query(ChillerUnit.id).first()[0]
+    finally:
+        session.close()
+    monkeypatch.setattr("src.services.alert_engine.queue_email", lambda **_: True)
+    client.post(
+        "/alert_rules",
+        json={
+            "chiller_unit_id": unit_id,
+            "name": "Low flow",
+            "metric_key": "flow_rate",
+            "condition_operator": "LT",
+            "threshold_value": 10.0,
+            "severity": "WARNING",
+        },
+        headers=headers,
+    )
+
+    now = datetime.now(timezone.utc)
+    earlier = (now - timedelta(days=3)).replace(hour=12)
+    session = SessionLocal()
+    try:
+        for fired in (earlier, earlier + timedelta(minutes=1), now):
+            evaluate_alerts_for_payload(session, unit_id, {"flow_rate": 4.0}, now=fired)
+            evaluate_alerts_for_payload(session, unit_id, {"flow_rate": 12.0}, now=fired)
+        session.commit()
+        counters = {counter.day: counter.total for counter in session.query(AlertEventCounter)}
+        assert counters == {earlier.date(): 2, now.date(): 1}
+    finally:
+        session.close()
+
+    feed = client.get("/alerts", headers=headers).json()
+    oldest = feed["alerts"][-1]["id"]
+    assert feed["summary"] == {"total": 3, "by_severity": {"WARNING": 3}, "unacknowledged": 3}
+    for _ in range(2):
+        acknowledged = client.post(f"/alerts/{oldest}/acknowledge", headers=headers)
+        assert acknowledged.status_code == 200 and acknowledged.json()["acknowledged"]
+    assert client.post("/alerts/999999/acknowledge", headers=headers).status_code == 404
+
+    summary = client.get("/alerts/summary", headers=headers).json()
+    assert summary == {"total": 3, "by_severity": {"WARNING": 3}, "unacknowledged": 2}
+    today = client.get("/alerts/summary", params={"days": 1}, headers=headers).json()
+    assert today == {"total": 1, "by_severity": {"WARNING": 1}, "unacknowledged": 1}
+
+    # Ranges starting at midnight read the counters; others count events, with the same result.
+    midnight = earlier.replace(hour=0, minute=0, second=0, microsecond=0)
+    for start in (midnight, midnight + timedelta(seconds=1)):
+        ranged = client.get("/alerts", params={"start": start.isoformat()}, headers=headers).json()
+        assert ranged["summary"]["total"] == 3 and ranged["summary"]["unacknowledged"] == 2
+
+
+def test_summaries_agree_after_a_chiller_is_deleted(client, monkeypatch):
+    login = client.post("/auth/login", json={"email": "demo@demo.com", "password": "demo123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    session = SessionLocal()
+    try:
+        unit_id = session.query(ChillerUnit.id).first()[0]
+    finally:
+        session.close()
+    monkeypatch.setattr("src.services.alert_engine.queue_email", lambda **_: True)
+    client.post(
+        "/alert_rules",
+        json={
+            "chiller_unit_id": unit_id,
+            "name": "Low flow",
+            "metric_key": "flow_rate",
+            "condition_operator": "LT",
+            "threshold_value": 10.0,
+            "severity": "WARNING",
+        },
+        headers=headers,
+    )
+
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    session = SessionLocal()
+    try:
+        for index in range(3):
+            fired = start + timedelta(minutes=index)
+            evaluate_alerts_for_payload(session, unit_id, {"flow_rate": 4.0}, now=fired)
+            evaluate_alerts_for_payload(session, unit_id, {"flow_rate": 12.0}, now=fired)
+        # Another organization's alert whose chiller is gone as well.
+        other = Organization(name="Other Org", type=OrganizationType.ENERGY_MGMT)
+        session.add(other)
+        session.flush()
+        session.add(
+            AlertEvent(
+                organization_id=other.id,
+                chiller_unit_id=None,
+                severity=AlertSeverity.CRITICAL,
+                metric_key="flow_rate",
+                metric_value=1.0,
+                message="Other org",
+                triggered_at=start,
+            )
+        )
+        session.commit()
+    finally:
+        session.close()
+
+    assert client.delete(f"/chiller_units/{unit_id}", headers=headers).status_code == 204
+    session = SessionLocal()
+    try:
+        # What the foreign key's ON DELETE SET NULL does on Postgres.
+        session.query(AlertEvent).filter(AlertEvent.chiller_unit_id == unit_id).update(
+            {AlertEvent.chiller_unit_id: None}
+        )
+        session.commit()
+    finally:
+        session.close()
+
+    expected = {"total": 3, "by_severity": {"WARNING": 3}, "unacknowledged": 3}
+    counted = client.get("/alerts", headers=headers).json()
+    grouped = client.get(
+        "/alerts", params={"end": (start + timedelta(days=1)).isoformat()}, headers=headers
+    ).json()
+    assert counted["summary"] == grouped["summary"] == expected
+    assert [alert["id"] for alert in counted["alerts"]] == [alert["id"] for alert in grouped["alerts"]]
+    assert len(counted["alerts"]) == 3
@@ -0,0 +1,123 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import event
+
+from src.db import SessionLocal, async_engine, engine
+from src.models import AlertEvent, AlertRule, AlertSeverity, ChillerUnit, ConditionOperator
+from src.services.alert_engine import evaluate_alerts_for_payload
+from src.services.alert_rule_index import AlertRuleIndex
+
+
+def _rule(rule_id: int, chiller_unit_id: int, metric_key: str, operator: str, threshold: float, **kwargs):
+    return AlertRule(
+        id=rule_id,
+        chiller_unit_id=chiller_unit_id,
+        name=f"rule {rule_id}",
+        metric_key=metric_key,
+        condition_operator=ConditionOperator(operator),
+        threshold_value=threshold,
+        severity=AlertSeverity.WARNING,
+        recipient_emails=[],
+        is_active=kwargs.get("is_active", True),
+    )
+
+
+def test_index_groups_rules_and_applies_incremental_changes():
+    index = AlertRuleIndex()
+    session = SessionLocal()
+    try:
+        # Loading from an empty rule table still marks the index as loaded.
+        session.query(AlertRule).delete()
+        assert index.rules_for(session, 1) == {}
+        assert index.loaded
+    finally:
+        session.rollback()
+        session.close()
+
+    index.upsert(_rule(1, 1, "power_kw", "GT", 50))
+    index.upsert(_rule(2, 1, "power_kw", "LTE", 10))
+    index.upsert(_rule(3, 1, "cop", "LT", 3))
+    index.upsert(_rule(4, 2, "cop", "GTE", 6))
+    index.upsert(_rule(5, 2, "inlet_temp", "GT", 1))
+
+    rules = index.rules_for(None, 1)
+    assert [rule.id for rule in rules["power_kw"]] == [1, 2]
+    assert [rule.matches(value) for rule, value in zip(rules["power_kw"], (60, 10))] == [True, True]
+    assert not rules["cop"][0].matches(3)
+    assert set(index.rules_for(None, 2)) == {"cop"}
+    assert len(index) == 4
+
+    # Moving a rule to another chiller removes it from the first.
+    index.upsert(_rule(3, 2, "cop", "LT", 3))
+    assert set(index.rules_for(None, 1)) == {"power_kw"}
+    assert [rule.id for rule in index.rules_for(None, 2)["cop"]] == [3, 4]
+
+    index.upsert(_rule(4, 2, "cop", "GTE", 6, is_active=False))
+    index.remove(1)
+    index.remove(99)
+    assert [rule.id for rule in index.rules_for(None, 1)["power_kw"]] == [2]
+    assert [rule.id for rule in index.rules_for(None, 2)["cop"]] == [3]
+    assert len(index) == 2
+
+
+def test_rule_edits_apply_at_ingest_without_rule_queries(client, monkeypatch):
+    login = client.post("/auth/login", json={"email": "demo@demo.com", "password": "demo123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    session = SessionLocal()
+    try:
+        unit_id = session.query(ChillerUnit.id).first()[0]
+    finally:
+        session.close()
+    reading = {
+        "unit_id": unit_id,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "inlet_temp": 12.0,
+        "outlet_temp": 7.0,
+        "power_kw": 30.0,
+        "flow_rate": 11.0,
+        "cop": 3.9,
+    }
+    monkeypatch.setattr("src.services.alert_engine.queue_email", lambda **_: True)
+    rule = client.post(
+        "/alert_rules",
+        json={
+            "chiller_unit_id": unit_id,
+            "name": "High power",
+            "metric_key": "power_kw",
+            "condition_operator": "GT",
+            "threshold_value": 25.0,
+            "severity": "WARNING",
+        },
+        headers=headers,
+    ).json()
+    assert client.post("/telemetry/ingest", json=reading, headers=headers).status_code == 201
+
+    patched = client.patch(f"/alert_rules/{rule['id']}", json={"threshold_value": 35.0}, headers=headers)
+    assert patched.status_code == 200
+
+    statements: list[str] = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engines = (engine, async_engine.sync_engine)
+    for bind in engines:
+        event.listen(bind, "before_cursor_execute", _record)
+    try:
+        assert client.post("/telemetry/ingest", json=reading, headers=headers).status_code == 201
+    finally:
+        for bind in engines:
+            event.remove(bind, "before_cursor_execute", _record)
+    assert not [statement for statement in statements if "FROM alert_rules" in statement]
+
+    assert client.delete(f"/alert_rules/{rule['id']}", headers=headers).status_code == 204
+
+    session = SessionLocal()
+    try:
+        events = session.query(AlertEvent).filter(AlertEvent.alert_rule_id == rule["id"]).all()
+        assert [alert.metric_value for alert in events] == [30.0]
+        # The deleted rule is gone from the index; the seeded demo rules still fire.
+        fired = evaluate_alerts_for_payload(session, unit_id, {"power_kw": 99.0})
+        assert rule["id"] not in {alert.alert_rule_id for alert in fired}
+    finally:
+        session.close()
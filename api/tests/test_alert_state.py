@@ -0,0 +1,169 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.db import SessionLocal
+from src.models import (
+    AlertEvent,
+    AlertRule,
+    AlertRuleState,
+    AlertSeverity,
+    AlertState,
+    ChillerUnit,
+    ConditionOperator,
+)
+from src.services.alert_rule_index import IndexedAlertRule
+from src.services.alert_state import AlertStateStore, alert_state_store
+
+
+def test_rule_fires_once_until_cleared_with_hysteresis_and_cooldown(db_session):
+    rule = IndexedAlertRule.from_model(
+        AlertRule(
+            id=1,
+            chiller_unit_id=1,
+            name="High power",
+            metric_key="power_kw",
+            condition_operator=ConditionOperator.GT,
+            threshold_value=50.0,
+            severity=AlertSeverity.WARNING,
+            recipient_emails=[],
+            cooldown_seconds=600,
+            hysteresis=5.0,
+            is_active=True,
+        )
+    )
+    store = AlertStateStore()
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    def observe(value: float, seconds: int) -> bool:
+        fired = store.observe(db_session, rule, value, start + timedelta(seconds=seconds))
+        db_session.commit()
+        return fired
+
+    assert observe(40, 0) is False
+    assert observe(60, 5) is True
+    assert observe(70, 10) is False
+    # Inside the hysteresis band the rule keeps firing silently.
+    assert observe(48, 15) is False
+    assert store.get(1).state is AlertState.FIRING
+    assert observe(44, 20) is False
+    assert store.get(1).state is AlertState.OK
+    # Cleared, but still within the cooldown of the last firing.
+    assert observe(60, 65) is False
+    assert observe(60, 605) is True
+    assert store.get(1).last_fired_at == start + timedelta(seconds=605)
+
+
+def test_state_is_checkpointed_and_restored(client):
+    login = client.post("/auth/login", json={"email": "demo@demo.com", "password": "demo123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    session = SessionLocal()
+    try:
+        unit_id = session.query(ChillerUnit.id).first()[0]
+    finally:
+        session.close()
+    rule = client.post(
+        "/alert_rules",
+        json={
+            "chiller_unit_id": unit_id,
+            "name": "Low flow",
+            "metric_key": "flow_rate",
+            "condition_operator": "LT",
+            "threshold_value": 10.0,
+            "severity": "CRITICAL",
+        },
+        headers=headers,
+    ).json()
+    assert rule["cooldown_seconds"] == 0 and rule["hysteresis"] == 0
+
+    def ingest(flow_rate: float) -> None:
+        reading = {
+            "unit_id": unit_id,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "inlet_temp": 12.0,
+            "outlet_temp": 7.0,
+            "power_kw": 30.0,
+            "flow_rate": flow_rate,
+            "cop": 3.9,
+        }
+        assert client.post("/telemetry/ingest", json=reading, headers=headers).status_code == 201
+
+    for _ in range(5):
+        ingest(8.0)
+
+    session = SessionLocal()
+    try:
+        assert alert_state_store.checkpoint(session) >= 1
+        checkpoint = session.get(AlertRuleState, rule["id"])
+        assert checkpoint.state is AlertState.FIRING
+        assert checkpoint.last_value == 8.0
+    finally:
+        session.close()
+
+    # A restarted process resumes from the checkpoint instead of firing again.
+    alert_state_store.clear()
+    ingest(7.0)
+    ingest(12.0)
+    ingest(7.0)
+
+    session = SessionLocal()
+    try:
+        events = session.query(AlertEvent).filter(AlertEvent.alert_rule_id == rule["id"]).all()
+        assert [event.metric_value for event in events] == [8.0, 7.0]
+    finally:
+        session.close()
+
+
+def test_failed_ingest_leaves_rule_ok_and_sends_nothing(client, monkeypatch):
+    login = client.post("/auth/login", json={"email": "demo@demo.com", "password": "demo123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    session = SessionLocal()
+    try:
+        unit_id = session.query(ChillerUnit.id).first()[0]
+    finally:
+        session.close()
+    rule = client.post(
+        "/alert_rules",
+        json={
+            "chiller_unit_id": unit_id,
+            "name": "Power spike",
+            "metric_key": "power_kw",
+            "condition_operator": "GT",
+            "threshold_value": 50.0,
+            "severity": "WARNING",
+            "recipient_emails": ["ops@example.com"],
+        },
+        headers=headers,
+    ).json()
+    emails = []
+    monkeypatch.setattr("src.services.alert_engine.queue_email", lambda **email: emails.append(email))
+
+    def failing_insert(*args, **kwargs):
+        raise RuntimeError("history database unavailable")
+
+    reading = {
+        "unit_id": unit_id,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "inlet_temp": 12.0,
+        "outlet_temp": 7.0,
+        "power_kw": 80.0,
+        "flow_rate": 10.0,
+        "cop": 3.0,
+    }
+    with monkeypatch.context() as patch:
+        patch.setattr("src.routers.telemetry.insert_telemetry_rows", failing_insert)
+        with pytest.raises(RuntimeError):
+            client.post("/telemetry/ingest", json=reading, headers=headers)
+
+    assert alert_state_store.get(rule["id"]).state is AlertState.OK
+    assert emails == []
+    session = SessionLocal()
+    try:
+        assert session.query(AlertEvent).filter(AlertEvent.alert_rule_id == rule["id"]).count() == 0
+    finally:
+        session.close()
+
+    # The same reading fires the rule once it is actually stored.
+    assert client.post("/telemetry/ingest", json=reading, headers=headers).status_code == 201
+    assert alert_state_store.get(rule["id"]).state is AlertState.FIRING
+    assert [email["subject"] for email in emails].count("Chiller Alert: Power spike") == 1
@@ -0,0 +1,206 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.db import SessionLocal
+from src.models import (
+    AlertEvent,
+    AlertRule,
+    AlertSeverity,
+    AlertWindowType,
+    ChillerTelemetry,
+    ChillerUnit,
+    ConditionOperator,
+)
+from src.services.alert_rule_index import IndexedAlertRule
+from src.services.alert_windows import AlertWindowEngine
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+# Not a seeded chiller, so the demo telemetry stays out of the rebuilt windows.
+UNIT_ID = 999
+
+
+def _rule(rule_id: int, metric_key: str, operator: str, threshold: float, **window) -> IndexedAlertRule:
+    return IndexedAlertRule.from_model(
+        AlertRule(
+            id=rule_id,
+            chiller_unit_id=UNIT_ID,
+            name=f"rule {rule_id}",
+            metric_key=metric_key,
+            condition_operator=ConditionOperator(operator),
+            threshold_value=threshold,
+            severity=AlertSeverity.WARNING,
+            recipient_emails=[],
+            is_active=True,
+            **window,
+        )
+    )
+
+
+def test_average_and_consecutive_windows():
+    engine = AlertWindowEngine()
+    average = _rule(1, "cop", "LT", 3.0, window_type=AlertWindowType.AVERAGE, window_seconds=60)
+    consecutive = _rule(2, "power_kw", "GT", 40.0, window_type=AlertWindowType.CONSECUTIVE, window_count=3)
+
+    def at(seconds: int) -> datetime:
+        return START + timedelta(seconds=seconds)
+
+    # Not judged until a full minute of readings has been seen.
+    assert [engine.observe(average, 2.0, at(second)) for second in range(0, 60, 10)] == [None] * 6
+    observation = engine.observe(average, 4.0, at(60))
+    assert observation.value == (2.0 * 5 + 4.0) / 6
+    assert observation.breached
+    observation = engine.observe(average, 4.0, at(70))
+    assert observation.value == (2.0 * 4 + 4.0 * 2) / 6
+    # Late readings do not disturb the window.
+    assert engine.observe(average, 100.0, at(65)) is None
+    # After a gap longer than the window it has to fill up again.
+    assert engine.observe(average, 2.0, at(500)) is None
+
+    readings = [41, 42, 39, 41, 45, 50, 51]
+    breaches = [engine.observe(consecutive, value, at(index)).breached for index, value in enumerate(readings)]
+    assert breaches == [False, False, False, False, False, True, True]
+    assert engine.observe(consecutive, 10, at(20)).cleared
+
+    # Editing the window definition starts a fresh window.
+    resized = _rule(2, "power_kw", "GT", 40.0, window_type=AlertWindowType.CONSECUTIVE, window_count=1)
+    assert engine.observe(resized, 41, at(30)).breached
+
+    # So does pointing the rule at another metric: its first judgement needs a full
+    # window of the new metric's readings.
+    assert engine.observe(average, 2.0, at(550)) is None
+    assert engine.observe(average, 2.0, at(560)).breached
+    moved = _rule(1, "flow_rate", "LT", 3.0, window_type=AlertWindowType.AVERAGE, window_seconds=60)
+    assert engine.observe(moved, 2.0, at(570)) is None
+
+
+def test_rebuild_replays_recent_telemetry(telemetry_session):
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    telemetry_session.add_all(
+        ChillerTelemetry(
+            organization_id=1,
+            building_id=1,
+            chiller_unit_id=UNIT_ID,
+            timestamp=now - timedelta(seconds=seconds),
+            inlet_temp=12.0,
+            outlet_temp=7.0,
+            power_kw=45.0,
+            flow_rate=10.0,
+            cop=cop,
+        )
+        for seconds, cop in [(1000, 9.0), (50, 2.0), (30, 2.5), (10, 2.5)]
+    )
+    telemetry_session.commit()
+
+    engine = AlertWindowEngine()
+    average = _rule(1, "cop", "LT", 3.0, window_type=AlertWindowType.AVERAGE, window_seconds=60)
+    consecutive = _rule(2, "power_kw", "GT", 40.0, window_type=AlertWindowType.CONSECUTIVE, window_count=4)
+    assert engine.rebuild(telemetry_session, [average, consecutive, _rule(3, "cop", "LT", 1.0)], now) == 7
+
+    observation = engine.observe(average, 3.0, now)
+    assert observation.value == 2.5 and observation.breached
+    # Four readings over the threshold are on record, so the next one keeps the rule breached.
+    assert engine.observe(consecutive, 41.0, now).breached
+
+
+def test_consecutive_rule_fires_once_through_ingest(client, monkeypatch):
+    login = client.post("/auth/login", json={"email": "demo@demo.com", "password": "demo123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    session = SessionLocal()
+    try:
+        unit_id = session.query(ChillerUnit.id).first()[0]
+    finally:
+        session.close()
+    monkeypatch.setattr("src.services.alert_engine.queue_email", lambda **_: True)
+    rule = {
+        "chiller_unit_id": unit_id,
+        "name": "Sustained flow drop",
+        "metric_key": "flow_rate",
+        "condition_operator": "LT",
+        "threshold_value": 10.0,
+        "severity": "WARNING",
+        "window_type": "CONSECUTIVE",
+    }
+    assert client.post("/alert_rules", json=rule, headers=headers).status_code == 422
+    created = client.post("/alert_rules", json={**rule, "window_count": 3}, headers=headers)
+    assert created.status_code == 201
+
+    start = datetime.now(timezone.utc)
+    for index, flow_rate in enumerate([8.0, 8.0, 11.0, 8.0, 8.0, 8.0, 7.0]):
+        reading = {
+            "unit_id": unit_id,
+            "timestamp": (start + timedelta(seconds=index * 5)).isoformat(),
+            "inlet_temp": 12.0,
+            "outlet_temp": 7.0,
+            "power_kw": 30.0,
+            "flow_rate": flow_rate,
+            "cop": 3.9,
+        }
+        assert client.post("/telemetry/ingest", json=reading, headers=headers).status_code == 201
+
+    session = SessionLocal()
+    try:
+        events = session.query(AlertEvent).filter(AlertEvent.alert_rule_id == created.json()["id"]).all()
+        assert len(events) == 1
+        assert "3 consecutive readings" in events[0].message
+    finally:
+        session.close()
+
+
+def test_failed_ingest_leaves_windows_untouched(client, monkeypatch):
+    login = client.post("/auth/login", json={"email": "demo@demo.com", "password": "demo123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    session = SessionLocal()
+    try:
+        unit_id = session.query(ChillerUnit.id).first()[0]
+    finally:
+        session.close()
+    monkeypatch.setattr("src.services.alert_engine.queue_email", lambda **_: True)
+    created = client.post(
+        "/alert_rules",
+        json={
+            "chiller_unit_id": unit_id,
+            "name": "Sustained flow drop",
+            "metric_key": "flow_rate",
+            "condition_operator": "LT",
+            "threshold_value": 10.0,
+            "severity": "WARNING",
+            "window_type": "CONSECUTIVE",
+            "window_count": 2,
+        },
+        headers=headers,
+    ).json()
+
+    def failing_insert(*args, **kwargs):
+        raise RuntimeError("history database unavailable")
+
+    start = datetime.now(timezone.utc)
+
+    def reading(seconds: int) -> dict:
+        return {
+            "unit_id": unit_id,
+            "timestamp": (start + timedelta(seconds=seconds)).isoformat(),
+            "inlet_temp": 12.0,
+            "outlet_temp": 7.0,
+            "power_kw": 30.0,
+            "flow_rate": 8.0,
+            "cop": 3.9,
+        }
+
+    with monkeypatch.context() as patch:
+        patch.setattr("src.routers.telemetry.insert_telemetry_rows", failing_insert)
+        with pytest.raises(RuntimeError):
+            client.post("/telemetry/ingest", json=reading(0), headers=headers)
+
+    def events() -> int:
+        session = SessionLocal()
+        try:
+            return session.query(AlertEvent).filter(AlertEvent.alert_rule_id == created["id"]).count()
+        finally:
+            session.close()
+
+    # The retried reading is the first of the run; only the next one completes it.
+    assert client.post("/telemetry/ingest", json=reading(0), headers=headers).status_code == 201
+    assert events() == 0
+    assert client.post("/telemetry/ingest", json=reading(5), headers=headers).status_code == 201
+    assert events() == 1
@@ -99,3 +99,102 @@ def test_equipment_metrics_per_chiller(client):
     payload = response.json()
     assert payload["units"]
     assert "efficiency_kwh_per_tr" in payload["units"][0]
+
+
+def test_dashboard_combines_sections(client):
+    token, building_id, _ = setup_org_with_telemetry(client)
+    params = {"building_id": building_id, "granularity": "hour"}
+
+    response = client.get("/analytics/dashboard", headers=auth_header(token), params=params)
+    assert response.status_code == status.HTTP_200_OK
+    payload = response.json()
+
+    def section(path, **extra):
+        return client.get(
+            f"/analytics/{path}", headers=auth_header(token), params={"building_id": building_id, **extra}
+        ).json()
+
+    assert payload["plant_overview"] == section("plant-overview")
+    assert payload["consumption_efficiency"] == section("consumption-efficiency", granularity="hour")
+    assert payload["equipment_metrics"] == section("equipment-metrics")
+    assert payload["chiller_trends"]["chillers"][0]["unit_name"] == "Chiller A"
+
+    missing = client.get(
+        "/analytics/dashboard", headers=auth_header(token), params={"building_id": building_id + 999}
+    )
+    assert missing.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_chiller_trends_downsamples_and_keeps_spikes(client):
+    token, _, chiller_id = setup_org_with_telemetry(client)
+    start = datetime.now(timezone.utc).replace(second=0, microsecond=0) - timedelta(days=2)
+    readings = [
+        {
+            "unit_id": chiller_id,
+            "timestamp": (start + timedelta(minutes=minute)).isoformat(),
+            "inlet_temp": 12.0,
+            "outlet_temp": 7.0,
+            "power_kw": 400 if minute == 137 else 30 + minute % 5,
+            "flow_rate": 10,
+            "cop": 3.5,
+        }
+        for minute in range(300)
+    ]
+    response = client.post("/telemetry/ingest/batch", json={"readings": readings}, headers=auth_header(token))
+    assert response.json()["accepted"] == 300
+
+    params = {
+        "granularity": "minute",
+        "chiller_unit_id": chiller_id,
+        "start": start.isoformat(),
+        "end": (start + timedelta(hours=6)).isoformat(),
+    }
+    full = client.get("/analytics/chiller-trends", headers=auth_header(token), params=params).json()
+    reduced = client.get(
+        "/analytics/chiller-trends", headers=auth_header(token), params={**params, "max_points": 40}
+    ).json()
+
+    full_points = full["chillers"][0]["points"]
+    points = reduced["chillers"][0]["points"]
+    assert len(full_points) == 300
+    assert len(points) == 40
+    assert points[0] == full_points[0] and points[-1] == full_points[-1]
+    assert max(point["power_kw"] for point in points) == 400
+
+    invalid = client.get(
+        "/analytics/chiller-trends", headers=auth_header(token), params={**params, "max_points": 2}
+    )
+    assert invalid.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_columnar_format_matches_rows(client):
+    token, _, chiller_id = setup_org_with_telemetry(client)
+    params = {"chiller_unit_id": chiller_id, "granularity": "hour"}
+
+    def get(path, **extra):
+        response = client.get(f"/analytics/{path}", headers=auth_header(token), params={**params, **extra})
+        assert response.status_code == status.HTTP_200_OK
+        return response.json()
+
+    def epoch_ms(value: str) -> int:
+        parsed = datetime.fromisoformat(value)
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return round(parsed.timestamp() * 1000)
+
+    rows = get("consumption-efficiency")["series"]
+    columns = get("consumption-efficiency", format="columnar")["series"]
+    assert columns["timestamp"] == [epoch_ms(row["timestamp"]) for row in rows]
+    for name in ("cooling_rth", "power_kw", "efficiency_kwh_per_tr", "avg_cop"):
+        assert columns[name] == [row[name] for row in rows]
+
+    trend_rows = get("chiller-trends")["chillers"][0]
+    trend_columns = get("chiller-trends", format="columnar")["chillers"][0]
+    assert trend_columns["unit_name"] == trend_rows["unit_name"]
+    assert trend_columns["points"]["timestamp"] == [epoch_ms(point["timestamp"]) for point in trend_rows["points"]]
+    assert trend_columns["points"]["lwt"] == [point["lwt"] for point in trend_rows["points"]]
+
+    invalid = client.get(
+        "/analytics/consumption-efficiency", headers=auth_header(token), params={"format": "csv"}
+    )
+    assert invalid.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
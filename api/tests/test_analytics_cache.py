@@ -0,0 +1,151 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from fastapi import status
+
+import src.routers.analytics as analytics_router
+from src.services.analytics_cache import AnalyticsResultCache
+from src.services.telemetry_aggregates import TelemetryScope
+
+
+def auth_header(token: str) -> dict[str, str]:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_cache_bounds_entries_and_expires_open_windows():
+    clock = [0.0]
+    cache = AnalyticsResultCache(max_entries=2, ttl_seconds=10, closed_after_seconds=300, clock=lambda: clock[0])
+    closed = TelemetryScope(1, datetime(2020, 1, 1), datetime(2020, 2, 1))
+    calls = []
+
+    def compute(value):
+        def run():
+            calls.append(value)
+            return value
+
+        return run
+
+    assert cache.get_or_compute("plant-overview", TelemetryScope(1), compute("open")) == "open"
+    # Naive and aware timestamps for the same instant share a key.
+    aware = TelemetryScope(1, datetime(2020, 1, 1, tzinfo=timezone.utc), datetime(2020, 2, 1, tzinfo=timezone.utc))
+    assert cache.get_or_compute("plant-overview", closed, compute("closed")) == "closed"
+    assert cache.get_or_compute("plant-overview", aware, compute("again")) == "closed"
+
+    clock[0] = 60
+    assert cache.get_or_compute("plant-overview", TelemetryScope(1), compute("refreshed")) == "refreshed"
+    assert cache.get_or_compute("plant-overview", closed, compute("again")) == "closed"
+
+    cache.get_or_compute("chiller-trends", closed, compute("day"), granularity="day")
+    assert len(cache) == 2
+    cache.get_or_compute("plant-overview", TelemetryScope(1), compute("evicted"))
+    assert calls == ["open", "closed", "refreshed", "day", "evicted"]
+    assert cache.get_or_compute("plant-overview", closed, compute("reloaded")) == "reloaded"
+
+    # Both the unbounded window and the reloaded closed window overlap.
+    assert cache.invalidate_window(1, datetime(2020, 1, 15), datetime(2020, 1, 15)) == 2
+    assert cache.invalidate_window(2, datetime(2020, 1, 15), datetime(2020, 1, 15)) == 0
+
+
+def test_async_callers_share_one_computation():
+    cache = AnalyticsResultCache(max_entries=4, ttl_seconds=10, closed_after_seconds=300)
+    scope = TelemetryScope(1)
+    calls = []
+
+    async def compute():
+        calls.append(len(calls))
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def scenario():
+        first = await asyncio.gather(
+            *(cache.get_or_compute_async("plant-overview", scope, compute) for _ in range(5))
+        )
+        assert cache.get_or_compute("plant-overview", scope, lambda: "unused") == "value"
+        # A load invalidated while in flight is not stored, and its waiters recompute.
+        waiter = asyncio.ensure_future(cache.get_or_compute_async("equipment-metrics", scope, compute))
+        owner = asyncio.ensure_future(cache.get_or_compute_async("equipment-metrics", scope, compute))
+        await asyncio.sleep(0)
+        cache.invalidate_organization(1)
+        return first, await asyncio.gather(waiter, owner)
+
+    first, second = asyncio.run(scenario())
+    assert first == ["value"] * 5
+    assert second == ["value", "value"]
+    assert len(calls) == 3
+    assert len(cache) == 0
+
+
+def test_ingest_invalidates_only_overlapping_windows(client, monkeypatch):
+    token = client.post(
+        "/auth/register",
+        json={
+            "organization_name": "Cache Org",
+            "organization_type": "ESCO",
+            "admin_email": "cache@example.com",
+            "admin_password": "password123",
+            "admin_name": "Cacher",
+        },
+    ).json()["access_token"]
+    building = client.post(
+        "/buildings",
+        json={"name": "HQ", "location": "DXB", "latitude": None, "longitude": None},
+        headers=auth_header(token),
+    ).json()
+    chiller = client.post(
+        "/chiller_units",
+        json={"building_id": building["id"], "name": "Chiller A", "manufacturer": "ACME", "model": "X1", "capacity_tons": 120},
+        headers=auth_header(token),
+    ).json()
+
+    def ingest(timestamp: datetime):
+        response = client.post(
+            "/telemetry/ingest",
+            json={
+                "unit_id": chiller["id"],
+                "timestamp": timestamp.isoformat(),
+                "inlet_temp": 12.0,
+                "outlet_temp": 7.0,
+                "power_kw": 30,
+                "flow_rate": 10,
+                "cop": 3.5,
+            },
+            headers=auth_header(token),
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+
+    computed = []
+    original = analytics_router._plant_overview
+
+    def counting(telemetry_db, scope):
+        computed.append(scope.start)
+        return original(telemetry_db, scope)
+
+    monkeypatch.setattr(analytics_router, "_plant_overview", counting)
+
+    now = datetime.now(timezone.utc)
+    history_start = now - timedelta(days=30)
+    history = {"start": history_start.isoformat(), "end": (now - timedelta(days=20)).isoformat()}
+    recent = {"start": (now - timedelta(hours=2)).isoformat()}
+
+    def overview(params):
+        response = client.get("/analytics/plant-overview", params=params, headers=auth_header(token))
+        assert response.status_code == status.HTTP_200_OK
+        return response.json()
+
+    ingest(now - timedelta(days=25))
+    ingest(now - timedelta(minutes=30))
+    first_history, first_recent = overview(history), overview(recent)
+    assert overview(history) == first_history
+    assert overview(recent) == first_recent
+    assert len(computed) == 2
+
+    # A fresh reading only touches the open window.
+    ingest(now - timedelta(minutes=5))
+    assert overview(history) == first_history
+    assert overview(recent)["power_consumption_kw"] == first_recent["power_consumption_kw"] + 30
+    assert len(computed) == 3
+
+    # A late reading inside the closed window drops it as well.
+    ingest(now - timedelta(days=22))
+    assert overview(history)["power_consumption_kw"] == first_history["power_consumption_kw"] + 30
+    assert len(computed) == 4
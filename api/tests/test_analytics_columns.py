@@ -0,0 +1,18 @@
+import orjson
+
+from src.services.analytics_benchmark import (
+    columnar_consumption,
+    columnar_trends,
+    per_row_consumption,
+    per_row_trends,
+    synthetic_partials,
+)
+
+
+def test_columnar_formatting_matches_per_row_output():
+    consumption = synthetic_partials(500)
+    trends = synthetic_partials(600, units=3)
+
+    assert orjson.dumps(columnar_consumption(consumption)) == orjson.dumps(per_row_consumption(consumption))
+    assert orjson.dumps(columnar_trends(trends)) == orjson.dumps(per_row_trends(trends))
+    assert any(point["efficiency_kwh_per_tr"] is None for point in columnar_consumption(consumption)["series"])
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.config import settings
+from src.models import (
+    ChillerTelemetry,
+    TelemetryArchiveSegment,
+    TelemetryRollup,
+    TelemetryRollupWatermark,
+)
+from src.services.archiver import archive_closed_months
+from src.services.telemetry_aggregates import TelemetryScope, aggregate_telemetry
+from src.services.telemetry_writer import insert_telemetry_rows
+
+ORG_ID = 5150
+NOW = datetime(2024, 5, 20, 12, 0, tzinfo=timezone.utc)
+START = datetime(2024, 2, 10, 6, 30, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def history(telemetry_session, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "telemetry_archive_dir", str(tmp_path))
+    telemetry_session.query(ChillerTelemetry).delete()
+    rows = [
+        {
+            "organization_id": ORG_ID,
+            "building_id": 10 + (index % 3) % 2,
+            "chiller_unit_id": 1 + index % 3,
+            "timestamp": START + timedelta(minutes=97 * index),
+            "inlet_temp": 12.0 + index % 4,
+            "outlet_temp": 7.0,
+            "power_kw": 30.0 + index % 11,
+            "flow_rate": 10.0,
+            "cop": 3.5,
+        }
+        for index in range(1500)
+    ]
+    insert_telemetry_rows(telemetry_session, rows)
+    telemetry_session.commit()
+    return telemetry_session
+
+
+def _snapshot(session, scope, granularity, by_unit):
+    return {
+        key: (partial.samples, round(partial.cooling_sum, 6), round(partial.power_sum, 6))
+        for key, partial in aggregate_telemetry(session, scope, granularity, by_unit).items()
+    }
+
+
+def test_archive_exports_closed_months_and_analytics_union_them(history, tmp_path):
+    scopes = [
+        TelemetryScope(ORG_ID),
+        TelemetryScope(ORG_ID, start=START + timedelta(days=3, seconds=20), building_id=11),
+        TelemetryScope(ORG_ID, start=START, end=START + timedelta(days=50), chiller_unit_id=2),
+    ]
+    cases = [(scope, granularity, by_unit) for scope in scopes for granularity in (None, "day") for by_unit in (False, True)]
+    expected = [_snapshot(history, *case) for case in cases]
+
+    report = archive_closed_months(history, now=NOW, after_days=30)
+
+    assert report.cutoff == datetime(2024, 4, 1, tzinfo=timezone.utc)
+    assert report.files == 6  # three chillers for February and March
+    remaining = history.query(ChillerTelemetry).order_by(ChillerTelemetry.timestamp).first()
+    assert remaining.timestamp.replace(tzinfo=timezone.utc) >= report.cutoff
+    segments = history.query(TelemetryArchiveSegment).all()
+    assert sum(segment.row_count for segment in segments) == report.rows
+    assert (tmp_path / segments[0].path).exists()
+    assert segments[0].path.startswith(f"organization_id={ORG_ID}/chiller_unit_id=")
+
+    # Served from rollups plus raw head/tail reads that now span the archive.
+    assert [_snapshot(history, *case) for case in cases] == expected
+
+    # Without rollups every range is read raw, straight from the Parquet files.
+    history.query(TelemetryRollup).delete()
+    history.query(TelemetryRollupWatermark).delete()
+    history.commit()
+    assert [_snapshot(history, *case) for case in cases] == expected
+
+
+def test_archive_waits_for_rollups(history):
+    report = archive_closed_months(history, now=NOW, after_days=30, dry_run=True)
+
+    assert report.cutoff is None
+    assert history.query(TelemetryArchiveSegment).count() == 0
+
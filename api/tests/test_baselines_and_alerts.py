@@ -62,7 +62,7 @@ def test_alert_events_and_email_notification(monkeypatch, client):
         sent_emails.append((tuple(to_addresses), subject, body))
         return True
 
-    monkeypatch.setattr("src.services.alert_engine.send_email", _capture_email)
+    monkeypatch.setattr("src.services.alert_engine.queue_email", _capture_email)
 
     payload = {
         "unit_id": unit_id,
@@ -0,0 +1,138 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, inspect, insert, text
+from sqlalchemy.pool import StaticPool
+
+from src.db import SessionLocal, ensure_telemetry_schema
+from src.models import AlertEvent, ChillerTelemetry, ChillerUnit
+from src.services.derived_columns import backfill_derived_columns
+from src.services.telemetry_aggregates import TelemetryScope, aggregate_telemetry
+
+ORG_ID = 5151
+BASE = datetime(2024, 5, 1, tzinfo=timezone.utc)
+
+
+def _legacy_reading(index: int) -> dict:
+    return {
+        "organization_id": ORG_ID,
+        "building_id": 3,
+        "chiller_unit_id": 1,
+        "timestamp": BASE + timedelta(minutes=10 * index),
+        "inlet_temp": 12.0,
+        # Every fifth reading has no delta T, so no cooling load and no kW/ton.
+        "outlet_temp": 12.0 if index % 5 == 0 else 7.0 - index % 3,
+        "power_kw": 20.0 + index,
+        "flow_rate": 10.0,
+        "cop": 3.5,
+    }
+
+
+def test_ingest_stores_derived_columns_and_alerts_read_them(client, telemetry_session, monkeypatch):
+    login = client.post("/auth/login", json={"email": "demo@demo.com", "password": "demo123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    session = SessionLocal()
+    try:
+        unit_id = session.query(ChillerUnit.id).order_by(ChillerUnit.id).first()[0]
+    finally:
+        session.close()
+    monkeypatch.setattr("src.services.alert_engine.queue_email", lambda **_: True)
+
+    rule = client.post(
+        "/alert_rules",
+        json={
+            "chiller_unit_id": unit_id,
+            "name": "Poor efficiency",
+            "metric_key": "kw_per_ton",
+            "condition_operator": "GT",
+            "threshold_value": 1.0,
+            "severity": "WARNING",
+        },
+        headers=headers,
+    )
+    assert rule.status_code == 201
+
+    reading = {
+        "unit_id": unit_id,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "inlet_temp": 12.0,
+        "outlet_temp": 7.0,
+        "power_kw": 30.0,
+        "flow_rate": 12.0,
+        "cop": 3.9,
+    }
+    created = client.post("/telemetry/ingest", json=reading, headers=headers)
+    assert created.status_code == 201
+
+    stored = telemetry_session.get(ChillerTelemetry, created.json()["id"])
+    assert stored.delta_t == pytest.approx(5.0)
+    assert stored.cooling_load_rth == pytest.approx(12.0 * 5.0 * 500 / 12000)
+    assert stored.kw_per_ton == pytest.approx(30.0 / stored.cooling_load_rth)
+
+    session = SessionLocal()
+    try:
+        events = session.query(AlertEvent).filter(AlertEvent.alert_rule_id == rule.json()["id"]).all()
+        assert [event.metric_value for event in events] == [pytest.approx(stored.kw_per_ton)]
+    finally:
+        session.close()
+
+
+def test_backfill_fills_legacy_rows_without_changing_aggregates(telemetry_session):
+    telemetry_session.execute(insert(ChillerTelemetry), [_legacy_reading(index) for index in range(23)])
+    telemetry_session.commit()
+    scope = TelemetryScope(ORG_ID)
+    before = {
+        key: (partial.cooling_sum, partial.cooling_count)
+        for key, partial in aggregate_telemetry(telemetry_session, scope, "hour", False).items()
+    }
+
+    report = backfill_derived_columns(telemetry_session, batch_size=10, max_batches=2)
+    assert (report.rows, report.batches, report.complete) == (20, 2, False)
+    report = backfill_derived_columns(telemetry_session, batch_size=10)
+    assert (report.rows, report.complete) == (3, True)
+    assert backfill_derived_columns(telemetry_session, batch_size=10).rows == 0
+
+    rows = telemetry_session.query(ChillerTelemetry).filter(ChillerTelemetry.organization_id == ORG_ID).all()
+    assert all(row.delta_t == row.inlet_temp - row.outlet_temp for row in rows)
+    assert [row.cooling_load_rth is None for row in rows] == [row.delta_t == 0 for row in rows]
+    assert all(
+        row.kw_per_ton == pytest.approx(row.power_kw / row.cooling_load_rth)
+        for row in rows
+        if row.cooling_load_rth
+    )
+
+    after = {
+        key: (partial.cooling_sum, partial.cooling_count)
+        for key, partial in aggregate_telemetry(telemetry_session, scope, "hour", False).items()
+    }
+    assert after.keys() == before.keys()
+    for key, (cooling_sum, cooling_count) in before.items():
+        assert after[key][0] == pytest.approx(cooling_sum)
+        assert after[key][1] == cooling_count
+
+
+def test_ensure_telemetry_schema_adds_derived_columns():
+    bind = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    with bind.begin() as connection:
+        connection.execute(
+            text(
+                "CREATE TABLE chiller_telemetry (id INTEGER PRIMARY KEY, organization_id INTEGER NOT NULL, "
+                "building_id INTEGER NOT NULL, chiller_unit_id INTEGER NOT NULL, timestamp DATETIME NOT NULL, "
+                "inlet_temp FLOAT NOT NULL, outlet_temp FLOAT NOT NULL, power_kw FLOAT NOT NULL, "
+                "flow_rate FLOAT NOT NULL, cop FLOAT NOT NULL, "
+                "created_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL)"
+            )
+        )
+
+    ensure_telemetry_schema(bind)
+
+    inspector = inspect(bind)
+    columns = {column["name"] for column in inspector.get_columns("chiller_telemetry")}
+    assert {"delta_t", "cooling_load_rth", "kw_per_ton"} <= columns
+    indexes = {index["name"] for index in inspector.get_indexes("chiller_telemetry")}
+    assert "ix_chiller_telemetry_underived" in indexes
+    bind.dispose()
@@ -0,0 +1,21 @@
+import numpy as np
+
+from src.services.downsampling import lttb_indices
+
+
+def test_lttb_bounds_points_and_keeps_extremes_of_any_series():
+    x = np.arange(10_000, dtype=float)
+    smooth = np.sin(x / 700)
+    spiky = np.full_like(x, 2.0)
+    spiky[4321] = 50.0
+    spiky[8000] = np.nan
+
+    keep = lttb_indices(x, np.column_stack([smooth, spiky]), 200)
+
+    assert len(keep) == 200
+    assert keep[0] == 0 and keep[-1] == len(x) - 1
+    assert np.all(np.diff(keep) > 0)
+    assert 4321 in keep
+    assert np.argmax(smooth) in keep or abs(smooth[keep].max() - 1) < 1e-3
+
+    assert list(lttb_indices(x[:5], smooth[:5], 10)) == [0, 1, 2, 3, 4]
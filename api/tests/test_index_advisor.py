@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import inspect, text
+
+from src.db import ensure_telemetry_schema
+from src.services.index_advisor import (
+    analytics_queries,
+    explain_queries,
+    remove_synthetic_telemetry,
+    seed_synthetic_telemetry,
+)
+
+
+def test_analytics_queries_use_indexes(telemetry_session):
+    seed_synthetic_telemetry(telemetry_session, rows=5000, organizations=5)
+    try:
+        end = datetime.now(timezone.utc)
+        queries = analytics_queries(telemetry_session, 900_000, 900_000, 4_500_000, end - timedelta(days=7), end)
+        reports = explain_queries(telemetry_session, queries)
+    finally:
+        remove_synthetic_telemetry(telemetry_session)
+
+    assert {report.name for report in reports} == set(queries)
+    for report in reports:
+        assert report.ok, (report.name, report.plan)
+        assert report.indexes, report.name
+
+    by_name = {report.name: report for report in reports}
+    assert "ix_chiller_telemetry_org_chiller_timestamp" in by_name["chiller_trends.raw"].indexes
+    assert "ix_chiller_telemetry_org_building_timestamp" in by_name["equipment_metrics.raw"].indexes
+
+
+def test_ensure_telemetry_schema_restores_missing_indexes(telemetry_session):
+    bind = telemetry_session.get_bind()
+    with bind.begin() as connection:
+        connection.execute(text("DROP INDEX ix_chiller_telemetry_org_chiller_timestamp"))
+
+    ensure_telemetry_schema(bind)
+
+    indexes = {index["name"] for index in inspect(bind).get_indexes("chiller_telemetry")}
+    assert "ix_chiller_telemetry_org_chiller_timestamp" in indexes
+    assert "ix_chiller_telemetry_timestamp" in indexes
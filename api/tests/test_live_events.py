@@ -0,0 +1,108 @@
+import asyncio
+from datetime import datetime, timezone
+
+import orjson
+
+from src.config import settings
+from src.db import SessionLocal
+from src.models import ChillerUnit, User
+from src.routers.stream import stream_alerts, stream_telemetry
+from src.services.live_events import TELEMETRY, LiveEventBroker, live_events
+
+
+def _event(frame: bytes) -> tuple[str, dict]:
+    name, data = frame.decode().strip().split("\n")
+    return name.removeprefix("event: "), orjson.loads(data.removeprefix("data: "))
+
+
+def test_broker_fans_out_per_organization_and_drops_slow_consumers():
+    broker = LiveEventBroker(max_buffer=2)
+
+    async def scenario():
+        viewer = broker.subscribe(TELEMETRY, 1)
+        filtered = broker.subscribe(TELEMETRY, 1, lambda payload: payload["chiller_unit_id"] == 7)
+        other_tenant = broker.subscribe(TELEMETRY, 2)
+        assert broker.publish(TELEMETRY, 1, "telemetry", {"chiller_unit_id": 7}) == 2
+        assert broker.publish(TELEMETRY, 1, "telemetry", {"chiller_unit_id": 8}) == 1
+
+        frames = viewer.frames(heartbeat_seconds=0.01)
+        received = [_event(await anext(frames))[1] for _ in range(2)]
+        assert received == [{"chiller_unit_id": 7}, {"chiller_unit_id": 8}]
+        assert await anext(frames) == b": keepalive\n\n"
+        assert _event(await anext(filtered.frames(heartbeat_seconds=1)))[1] == {"chiller_unit_id": 7}
+
+        # A viewer that stops reading is cut off instead of buffering without bound.
+        for chiller_unit_id in range(3):
+            broker.publish(TELEMETRY, 1, "telemetry", {"chiller_unit_id": chiller_unit_id})
+        assert _event(await anext(frames))[0] == "overflow"
+        assert [frame async for frame in frames] == []
+        for subscriber in (viewer, filtered, other_tenant):
+            broker.unsubscribe(subscriber)
+
+    asyncio.run(scenario())
+    stats = broker.stats()
+    assert stats["subscribers"] == {"telemetry": 0, "alerts": 0}
+    assert stats["dropped_subscribers_total"] == 1
+
+
+def test_streams_push_ingested_readings_and_alerts(client, monkeypatch):
+    assert client.get("/stream/telemetry").status_code == 401
+    login = client.post("/auth/login", json={"email": "demo@demo.com", "password": "demo123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    session = SessionLocal()
+    try:
+        user = session.query(User).filter(User.email == "demo@demo.com").one()
+        unit_id = session.query(ChillerUnit.id).first()[0]
+    finally:
+        session.close()
+    monkeypatch.setattr("src.services.alert_engine.queue_email", lambda **_: True)
+    client.post(
+        "/alert_rules",
+        json={
+            "chiller_unit_id": unit_id,
+            "name": "Low flow",
+            "metric_key": "flow_rate",
+            "condition_operator": "LT",
+            "threshold_value": 10.0,
+            "severity": "CRITICAL",
+        },
+        headers=headers,
+    )
+
+    def ingest(flow_rate: float) -> None:
+        reading = {
+            "unit_id": unit_id,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "inlet_temp": 12.0,
+            "outlet_temp": 7.0,
+            "power_kw": 30.0,
+            "flow_rate": flow_rate,
+            "cop": 3.9,
+        }
+        assert client.post("/telemetry/ingest", json=reading, headers=headers).status_code == 201
+
+    async def scenario():
+        readings = (await stream_telemetry(None, unit_id, current_user=user)).body_iterator
+        others = (await stream_telemetry(None, -1, current_user=user)).body_iterator
+        alerts = (await stream_alerts(None, None, current_user=user)).body_iterator
+        for stream in (readings, others, alerts):
+            assert (await anext(stream)).startswith(b"retry: ")
+
+        await asyncio.to_thread(ingest, 12.0)
+        await asyncio.to_thread(ingest, 8.0)
+        received = [_event(await asyncio.wait_for(anext(readings), 5)) for _ in range(2)]
+        assert [(name, payload["flow_rate"]) for name, payload in received] == [
+            ("telemetry", 12.0),
+            ("telemetry", 8.0),
+        ]
+        assert "organization_id" not in received[0][1] and received[0][1]["delta_t"] == 5.0
+        name, alert = _event(await asyncio.wait_for(anext(alerts), 5))
+        assert name == "alert" and alert["severity"] == "CRITICAL" and alert["metric_value"] == 8.0
+        assert live_events.stats()["subscribers"] == {"telemetry": 2, "alerts": 1}
+
+        for stream in (readings, others, alerts):
+            await stream.aclose()
+
+    monkeypatch.setattr(settings, "stream_heartbeat_seconds", 60.0)
+    asyncio.run(scenario())
+    assert live_events.stats()["subscribers"] == {"telemetry": 0, "alerts": 0}
@@ -1,6 +1,9 @@
 from fastapi.testclient import TestClient
 
+from src.auth.security import create_access_token
+from src.config import settings
 from src.main import app
+from src.models.user import UserRole
 
 
 client = TestClient(app)
@@ -10,3 +13,35 @@ def test_health_endpoint_returns_ok_status():
     response = client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
+
+
+def test_db_pool_stats_require_authentication():
+    assert client.get("/health/db-pools").status_code == 401
+
+    response = client.get("/health/db-pools", headers={"X-Service-Token": settings.service_token})
+
+    assert response.status_code == 200
+    pools = response.json()
+    assert set(pools) == {"metadata", "metadata_async", "historical", "historical_async"}
+    assert {"checkouts", "timeouts", "wait_ms_avg", "wait_ms_max"} <= set(pools["historical_async"])
+
+
+OPERATIONAL_ENDPOINTS = ["/health/db-pools", "/health/notifications", "/health/streams", "/telemetry/ingest/stats"]
+
+
+def test_operational_endpoints_require_service_token_or_admin(db_session, default_user):
+    headers = {
+        "Authorization": "Bearer "
+        + create_access_token({"user_id": default_user.id, "organization_id": default_user.organization_id})
+    }
+    default_user.role = UserRole.VIEWER
+    db_session.commit()
+    for path in OPERATIONAL_ENDPOINTS:
+        assert client.get(path).status_code == 401, path
+        assert client.get(path, headers=headers).status_code == 403, path
+        assert client.get(path, headers={"X-Service-Token": settings.service_token}).status_code == 200, path
+
+    default_user.role = UserRole.ORG_ADMIN
+    db_session.commit()
+    for path in OPERATIONAL_ENDPOINTS:
+        assert client.get(path, headers=headers).status_code == 200, path
@@ -0,0 +1,114 @@
+import time
+from datetime import datetime, timezone
+
+from src.config import settings
+from src.db import SessionLocal
+from src.models import AlertRule, ChillerUnit
+from src.services.email import SmtpConnection
+from src.services.notifications import EmailDispatcher, email_dispatcher
+
+
+def _dispatcher(smtp_server, **overrides) -> EmailDispatcher:
+    options = {
+        "max_size": 10,
+        "batch_window_seconds": 60.0,
+        "batch_max_messages": 50,
+        "max_retries": 3,
+        "retry_backoff_seconds": 0.01,
+    }
+    options.update(overrides)
+    return EmailDispatcher(
+        **options,
+        connection_factory=lambda: SmtpConnection("127.0.0.1", smtp_server.port, timeout_seconds=5),
+    )
+
+
+def test_dispatcher_batches_per_recipients_over_one_connection(smtp_server, monkeypatch):
+    monkeypatch.setattr(settings, "smtp_host", "127.0.0.1")
+    dispatcher = _dispatcher(smtp_server, max_size=4)
+
+    assert dispatcher.submit(["ops@example.com", "lead@example.com"], "Chiller Alert: A", "first")
+    assert dispatcher.submit([" lead@example.com", "ops@example.com"], "Chiller Alert: B", "second")
+    assert dispatcher.submit(["ops@example.com"], "Chiller Alert: C", "third")
+    assert dispatcher.submit(["ops@example.com", "lead@example.com"], "Chiller Alert: D", "fourth")
+    assert not dispatcher.submit(["ops@example.com"], "Chiller Alert: E", "overflow")
+    assert not dispatcher.submit([" "], "Chiller Alert: F", "nobody")
+    # Nothing leaves before the batch window closes.
+    assert smtp_server.messages == []
+
+    assert dispatcher.flush() == 4
+    subjects = sorted(message["Subject"] for _, message in smtp_server.messages)
+    assert subjects == ["Chiller Alert: C", "Chiller Alerts: 3 notifications"]
+    digest = next(message for _, message in smtp_server.messages if "3 notifications" in message["Subject"])
+    assert ["first", "second", "fourth"] == [
+        line for line in digest.get_payload().splitlines() if line in ("first", "second", "fourth")
+    ]
+    assert smtp_server.connections == 1
+    assert dispatcher.stats()["rejected_total"] == 1
+    dispatcher.stop()
+
+
+def test_dispatcher_retries_and_reconnects(smtp_server, monkeypatch):
+    monkeypatch.setattr(settings, "smtp_host", "127.0.0.1")
+    dispatcher = _dispatcher(smtp_server, batch_window_seconds=0.05)
+
+    smtp_server.fail_next = 2
+    assert dispatcher.submit(["ops@example.com"], "Chiller Alert: A", "first")
+    deadline = time.monotonic() + 5
+    while not smtp_server.messages and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(smtp_server.messages) == 1
+
+    # The server closes the idle session; the next send reconnects transparently.
+    smtp_server.disconnect_all()
+    assert dispatcher.submit(["ops@example.com"], "Chiller Alert: B", "second")
+    dispatcher.stop()
+
+    assert [message["Subject"] for _, message in smtp_server.messages] == [
+        "Chiller Alert: A",
+        "Chiller Alert: B",
+    ]
+    stats = dispatcher.stats()
+    assert stats["failed_attempts"] == 2
+    assert stats["delivered_total"] == 2
+    assert stats["dropped_total"] == 0
+    assert not stats["running"]
+
+
+def test_ingest_only_enqueues_alert_emails(client, smtp_server, monkeypatch):
+    monkeypatch.setattr(settings, "smtp_host", "127.0.0.1")
+    monkeypatch.setattr(settings, "smtp_port", smtp_server.port)
+    monkeypatch.setattr(settings, "smtp_username", "")
+    monkeypatch.setattr(email_dispatcher, "batch_window_seconds", 60.0)
+    session = SessionLocal()
+    try:
+        unit_id = session.query(ChillerUnit.id).first()[0]
+        session.query(AlertRule).filter(AlertRule.chiller_unit_id == unit_id).update(
+            {AlertRule.recipient_emails: ["ops@example.com"]}
+        )
+        session.commit()
+    finally:
+        session.close()
+
+    try:
+        response = client.post(
+            "/telemetry/ingest",
+            json={
+                "unit_id": unit_id,
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "inlet_temp": 12.0,
+                "outlet_temp": 7.0,
+                "power_kw": 99.0,
+                "flow_rate": 10.0,
+                "cop": 3.0,
+            },
+            headers={"X-Service-Token": settings.service_token},
+        )
+        assert response.status_code == 201
+        assert smtp_server.connections == 0
+        assert email_dispatcher.stats()["queue_depth"] >= 1
+    finally:
+        email_dispatcher.stop()
+
+    assert smtp_server.messages
+    assert all(recipients == ["ops@example.com"] for recipients, _ in smtp_server.messages)
@@ -0,0 +1,39 @@
+from datetime import datetime, timezone
+
+from src.services.partitions import (
+    is_partitioned,
+    months_between,
+    partition_ddl,
+    partition_name,
+    telemetry_partitions,
+)
+
+
+def test_months_between_spans_year_boundary():
+    months = months_between(
+        datetime(2024, 11, 15, 8, tzinfo=timezone.utc), datetime(2025, 2, 1, tzinfo=timezone.utc)
+    )
+
+    assert [partition_name(month) for month in months] == [
+        "chiller_telemetry_y2024m11",
+        "chiller_telemetry_y2024m12",
+        "chiller_telemetry_y2025m01",
+        "chiller_telemetry_y2025m02",
+    ]
+
+
+def test_partition_ddl_uses_half_open_month_bounds():
+    ddl = partition_ddl(datetime(2024, 12, 9, 13, 30, tzinfo=timezone.utc))
+
+    assert ddl == (
+        "CREATE TABLE IF NOT EXISTS chiller_telemetry_y2024m12 PARTITION OF chiller_telemetry "
+        "FOR VALUES FROM ('2024-12-01T00:00:00+00:00') TO ('2025-01-01T00:00:00+00:00')"
+    )
+
+
+def test_sqlite_history_database_stays_unpartitioned(telemetry_session):
+    bind = telemetry_session.get_bind()
+
+    with bind.connect() as connection:
+        assert not is_partitioned(connection)
+    assert telemetry_partitions.ensure_for(bind, [datetime(2001, 1, 1, tzinfo=timezone.utc)]) == 0
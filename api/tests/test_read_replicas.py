@@ -0,0 +1,88 @@
+from datetime import datetime, timezone
+
+from fastapi import status
+
+import src.db as db_module
+from src.config import settings
+from src.db import _create_async_engine, _create_engine
+from src.db_pools import pool_metrics
+from src.db_replicas import Replica, ReplicaRouter
+from src.services.analytics_cache import AnalyticsResultCache
+from src.services.telemetry_aggregates import TelemetryScope
+
+
+def _replica(name: str, url: str) -> Replica:
+    return Replica(name=name, engine=_create_engine(url), async_engine=_create_async_engine(url, name=name))
+
+
+def test_router_balances_healthy_replicas_and_skips_lagging_or_dead_ones(tmp_path):
+    first = _replica("first", f"sqlite+pysqlite:///{tmp_path}/first.db")
+    second = _replica("second", f"sqlite+pysqlite:///{tmp_path}/second.db")
+    dead = _replica("dead", f"sqlite+pysqlite:///{tmp_path}/missing/dead.db")
+    router = ReplicaRouter([first, second, dead], max_lag_seconds=5)
+
+    # Unchecked replicas are never used.
+    assert router.choose() is None
+
+    router.check()
+    assert (first.healthy, second.healthy, dead.healthy) == (True, True, False)
+    assert dead.error
+    assert {router.choose().name for _ in range(4)} == {"first", "second"}
+
+    second.lag_seconds = 12
+    assert {router.choose().name for _ in range(4)} == {"first"}
+
+    router.mark_failed(first, RuntimeError("connection refused"))
+    assert router.choose() is None
+
+    router.check()
+    assert router.choose() is not None
+    for replica in router.replicas:
+        replica.engine.dispose()
+
+
+def test_analytics_read_from_replica(client, monkeypatch):
+    token = client.post("/auth/login", json={"email": "demo@demo.com", "password": "demo123"}).json()[
+        "access_token"
+    ]
+    # The replica is the history database itself, so results match the primary.
+    replica = _replica("test_replica", settings.historical_database_url)
+    router = ReplicaRouter([replica], max_lag_seconds=5)
+    router.check()
+    monkeypatch.setattr(db_module, "telemetry_replicas", router)
+    before = pool_metrics("test_replica").snapshot()["checkouts"]
+
+    response = client.get(
+        "/analytics/plant-overview", headers={"Authorization": f"Bearer {token}"}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["power_consumption_kw"] > 0
+    assert pool_metrics("test_replica").snapshot()["checkouts"] > before
+    replica.engine.dispose()
+
+
+def test_results_read_before_writes_replicate_are_not_stored():
+    clock = [100.0]
+    cache = AnalyticsResultCache(
+        max_entries=4,
+        ttl_seconds=60,
+        closed_after_seconds=300,
+        clock=lambda: clock[0],
+        write_visibility_seconds=10,
+    )
+    scope = TelemetryScope(1, datetime(2020, 1, 1), datetime(2020, 2, 1))
+    written = datetime(2020, 1, 10, tzinfo=timezone.utc)
+    cache.invalidate_window(1, written, written)
+
+    # Five seconds after the write a replica may still miss it.
+    clock[0] = 105
+    assert cache.get_or_compute("plant-overview", scope, lambda: "maybe stale") == "maybe stale"
+    assert len(cache) == 0
+    # Writes to other organizations or outside the window do not matter.
+    assert cache.get_or_compute("plant-overview", TelemetryScope(2), lambda: "other") == "other"
+    assert len(cache) == 1
+
+    clock[0] = 111
+    assert cache.get_or_compute("plant-overview", scope, lambda: "fresh") == "fresh"
+    assert cache.get_or_compute("plant-overview", scope, lambda: "unused") == "fresh"
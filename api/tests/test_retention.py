@@ -0,0 +1,164 @@
+from datetime import datetime, timedelta, timezone
+
+from fastapi import status
+
+from src.models import ChillerTelemetry, TelemetryRetentionPolicy, TelemetryRollup
+from src.services.retention import RetentionReport, RetentionTarget, retention_status, run_retention
+from src.services.telemetry_aggregates import TelemetryScope, aggregate_telemetry
+from src.services.telemetry_writer import insert_telemetry_rows
+
+NOW = datetime(2024, 6, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def auth_header(token: str) -> dict[str, str]:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _register(client, email: str = "retention@example.com") -> str:
+    response = client.post(
+        "/auth/register",
+        json={
+            "organization_name": "Retention Org",
+            "organization_type": "ENERGY_MGMT",
+            "admin_email": email,
+            "admin_password": "password123",
+            "admin_name": "Admin",
+        },
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    return response.json()["access_token"]
+
+
+def _load_history(telemetry_session, organization_id: int) -> None:
+    telemetry_session.query(ChillerTelemetry).delete()
+    rows = [
+        {
+            "organization_id": organization_id,
+            "building_id": 1,
+            "chiller_unit_id": 1 + hour % 2,
+            "timestamp": NOW - timedelta(days=60) + timedelta(hours=hour),
+            "inlet_temp": 12.0,
+            "outlet_temp": 7.0,
+            "power_kw": 40.0 + hour % 5,
+            "flow_rate": 10.0,
+            "cop": 3.5,
+        }
+        for hour in range(59 * 24)
+    ]
+    insert_telemetry_rows(telemetry_session, rows)
+    telemetry_session.commit()
+
+
+def _totals(telemetry_session, organization_id: int):
+    return {
+        key: (partial.samples, round(partial.power_sum, 6))
+        for key, partial in aggregate_telemetry(
+            telemetry_session, TelemetryScope(organization_id), "day"
+        ).items()
+    }
+
+
+def test_retention_policy_api_validates_tiers(client):
+    token = _register(client)
+
+    response = client.get("/retention-policies", headers=auth_header(token))
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["raw_retention_days"] is None
+
+    response = client.put(
+        "/retention-policies",
+        headers=auth_header(token),
+        json={"raw_retention_days": 400, "minute_retention_days": 365},
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    response = client.put(
+        "/retention-policies",
+        headers=auth_header(token),
+        json={"raw_retention_days": 30, "minute_retention_days": 365},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["minute_retention_days"] == 365
+    assert response.json()["hour_retention_days"] is None
+
+    response = client.get("/retention-policies/preview", headers=auth_header(token))
+    assert response.status_code == status.HTTP_200_OK
+    assert [target["tier"] for target in response.json()["targets"]] == ["raw", "minute"]
+
+
+def test_retention_status_is_scoped_to_the_organization(client, monkeypatch):
+    tokens = [_register(client), _register(client, "other-retention@example.com")]
+    organization_ids = [
+        client.get("/organizations/me", headers=auth_header(token)).json()["id"] for token in tokens
+    ]
+    report = RetentionReport(dry_run=False, started_at=NOW, finished_at=NOW)
+    for organization_id, rows in zip(organization_ids, (10, 20)):
+        report.targets.append(
+            RetentionTarget(
+                organization_id=organization_id,
+                tier="raw",
+                cutoff=NOW - timedelta(days=30),
+                effective_cutoff=NOW - timedelta(days=30),
+                rows=rows,
+                bytes=rows * 100,
+            )
+        )
+    monkeypatch.setattr(retention_status, "last_run", report)
+    monkeypatch.setattr(retention_status, "last_error", "could not reach the history database")
+
+    for token, organization_id, rows in zip(tokens, organization_ids, (10, 20)):
+        response = client.get("/retention-policies/status", headers=auth_header(token))
+        assert response.status_code == status.HTTP_200_OK
+        body = response.json()
+        assert body["last_error"] is None
+        assert [target["organization_id"] for target in body["last_run"]["targets"]] == [organization_id]
+        assert (body["last_run"]["rows"], body["last_run"]["bytes"]) == (rows, rows * 100)
+
+
+def test_retention_downsamples_before_deleting(db_session, telemetry_session, default_organization):
+    organization_id = default_organization.id
+    db_session.add(
+        TelemetryRetentionPolicy(
+            organization_id=organization_id, raw_retention_days=30, minute_retention_days=45
+        )
+    )
+    db_session.commit()
+    _load_history(telemetry_session, organization_id)
+
+    # Nothing has been rolled up yet, so a dry run must not offer any rows.
+    held_back = run_retention(db_session, telemetry_session, dry_run=True, now=NOW)
+    assert held_back.rows == 0
+    assert all(target.effective_cutoff is None for target in held_back.targets)
+
+    expected = _totals(telemetry_session, organization_id)
+    raw_expired = (
+        telemetry_session.query(ChillerTelemetry)
+        .filter(ChillerTelemetry.timestamp < NOW - timedelta(days=30))
+        .count()
+    )
+
+    report = run_retention(db_session, telemetry_session, now=NOW, batch_size=100)
+
+    by_tier = {target.tier: target for target in report.targets}
+    assert by_tier["raw"].rows == raw_expired
+    assert by_tier["minute"].rows > 0
+    assert report.bytes > 0
+    assert (
+        telemetry_session.query(ChillerTelemetry)
+        .filter(ChillerTelemetry.timestamp < NOW - timedelta(days=30))
+        .count()
+        == 0
+    )
+    assert (
+        telemetry_session.query(TelemetryRollup)
+        .filter(
+            TelemetryRollup.grain == "minute",
+            TelemetryRollup.bucket_start < NOW - timedelta(days=45),
+        )
+        .count()
+        == 0
+    )
+    assert _totals(telemetry_session, organization_id) == expected
+
+    again = run_retention(db_session, telemetry_session, dry_run=True, now=NOW)
+    assert again.rows == 0
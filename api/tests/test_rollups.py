@@ -0,0 +1,181 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+import src.services.rollups as rollups_module
+from src.db_base import TelemetryBase
+
+from src.models import ChillerTelemetry, TelemetryRollup
+from src.services.rollups import refresh_rollups
+from src.services.telemetry_aggregates import (
+    TelemetryScope,
+    aggregate_telemetry,
+    load_watermarks,
+    plan_rollup_segments,
+)
+from src.services.telemetry_writer import insert_telemetry_rows
+
+ORG_ID = 4242
+BASE = datetime(2024, 3, 30, 22, 0, tzinfo=timezone.utc)
+
+
+def _reading(timestamp: datetime, unit_id: int = 1, power_kw: float = 30.0) -> dict:
+    return {
+        "organization_id": ORG_ID,
+        "building_id": 7,
+        "chiller_unit_id": unit_id,
+        "timestamp": timestamp,
+        "inlet_temp": 12.0,
+        "outlet_temp": 7.0,
+        "power_kw": power_kw,
+        "flow_rate": 10.0,
+        "cop": 3.5,
+    }
+
+
+@pytest.fixture
+def rolled_up(telemetry_session):
+    telemetry_session.query(ChillerTelemetry).delete()
+    rows = [
+        _reading(BASE + timedelta(minutes=17 * index), unit_id=1 + index % 2, power_kw=20 + index)
+        for index in range(400)
+    ]
+    insert_telemetry_rows(telemetry_session, rows)
+    telemetry_session.commit()
+    return telemetry_session
+
+
+def _snapshot(session, scope, granularity, by_unit):
+    return {
+        key: (partial.samples, round(partial.cooling_sum, 6), round(partial.power_sum, 6))
+        for key, partial in aggregate_telemetry(session, scope, granularity, by_unit).items()
+    }
+
+
+def test_rollups_match_raw_aggregates(rolled_up):
+    scopes = [
+        TelemetryScope(ORG_ID),
+        TelemetryScope(ORG_ID, start=BASE + timedelta(days=1), end=BASE + timedelta(days=3, minutes=7)),
+        TelemetryScope(ORG_ID, start=BASE + timedelta(minutes=3), chiller_unit_id=2),
+        TelemetryScope(ORG_ID, start=BASE + timedelta(seconds=45), end=BASE + timedelta(days=4, hours=23)),
+    ]
+    cases = [(scope, granularity, by_unit) for scope in scopes for granularity in (None, "hour", "day", "month") for by_unit in (False, True)]
+    expected = [_snapshot(rolled_up, *case) for case in cases]
+
+    written = refresh_rollups(rolled_up, until=BASE + timedelta(days=5))
+
+    assert written["minute"] > 0 and written["month"] > 0
+    assert rolled_up.query(TelemetryRollup).count() > 0
+    assert [_snapshot(rolled_up, *case) for case in cases] == expected
+
+
+def test_late_readings_update_existing_rollups(rolled_up):
+    refresh_rollups(rolled_up, until=BASE + timedelta(days=10))
+    scope = TelemetryScope(ORG_ID, start=BASE, end=BASE + timedelta(hours=2))
+    before = aggregate_telemetry(rolled_up, scope)[(None, None)]
+
+    insert_telemetry_rows(rolled_up, [_reading(BASE + timedelta(minutes=5), power_kw=100.0)])
+    rolled_up.commit()
+
+    after = aggregate_telemetry(rolled_up, scope)[(None, None)]
+    assert after.samples == before.samples + 1
+    assert after.power_sum == pytest.approx(before.power_sum + 100.0)
+    hour_bucket = (
+        rolled_up.query(TelemetryRollup)
+        .filter(TelemetryRollup.grain == "hour", TelemetryRollup.chiller_unit_id == 1)
+        .order_by(TelemetryRollup.bucket_start)
+        .first()
+    )
+    assert hour_bucket.sample_count == 3
+
+
+def test_segment_plan_prefers_coarse_grains_and_leaves_raw_tail(rolled_up):
+    refresh_rollups(rolled_up, until=BASE + timedelta(days=5))
+    watermarks = load_watermarks(rolled_up)
+
+    segments, raw_start = plan_rollup_segments(
+        watermarks, "day", BASE + timedelta(hours=1), None
+    )
+
+    assert [segment.grain for segment in segments] == ["hour", "day", "hour", "minute"]
+    assert segments[1].start == BASE + timedelta(hours=2)
+    assert raw_start == watermarks["minute"]
+
+    segments, raw_start = plan_rollup_segments(
+        watermarks, "hour", BASE + timedelta(seconds=30), BASE + timedelta(hours=3, minutes=5)
+    )
+    assert [segment.grain for segment in segments] == [None, "minute", "hour", "minute"]
+    assert segments[0].end == BASE + timedelta(minutes=1)
+    assert raw_start == BASE + timedelta(hours=3, minutes=5)
+
+    segments, raw_start = plan_rollup_segments({}, "hour", BASE + timedelta(seconds=30), None)
+    assert segments == []
+    assert raw_start == BASE + timedelta(seconds=30)
+
+
+def test_late_reading_during_a_refresh_is_rolled_up(tmp_path, monkeypatch):
+    # Separate connections, so the refresh and the ingest run as concurrent transactions.
+    engine = create_engine(
+        f"sqlite+pysqlite:///{tmp_path}/history.db",
+        poolclass=NullPool,
+        connect_args={"check_same_thread": False, "timeout": 30},
+    )
+    TelemetryBase.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as session:
+        insert_telemetry_rows(session, [_reading(BASE + timedelta(minutes=17 * index)) for index in range(200)])
+        session.commit()
+
+    paused, resume = threading.Event(), threading.Event()
+    set_watermark = rollups_module._set_watermark
+
+    def pausing_set_watermark(session, grain, value):
+        # The first chunk has read its source rows but not committed its watermark yet.
+        set_watermark(session, grain, value)
+        if not paused.is_set():
+            paused.set()
+            resume.wait(10)
+
+    monkeypatch.setattr(rollups_module, "_set_watermark", pausing_set_watermark)
+
+    def refresh():
+        with Session() as session:
+            refresh_rollups(session, until=BASE + timedelta(days=5))
+
+    def ingest():
+        with Session() as session:
+            insert_telemetry_rows(session, [_reading(BASE + timedelta(minutes=5), power_kw=100.0)])
+            session.commit()
+
+    refresher = threading.Thread(target=refresh)
+    refresher.start()
+    assert paused.wait(10)
+    ingester = threading.Thread(target=ingest)
+    ingester.start()
+    time.sleep(0.2)
+    resume.set()
+    refresher.join(10)
+    ingester.join(10)
+
+    with Session() as session:
+        watermarks = load_watermarks(session)
+        assert set(watermarks) == {"minute", "hour", "day", "month"}
+        for grain, watermark in watermarks.items():
+            raw = (
+                session.query(func.count(ChillerTelemetry.id), func.sum(ChillerTelemetry.power_kw))
+                .filter(ChillerTelemetry.timestamp < watermark)
+                .one()
+            )
+            rolled = (
+                session.query(func.sum(TelemetryRollup.sample_count), func.sum(TelemetryRollup.power_kw_sum))
+                .filter(TelemetryRollup.grain == grain)
+                .one()
+            )
+            assert (rolled[0], pytest.approx(rolled[1])) == (raw[0], raw[1]), grain
+        assert session.query(ChillerTelemetry).count() == 201
+    engine.dispose()
@@ -1,11 +1,14 @@
+import time
 from datetime import datetime, timezone
 
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 
 from src.config import settings
-from src.db import SessionLocal, TelemetrySessionLocal
-from src.models import ChillerTelemetry, ChillerUnit
+from src.db import SessionLocal, TelemetrySessionLocal, async_engine, engine
+from src.models import AlertEvent, ChillerTelemetry, ChillerUnit
 from src.seeder.demo_data import seed_demo_data
+from src.services.ingest_buffer import TelemetryWriteBuffer
 
 
 def test_service_token_can_ingest_telemetry(client: TestClient):
@@ -71,3 +74,268 @@ def test_ingest_requires_auth_without_service_token(client: TestClient):
     response = client.post("/telemetry/ingest", json=payload)
 
     assert response.status_code == 401
+
+
+def test_batch_ingest_reports_per_row_status(client: TestClient):
+    seed_demo_data()
+    session = SessionLocal()
+    try:
+        unit_ids = [row[0] for row in session.query(ChillerUnit.id).order_by(ChillerUnit.id).all()]
+    finally:
+        session.close()
+
+    timestamp = datetime.now(timezone.utc).isoformat()
+    readings = [
+        {
+            "unit_id": unit_id,
+            "timestamp": timestamp,
+            "inlet_temp": 12.0,
+            "outlet_temp": 7.0,
+            "power_kw": 30.0,
+            "flow_rate": 11.0,
+            "cop": 3.9,
+        }
+        for unit_id in unit_ids[:2]
+    ]
+    readings.append({**readings[0], "unit_id": 999_999})
+
+    response = client.post(
+        "/telemetry/ingest/batch",
+        json={"readings": readings},
+        headers={"X-Service-Token": settings.service_token},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["accepted"] == 2
+    assert data["rejected"] == 1
+    assert [item["status"] for item in data["results"]] == ["created", "created", "rejected"]
+    assert data["results"][2]["detail"] == "Chiller not found"
+
+    telemetry_session = TelemetrySessionLocal()
+    try:
+        created_ids = [item["id"] for item in data["results"][:2]]
+        stored = (
+            telemetry_session.query(ChillerTelemetry)
+            .filter(ChillerTelemetry.id.in_(created_ids))
+            .order_by(ChillerTelemetry.id)
+            .all()
+        )
+        assert [record.chiller_unit_id for record in stored] == unit_ids[:2]
+    finally:
+        telemetry_session.close()
+
+
+def test_batch_ingest_rejects_oversized_batches(client: TestClient, monkeypatch):
+    monkeypatch.setattr(settings, "telemetry_batch_max_size", 1)
+    reading = {
+        "unit_id": 1,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "inlet_temp": 12.0,
+        "outlet_temp": 7.0,
+        "power_kw": 30.0,
+        "flow_rate": 11.0,
+        "cop": 3.9,
+    }
+
+    response = client.post(
+        "/telemetry/ingest/batch",
+        json={"readings": [reading, reading]},
+        headers={"X-Service-Token": settings.service_token},
+    )
+
+    assert response.status_code == 413
+
+
+def _first_unit_id() -> int:
+    session = SessionLocal()
+    try:
+        return session.query(ChillerUnit.id).order_by(ChillerUnit.id).first()[0]
+    finally:
+        session.close()
+
+
+def test_write_behind_ingest_queues_and_flushes(client: TestClient, monkeypatch):
+    buffer = TelemetryWriteBuffer(max_size=10, flush_batch_size=100, max_latency_seconds=60)
+    monkeypatch.setattr(settings, "telemetry_write_behind", True)
+    monkeypatch.setattr("src.routers.telemetry.telemetry_buffer", buffer)
+    unit_id = _first_unit_id()
+    timestamp = datetime(2030, 1, 1, tzinfo=timezone.utc)
+
+    try:
+        response = client.post(
+            "/telemetry/ingest",
+            json={
+                "unit_id": unit_id,
+                "timestamp": timestamp.isoformat(),
+                "inlet_temp": 12.0,
+                "outlet_temp": 7.0,
+                "power_kw": 30.0,
+                "flow_rate": 11.0,
+                "cop": 3.9,
+            },
+            headers={"X-Service-Token": settings.service_token},
+        )
+        assert response.status_code == 202
+        assert response.json()["status"] == "queued"
+        assert buffer.stats()["queue_depth"] == 1
+    finally:
+        buffer.stop()
+
+    stats = buffer.stats()
+    assert stats["queue_depth"] == 0
+    assert stats["flushed_total"] == 1
+    assert stats["flush_count"] == 1
+
+    telemetry_session = TelemetrySessionLocal()
+    try:
+        stored = (
+            telemetry_session.query(ChillerTelemetry)
+            .filter(ChillerTelemetry.chiller_unit_id == unit_id)
+            .order_by(ChillerTelemetry.timestamp.desc())
+            .first()
+        )
+        assert stored.timestamp.year == 2030
+    finally:
+        telemetry_session.close()
+
+
+def test_write_behind_keeps_the_age_of_rows_left_queued(monkeypatch):
+    buffer = TelemetryWriteBuffer(max_size=10, flush_batch_size=2, max_latency_seconds=60)
+    monkeypatch.setattr(buffer, "start", lambda: None)
+    buffer.submit([{"index": index} for index in range(3)])
+    time.sleep(0.3)
+
+    assert len(buffer._take_batch()) == 2
+    # The row left behind is as old as when it was queued, not as the batch taken.
+    assert buffer.stats()["oldest_row_age_seconds"] >= 0.3
+
+
+def test_write_behind_drops_rows_that_keep_failing(monkeypatch):
+    buffer = TelemetryWriteBuffer(max_size=10, flush_batch_size=10, max_latency_seconds=60, max_attempts=2)
+    monkeypatch.setattr(buffer, "start", lambda: None)
+    written = []
+
+    def insert(session, rows):
+        if any(row["bad"] for row in rows):
+            raise ValueError("violates not-null constraint")
+        written.extend(row["index"] for row in rows)
+
+    monkeypatch.setattr("src.services.ingest_buffer.insert_telemetry_rows", insert)
+    buffer.submit([{"index": index, "bad": index == 3} for index in range(6)])
+
+    # The first failure may be transient, so the batch is kept for another attempt.
+    assert buffer.flush() == 0
+    assert buffer.stats()["queue_depth"] == 6
+    buffer.flush()
+    stats = buffer.stats()
+    assert sorted(written) == [0, 1, 2, 4, 5]
+    assert (stats["queue_depth"], stats["flushed_total"], stats["dropped_total"]) == (0, 5, 1)
+
+
+def test_write_behind_applies_backpressure_when_full(client: TestClient, monkeypatch):
+    buffer = TelemetryWriteBuffer(max_size=1, flush_batch_size=100, max_latency_seconds=60)
+    monkeypatch.setattr(settings, "telemetry_write_behind", True)
+    monkeypatch.setattr("src.routers.telemetry.telemetry_buffer", buffer)
+    evaluated = []
+    monkeypatch.setattr("src.routers.telemetry._evaluate_alerts", lambda db, checks: evaluated.extend(checks))
+    reading = {
+        "unit_id": _first_unit_id(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "inlet_temp": 12.0,
+        "outlet_temp": 7.0,
+        "power_kw": 30.0,
+        "flow_rate": 11.0,
+        "cop": 3.9,
+    }
+
+    try:
+        response = client.post(
+            "/telemetry/ingest/batch",
+            json={"readings": [reading, reading]},
+            headers={"X-Service-Token": settings.service_token},
+        )
+        assert response.status_code == 503
+        assert "Retry-After" in response.headers
+        assert buffer.stats()["rejected_total"] == 2
+        # Rejected readings never reach alert evaluation.
+        assert evaluated == []
+    finally:
+        buffer.stop()
+
+
+def test_steady_state_ingest_skips_metadata_queries(client: TestClient):
+    unit_id = _first_unit_id()
+    statements: list[str] = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    reading = {
+        "unit_id": unit_id,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "inlet_temp": 12.0,
+        "outlet_temp": 7.0,
+        "power_kw": 30.0,
+        "flow_rate": 11.0,
+        "cop": 3.9,
+    }
+    headers = {"X-Service-Token": settings.service_token}
+    assert client.post("/telemetry/ingest", json=reading, headers=headers).status_code == 201
+
+    # The ingest route queries metadata through the async engine, the middleware through the sync one.
+    engines = (engine, async_engine.sync_engine)
+    for bind in engines:
+        event.listen(bind, "before_cursor_execute", _record)
+    try:
+        assert client.post("/telemetry/ingest", json=reading, headers=headers).status_code == 201
+    finally:
+        for bind in engines:
+            event.remove(bind, "before_cursor_execute", _record)
+
+    routing_queries = [
+        statement
+        for statement in statements
+        if "FROM chiller_units" in statement or "FROM alert_rules" in statement
+    ]
+    assert routing_queries == []
+
+
+def test_alert_rule_changes_invalidate_cached_routes(client: TestClient, monkeypatch):
+    login = client.post("/auth/login", json={"email": "demo@demo.com", "password": "demo123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    unit_id = _first_unit_id()
+    reading = {
+        "unit_id": unit_id,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "inlet_temp": 12.0,
+        "outlet_temp": 7.0,
+        "power_kw": 30.0,
+        "flow_rate": 11.0,
+        "cop": 3.9,
+    }
+    monkeypatch.setattr("src.services.alert_engine.queue_email", lambda **_: True)
+
+    assert client.post("/telemetry/ingest", json=reading, headers=headers).status_code == 201
+    rule = client.post(
+        "/alert_rules",
+        json={
+            "chiller_unit_id": unit_id,
+            "name": "Low COP",
+            "metric_key": "cop",
+            "condition_operator": "LT",
+            "threshold_value": 5.0,
+            "severity": "CRITICAL",
+        },
+        headers=headers,
+    )
+    assert rule.status_code == 201
+
+    assert client.post("/telemetry/ingest", json=reading, headers=headers).status_code == 201
+
+    session = SessionLocal()
+    try:
+        events = session.query(AlertEvent).filter(AlertEvent.alert_rule_id == rule.json()["id"]).all()
+        assert len(events) == 1
+    finally:
+        session.close()
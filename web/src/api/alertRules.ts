@@ -2,6 +2,7 @@ import client from './client';
 
 export type Operator = '>' | '<' | '>=' | '<=';
 export type AlertSeverity = 'INFO' | 'WARNING' | 'CRITICAL';
+export type AlertWindowType = 'INSTANT' | 'AVERAGE' | 'CONSECUTIVE';
 
 export interface AlertRule {
   id: number;
@@ -11,6 +12,11 @@ export interface AlertRule {
   condition_operator: Operator;
   threshold_value: number;
   severity: AlertSeverity;
+  window_type: AlertWindowType;
+  window_seconds: number | null;
+  window_count: number | null;
+  cooldown_seconds: number;
+  hysteresis: number;
   is_active: boolean;
   recipient_emails: string[];
   chiller_unit?: {
@@ -16,20 +16,29 @@ export interface AlertEvent {
 export interface AlertSummary {
   total: number;
   by_severity: Record<string, number>;
+  unacknowledged: number;
 }
 
 export interface AlertFeedResponse {
   summary: AlertSummary;
   alerts: AlertEvent[];
+  next_cursor?: string | null;
 }
 
 export const fetchAlerts = async (
   severity?: AlertSeverity,
   chillerUnitId?: number,
+  cursor?: string,
 ): Promise<AlertFeedResponse> => {
   const params: Record<string, string | number> = {};
   if (severity) params.severity = severity;
   if (chillerUnitId) params.chiller_unit_id = chillerUnitId;
+  if (cursor) params.cursor = cursor;
   const { data } = await client.get<AlertFeedResponse>('/alerts', { params });
   return data;
 };
+
+export const acknowledgeAlert = async (alertId: number): Promise<AlertEvent> => {
+  const { data } = await client.post<AlertEvent>(`/alerts/${alertId}/acknowledge`);
+  return data;
+};
@@ -0,0 +1,31 @@
+import { describe, expect, it } from 'vitest';
+import { ConsumptionEfficiencyPoint, columnsToRows } from './analytics';
+
+describe('columnsToRows', () => {
+  it('expands columnar series into rows with ISO timestamps', () => {
+    const rows = columnsToRows<ConsumptionEfficiencyPoint>({
+      timestamp: [Date.UTC(2024, 0, 1), Date.UTC(2024, 0, 1, 1)],
+      cooling_rth: [50, 0],
+      power_kw: [20, 18],
+      efficiency_kwh_per_tr: [0.4, null],
+      avg_cop: [3.1, 3.4],
+    });
+
+    expect(rows).toEqual([
+      {
+        timestamp: '2024-01-01T00:00:00.000Z',
+        cooling_rth: 50,
+        power_kw: 20,
+        efficiency_kwh_per_tr: 0.4,
+        avg_cop: 3.1,
+      },
+      {
+        timestamp: '2024-01-01T01:00:00.000Z',
+        cooling_rth: 0,
+        power_kw: 18,
+        efficiency_kwh_per_tr: null,
+        avg_cop: 3.4,
+      },
+    ]);
+  });
+});
@@ -49,14 +49,43 @@ export interface ChillerTrendSeries {
   points: ChillerTrendPoint[];
 }
 
+/** A series sent with `format=columnar`: one array per field, timestamps in epoch milliseconds. */
+export type ColumnarSeries<T extends { timestamp: string }> = {
+  [K in keyof T]: K extends 'timestamp' ? number[] : T[K][];
+};
+
+/** Expands a columnar series into the row objects the charts consume. */
+export const columnsToRows = <T extends { timestamp: string }>(columns: ColumnarSeries<T>): T[] => {
+  const keys = Object.keys(columns) as (keyof T)[];
+  return columns.timestamp.map((millis, index) => {
+    const row = {} as T;
+    keys.forEach((key) => {
+      row[key] = (key === 'timestamp' ? new Date(millis).toISOString() : columns[key][index]) as T[keyof T];
+    });
+    return row;
+  });
+};
+
+interface ColumnarChillerTrendSeries {
+  unit_id: number;
+  unit_name: string;
+  points: ColumnarSeries<ChillerTrendPoint>;
+}
+
+const expandTrends = (chillers: ColumnarChillerTrendSeries[]): ChillerTrendSeries[] =>
+  chillers.map((chiller) => ({ ...chiller, points: columnsToRows(chiller.points) }));
+
 export const fetchPlantOverview = async (params: DateRangeFilters = {}) => {
   const response = await apiClient.get('/analytics/plant-overview', { params });
   return response.data as PlantOverviewResponse;
 };
 
 export const fetchConsumptionEfficiency = async (params: DateRangeFilters = {}) => {
-  const response = await apiClient.get('/analytics/consumption-efficiency', { params });
-  return response.data as { series: ConsumptionEfficiencyPoint[] };
+  const response = await apiClient.get('/analytics/consumption-efficiency', {
+    params: { ...params, format: 'columnar' },
+  });
+  const data = response.data as { series: ColumnarSeries<ConsumptionEfficiencyPoint> };
+  return { series: columnsToRows(data.series) };
 };
 
 export const fetchEquipmentMetrics = async (params: DateRangeFilters = {}) => {
@@ -64,7 +93,39 @@ export const fetchEquipmentMetrics = async (params: DateRangeFilters = {}) => {
   return response.data as { units: EquipmentMetric[] };
 };
 
-export const fetchChillerTrends = async (params: DateRangeFilters = {}) => {
-  const response = await apiClient.get('/analytics/chiller-trends', { params });
-  return response.data as { chillers: ChillerTrendSeries[] };
+export const fetchChillerTrends = async (params: ChillerTrendFilters = {}) => {
+  const response = await apiClient.get('/analytics/chiller-trends', {
+    params: { ...params, format: 'columnar' },
+  });
+  const data = response.data as { chillers: ColumnarChillerTrendSeries[] };
+  return { chillers: expandTrends(data.chillers) };
+};
+
+export interface ChillerTrendFilters extends DateRangeFilters {
+  max_points?: number;
+}
+
+export interface DashboardFilters extends ChillerTrendFilters {
+  trend_granularity?: DateRangeFilters['granularity'];
+}
+
+export interface AnalyticsDashboardResponse {
+  plant_overview: PlantOverviewResponse;
+  consumption_efficiency: { series: ConsumptionEfficiencyPoint[] };
+  equipment_metrics: { units: EquipmentMetric[] };
+  chiller_trends: { chillers: ChillerTrendSeries[] };
+}
+
+export const fetchAnalyticsDashboard = async (
+  params: DashboardFilters = {},
+): Promise<AnalyticsDashboardResponse> => {
+  const response = await apiClient.get('/analytics/dashboard', {
+    params: { ...params, format: 'columnar' },
+  });
+  const data = response.data;
+  return {
+    ...data,
+    consumption_efficiency: { series: columnsToRows(data.consumption_efficiency.series) },
+    chiller_trends: { chillers: expandTrends(data.chiller_trends.chillers) },
+  };
 };
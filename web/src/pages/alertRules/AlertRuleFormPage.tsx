@@ -3,6 +3,7 @@ import { useNavigate, useParams } from 'react-router-dom';
 import {
   AlertRulePayload,
   AlertSeverity,
+  AlertWindowType,
   Operator,
   createAlertRule,
   getAlertRule,
@@ -26,6 +27,11 @@ const AlertRuleFormPage = () => {
     condition_operator: '>' as Operator,
     threshold_value: 0,
     severity: 'INFO' as AlertSeverity,
+    window_type: 'INSTANT' as AlertWindowType,
+    window_seconds: null,
+    window_count: null,
+    cooldown_seconds: 0,
+    hysteresis: 0,
     is_active: true,
     recipient_emails: [],
   });
@@ -49,6 +55,11 @@ const AlertRuleFormPage = () => {
             condition_operator: data.condition_operator as Operator,
             threshold_value: data.threshold_value,
             severity: data.severity as AlertSeverity,
+            window_type: data.window_type,
+            window_seconds: data.window_seconds,
+            window_count: data.window_count,
+            cooldown_seconds: data.cooldown_seconds,
+            hysteresis: data.hysteresis,
             is_active: data.is_active,
             recipient_emails: data.recipient_emails,
           });
@@ -150,6 +161,57 @@ const AlertRuleFormPage = () => {
             { label: 'Critical', value: 'CRITICAL' },
           ]}
         />
+        <SelectInput
+          id="window_type"
+          label="Evaluation Window"
+          value={form.window_type}
+          onChange={(e) => setForm({ ...form, window_type: e.target.value as AlertWindowType })}
+          options={[
+            { label: 'Each reading', value: 'INSTANT' },
+            { label: 'Average over time', value: 'AVERAGE' },
+            { label: 'Consecutive readings', value: 'CONSECUTIVE' },
+          ]}
+        />
+        {form.window_type === 'AVERAGE' ? (
+          <FormInput
+            id="window_seconds"
+            label="Window (seconds)"
+            type="number"
+            min={1}
+            value={form.window_seconds ?? ''}
+            onChange={(e) => setForm({ ...form, window_seconds: Number(e.target.value) || null })}
+            required
+          />
+        ) : null}
+        {form.window_type === 'CONSECUTIVE' ? (
+          <FormInput
+            id="window_count"
+            label="Consecutive Readings"
+            type="number"
+            min={1}
+            value={form.window_count ?? ''}
+            onChange={(e) => setForm({ ...form, window_count: Number(e.target.value) || null })}
+            required
+          />
+        ) : null}
+        <FormInput
+          id="hysteresis"
+          label="Hysteresis"
+          type="number"
+          min={0}
+          hint="How far back past the threshold a firing rule must recover before it clears."
+          value={form.hysteresis}
+          onChange={(e) => setForm({ ...form, hysteresis: Number(e.target.value) })}
+        />
+        <FormInput
+          id="cooldown_seconds"
+          label="Cooldown (seconds)"
+          type="number"
+          min={0}
+          hint="Minimum time between two firings of this rule."
+          value={form.cooldown_seconds}
+          onChange={(e) => setForm({ ...form, cooldown_seconds: Number(e.target.value) })}
+        />
         <div className="md:col-span-2">
           <label htmlFor="recipient_emails" className="text-sm font-medium text-slate-700 dark:text-slate-200">
             Recipient Emails
@@ -1,5 +1,5 @@
 import { useEffect, useMemo, useState } from 'react';
-import { fetchAlerts } from '../../api/alerts';
+import { acknowledgeAlert, fetchAlerts } from '../../api/alerts';
 import { AlertSeverity } from '../../api/alertRules';
 import { listChillerUnits } from '../../api/chillerUnits';
 import ErrorMessage from '../../components/common/ErrorMessage';
@@ -23,6 +23,7 @@ const AlertsPage = () => {
   const [alerts, setAlerts] = useState<Awaited<ReturnType<typeof fetchAlerts>> | null>(null);
   const [chillers, setChillers] = useState<{ id: number; name: string }[]>([]);
   const [chillerFilter, setChillerFilter] = useState<number | undefined>();
+  const [loadingMore, setLoadingMore] = useState(false);
 
   const loadAlerts = async () => {
     setLoading(true);
@@ -41,6 +42,35 @@ const AlertsPage = () => {
     }
   };
 
+  const loadMore = async () => {
+    if (!alerts?.next_cursor) return;
+    setLoadingMore(true);
+    setError(undefined);
+    try {
+      const page = await fetchAlerts(severityFilter || undefined, chillerFilter, alerts.next_cursor);
+      setAlerts({ ...page, alerts: [...alerts.alerts, ...page.alerts] });
+    } catch (err: any) {
+      setError(err?.response?.data?.detail ?? 'Unable to load alerts');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  const acknowledge = async (alertId: number) => {
+    if (!alerts) return;
+    setError(undefined);
+    try {
+      const updated = await acknowledgeAlert(alertId);
+      setAlerts({
+        ...alerts,
+        summary: { ...alerts.summary, unacknowledged: Math.max(0, alerts.summary.unacknowledged - 1) },
+        alerts: alerts.alerts.map((alert) => (alert.id === updated.id ? updated : alert)),
+      });
+    } catch (err: any) {
+      setError(err?.response?.data?.detail ?? 'Unable to acknowledge alert');
+    }
+  };
+
   useEffect(() => {
     loadAlerts();
     // eslint-disable-next-line react-hooks/exhaustive-deps
@@ -136,6 +166,7 @@ const AlertsPage = () => {
                 <th className="px-6 py-3">Severity</th>
                 <th className="px-6 py-3">Message</th>
                 <th className="px-6 py-3">Metric</th>
+                <th className="px-6 py-3">Status</th>
               </tr>
             </thead>
             <tbody className="divide-y divide-slate-100 dark:divide-slate-800">
@@ -151,11 +182,24 @@ const AlertsPage = () => {
                   <td className="px-6 py-3 text-slate-600 dark:text-slate-300">
                     {alert.metric_key}: {alert.metric_value.toFixed(2)}
                   </td>
+                  <td className="px-6 py-3 text-slate-600 dark:text-slate-300">
+                    {alert.acknowledged ? (
+                      'Acknowledged'
+                    ) : (
+                      <button
+                        type="button"
+                        className="text-sm font-semibold text-brand-600 hover:underline"
+                        onClick={() => acknowledge(alert.id)}
+                      >
+                        Acknowledge
+                      </button>
+                    )}
+                  </td>
                 </tr>
               ))}
               {!alerts?.alerts.length && (
                 <tr>
-                  <td className="px-6 py-4 text-center text-slate-500" colSpan={4}>
+                  <td className="px-6 py-4 text-center text-slate-500" colSpan={5}>
                     No alerts found.
                   </td>
                 </tr>
@@ -163,6 +207,18 @@ const AlertsPage = () => {
             </tbody>
           </table>
         </div>
+        {alerts?.next_cursor && (
+          <div className="border-t border-slate-100 px-6 py-3 text-center dark:border-slate-800">
+            <button
+              type="button"
+              className="rounded-xl border border-slate-200 px-4 py-2 text-sm font-semibold text-slate-700 transition hover:border-brand-500 hover:text-brand-600 focus:outline-none focus:ring-2 focus:ring-brand-200 disabled:opacity-50 dark:border-slate-700 dark:text-slate-100"
+              onClick={loadMore}
+              disabled={loadingMore}
+            >
+              {loadingMore ? 'Loading…' : 'Load more'}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
@@ -5,12 +5,7 @@ import { listAlertRules } from '../../api/alertRules';
 import { listBuildings } from '../../api/buildings';
 import { listChillerUnits } from '../../api/chillerUnits';
 import { fetchDashboardLayout, saveDashboardLayout } from '../../api/dashboardLayouts';
-import {
-  fetchChillerTrends,
-  fetchConsumptionEfficiency,
-  fetchEquipmentMetrics,
-  fetchPlantOverview,
-} from '../../api/analytics';
+import { fetchAnalyticsDashboard } from '../../api/analytics';
 import { defaultLayouts } from './widgets';
 
 vi.mock('../../api/alertRules');
@@ -48,10 +43,7 @@ const mockedListChillerUnits = listChillerUnits as unknown as vi.Mock;
 const mockedListAlertRules = listAlertRules as unknown as vi.Mock;
 const mockedFetchLayout = fetchDashboardLayout as unknown as vi.Mock;
 const mockedSaveLayout = saveDashboardLayout as unknown as vi.Mock;
-const mockedPlantOverview = fetchPlantOverview as unknown as vi.Mock;
-const mockedConsumption = fetchConsumptionEfficiency as unknown as vi.Mock;
-const mockedEquipment = fetchEquipmentMetrics as unknown as vi.Mock;
-const mockedChillerTrends = fetchChillerTrends as unknown as vi.Mock;
+const mockedAnalyticsDashboard = fetchAnalyticsDashboard as unknown as vi.Mock;
 
 describe('DashboardPage', () => {
   beforeEach(() => {
@@ -62,54 +54,56 @@ describe('DashboardPage', () => {
       Promise.resolve({ page_key: pageKey, layout: defaultLayouts[pageKey as keyof typeof defaultLayouts] ?? [] }),
     );
     mockedSaveLayout.mockResolvedValue({ page_key: 'dashboard_overview', layout: defaultLayouts.dashboard_overview });
-    mockedPlantOverview.mockResolvedValue({
-      cooling_load_rth: 100,
-      power_consumption_kw: 200,
-      avg_cop: 3.5,
-      efficiency_gain_percent: 5,
-      monthly_savings: 1200,
-      co2_saved: 42,
-    });
-    mockedConsumption.mockResolvedValue({
-      series: [
-        {
-          timestamp: '2024-01-01T00:00:00Z',
-          cooling_rth: 50,
-          power_kw: 20,
-          efficiency_kwh_per_tr: 0.4,
-          avg_cop: 3.1,
-        },
-      ],
-    });
-    mockedEquipment.mockResolvedValue({
-      units: [
-        {
-          id: 1,
-          name: 'Chiller A',
-          cooling_share: 60,
-          power_share: 40,
-          efficiency_kwh_per_tr: 0.31,
-          avg_cop: 3.2,
-        },
-      ],
-    });
-    mockedChillerTrends.mockResolvedValue({
-      chillers: [
-        {
-          unit_id: 1,
-          unit_name: 'Chiller A',
-          points: [
-            {
-              timestamp: '2024-01-01T00:00:00Z',
-              ewt: 12.1,
-              lwt: 7.5,
-              power_kw: 20,
-              cooling_rth: 50,
-              capacity_pct: 75,
-            },
-          ],
-        },
-      ],
+    mockedAnalyticsDashboard.mockResolvedValue({
+      plant_overview: {
+        cooling_load_rth: 100,
+        power_consumption_kw: 200,
+        avg_cop: 3.5,
+        efficiency_gain_percent: 5,
+        monthly_savings: 1200,
+        co2_saved: 42,
+      },
+      consumption_efficiency: {
+        series: [
+          {
+            timestamp: '2024-01-01T00:00:00Z',
+            cooling_rth: 50,
+            power_kw: 20,
+            efficiency_kwh_per_tr: 0.4,
+            avg_cop: 3.1,
+          },
+        ],
+      },
+      equipment_metrics: {
+        units: [
+          {
+            id: 1,
+            name: 'Chiller A',
+            cooling_share: 60,
+            power_share: 40,
+            efficiency_kwh_per_tr: 0.31,
+            avg_cop: 3.2,
+          },
+        ],
+      },
+      chiller_trends: {
+        chillers: [
+          {
+            unit_id: 1,
+            unit_name: 'Chiller A',
+            points: [
+              {
+                timestamp: '2024-01-01T00:00:00Z',
+                ewt: 12.1,
+                lwt: 7.5,
+                power_kw: 20,
+                cooling_rth: 50,
+                capacity_pct: 75,
+              },
+            ],
+          },
+        ],
+      },
     });
   });
 
@@ -125,10 +119,7 @@ describe('DashboardPage', () => {
     });
 
     expect(screen.getByText(/Plant cooling load/i)).toBeInTheDocument();
-    expect(mockedPlantOverview).toHaveBeenCalled();
-    expect(mockedConsumption).toHaveBeenCalled();
-    expect(mockedEquipment).toHaveBeenCalled();
-    expect(mockedChillerTrends).toHaveBeenCalled();
+    expect(mockedAnalyticsDashboard).toHaveBeenCalled();
 
     const equipmentTab = screen.getByText(/Equipment & Health/i);
     fireEvent.click(equipmentTab);
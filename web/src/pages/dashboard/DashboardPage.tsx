@@ -6,12 +6,7 @@ import { listChillerUnits } from '../../api/chillerUnits';
 import Loading from '../../components/common/Loading';
 import ErrorMessage from '../../components/common/ErrorMessage';
 import { fetchDashboardLayout, saveDashboardLayout } from '../../api/dashboardLayouts';
-import {
-  fetchChillerTrends,
-  fetchConsumptionEfficiency,
-  fetchEquipmentMetrics,
-  fetchPlantOverview,
-} from '../../api/analytics';
+import { fetchAnalyticsDashboard } from '../../api/analytics';
 import DashboardLayoutManager, { WidgetDefinition, WidgetLayoutConfig } from '../../components/dashboard/DashboardLayoutManager';
 import {
   DashboardPageKey,
@@ -24,6 +19,9 @@ import {
   pageDefinitions,
 } from './widgets';
 
+// Charts are a few hundred pixels wide; more points per chiller only cost transfer and render time.
+const TREND_MAX_POINTS = 500;
+
 const DashboardSectionView = ({
   sectionKey,
   registry,
@@ -181,19 +179,14 @@ const DashboardPage = () => {
           end: dayjs(activeRange.end).endOf('day').toISOString(),
         };
 
-        const [overview, consumption, equipment, chillerTrends] = await Promise.all([
-          fetchPlantOverview(rangeParams),
-          fetchConsumptionEfficiency(rangeParams),
-          fetchEquipmentMetrics(rangeParams),
-          fetchChillerTrends(rangeParams),
-        ]);
+        const dashboard = await fetchAnalyticsDashboard({ ...rangeParams, max_points: TREND_MAX_POINTS });
 
         setTelemetryError(undefined);
         setDashboardData({
-          overview,
-          consumptionSeries: consumption.series ?? [],
-          equipmentMetrics: equipment.units ?? [],
-          chillerTrends: chillerTrends.chillers ?? [],
+          overview: dashboard.plant_overview,
+          consumptionSeries: dashboard.consumption_efficiency.series ?? [],
+          equipmentMetrics: dashboard.equipment_metrics.units ?? [],
+          chillerTrends: dashboard.chiller_trends.chillers ?? [],
         });
       } catch (err: any) {
         setTelemetryError(err?.response?.data?.detail ?? 'Unable to load dashboard telemetry.');